@@ -0,0 +1,126 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Module that tests whether the orbital phases of the flares of a system
+follow the expected distribution from the observing coverage, using
+the Anderson-Darling (AD) test with a custom expected distribution.
+
+The distribution of the AD statistic under the null hypothesis depends
+on the number of flares and the coverage, so it is sampled for every
+system. Samples are drawn by inverting the coverage CDF, and the AD
+statistic is computed for all samples at once. The uncertainties on the
+phases are propagated by drawing phases, which gives the mean and the
+standard deviation of the p-value.
+"""
+
+import numpy as np
+
+
+def get_cdf_values(x, p, f):
+    """Expected cumulative distribution at phases `x`, interpolated from
+    the coverage file columns `p` and `f`, which both run from 0 to 1."""
+    return np.interp(x, p, f)
+
+
+def anderson_darling(x, p, f):
+    """AD statistic of many samples at once.
+
+    Parameters
+    ----------
+    x : array
+        Phases, one sample per row.
+    p, f : arrays
+        Coverage: phases and cumulative fraction of the observing time.
+
+    Returns
+    -------
+    A2 : array
+        AD statistic of every sample.
+    """
+    x = np.atleast_2d(x)
+    z = get_cdf_values(np.sort(x, axis=1), p, f)
+
+    # A2 is undefined for 0 and 1
+    z = np.clip(z, 1e-12, 1. - 1e-12)
+
+    N = x.shape[1]
+    i = np.arange(1, N + 1)
+    S = np.sum((2 * i - 1.) / N * (np.log(z) + np.log(1. - z[:, ::-1])), axis=1)
+
+    return - N - S
+
+
+def sample_null_distribution(nobs, p, f, nsamples=10000, rng=None):
+    """Sample the AD statistic under the null hypothesis that the
+    flares follow the coverage.
+
+    Parameters
+    ----------
+    nobs : int
+        Number of flares.
+    p, f : arrays
+        Coverage: phases and cumulative fraction of the observing time.
+    nsamples : int, optional
+        Number of samples. The default is 10000.
+    rng : numpy.random.Generator, optional
+        Random number generator.
+
+    Returns
+    -------
+    A2 : array
+        Sorted AD statistics of the samples.
+    """
+    rng = np.random.default_rng(rng)
+
+    # draw phases by inverting the coverage CDF
+    u = rng.random((nsamples, nobs))
+    x = np.interp(u, f, p)
+
+    return np.sort(anderson_darling(x, p, f))
+
+
+def ad_test(phases, p, f, phases_err=None, ndraws=100, nsamples=10000, rng=None):
+    """AD test of the flare phases of a system against its coverage.
+
+    Parameters
+    ----------
+    phases : array
+        Orbital phases of the flares.
+    p, f : arrays
+        Coverage: phases and cumulative fraction of the observing time.
+    phases_err : array, optional
+        Uncertainties on the phases. If given, phases are drawn from
+        normal distributions, and wrapped to [0, 1).
+    ndraws : int, optional
+        Number of draws of the phases. The default is 100.
+    nsamples : int, optional
+        Number of samples of the null distribution. The default is 10000.
+    rng : numpy.random.Generator or int, optional
+        Random number generator or seed.
+
+    Returns
+    -------
+    A2 : float
+        AD statistic of the phases.
+    mean, std : floats
+        Mean and standard deviation of the p-value over the draws.
+    """
+    rng = np.random.default_rng(rng)
+    phases = np.asarray(phases, dtype=float)
+
+    A2null = sample_null_distribution(len(phases), p, f, nsamples=nsamples, rng=rng)
+    A2 = anderson_darling(phases, p, f)[0]
+
+    # draw phases within their uncertainties
+    if phases_err is None:
+        draws = phases[np.newaxis, :]
+    else:
+        err = np.nan_to_num(np.asarray(phases_err, dtype=float))
+        draws = (phases + rng.normal(size=(ndraws, len(phases))) * err) % 1.
+
+    # fraction of the null distribution above every drawn statistic
+    pvalues = 1. - np.searchsorted(A2null, anderson_darling(draws, p, f)) / nsamples
+
+    return A2, pvalues.mean(), pvalues.std()
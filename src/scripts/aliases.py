@@ -0,0 +1,103 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Module that keeps the registry of renamed and excluded systems, and
+applies it when tables are read, so that the input tables are never
+rewritten.
+
+EPIC 200164267 is called TRAPPIST-1 in the paper. Kepler-411(c) is an
+old instance of Kepler-411 that is dropped. All TICs are integers after
+the exclusions, rows with other TICs are dropped with a warning.
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+import paths
+
+from schema import read_table
+
+
+# names of systems in the paper
+ID_ALIASES = {"EPIC 200164267": "TRAPPIST-1"}
+
+# TICs that are written differently in some tables
+TIC_ALIASES = {}
+
+# systems that are dropped from all tables
+EXCLUDED_IDS = ["Kepler-411(c)"]
+EXCLUDED_TICS = ["399954349(c)"]
+
+
+def get_registry():
+    """The registry as a dictionary, e.g., to detect changes in caches."""
+    return {"ID_ALIASES": ID_ALIASES, "TIC_ALIASES": TIC_ALIASES,
+            "EXCLUDED_IDS": EXCLUDED_IDS, "EXCLUDED_TICS": EXCLUDED_TICS}
+
+
+def normalize_tic(values):
+    """Convert TIC values to integers. Known aliases are mapped, and a
+    "TIC " prefix is removed. Values that are still not integers are
+    NaN, with a warning, so that the rows can be dropped.
+
+    Parameters
+    ----------
+    values : pandas.Series
+        TIC values as read from a table.
+
+    Returns
+    -------
+    tic : array
+        float64 TICs, NaN where the value is not an integer.
+    """
+    strings = values.astype(str).str.strip()
+    strings = strings.replace(TIC_ALIASES).str.replace(r"^TIC\s*", "", regex=True)
+
+    tic = pd.to_numeric(strings, errors="coerce").to_numpy(np.float64, copy=True)
+
+    # TICs with a fractional part are not TICs either
+    tic[tic % 1 != 0] = np.nan
+
+    bad = np.isnan(tic)
+    if bad.any():
+        warnings.warn(f"{bad.sum()} rows have TIC values that are not integers, "
+                      f"and are dropped: {list(pd.unique(values[bad]))}")
+
+    return tic
+
+
+def apply_aliases(df):
+    """Rename systems, drop excluded systems, and convert TIC to integers.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Table with TIC and ID columns, e.g., the results table or
+        the flare table.
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        A copy of the table with the registry applied.
+    """
+    excluded = df.ID.isin(EXCLUDED_IDS) | df.TIC.astype(str).isin(EXCLUDED_TICS)
+    df = df[~excluded].copy()
+
+    df["ID"] = df.ID.replace(ID_ALIASES)
+
+    # drop rows without an integer TIC
+    tic = normalize_tic(df.TIC)
+    df = df[~np.isnan(tic)].copy()
+    df["TIC"] = tic[~np.isnan(tic)].astype(np.int64)
+
+    return df
+
+
+def read_results(path=paths.data / "results.csv", columns=None):
+    """Read the results table, or only some of its columns, with the
+    registry applied. The columns must include TIC and ID."""
+    return apply_aliases(read_table(path, columns))
@@ -0,0 +1,85 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Module that finds flare candidates that occur at the same time on many
+different stars in the same Kepler quarter or TESS sector. Such events,
+like the argabrightening on Kepler-235, are instrumental, not stellar.
+
+All candidates are sorted once by mission, quarter or sector, and start
+time, so the cost is O(n log n) instead of comparing all pairs of
+flares. A group is anchored on the start time of its first flare, and
+every flare that starts within the tolerance of it joins the group; the
+next flare starts a new group, found with a binary search on the sorted
+start times. Groups neither grow by chaining nor with the duration of
+a long flare, so flares on many stars that merely follow each other
+closely, or overlap with one long flare, are not tagged.
+"""
+
+import numpy as np
+
+
+# columns of the tag in the flare table
+COINCIDENCE_COLUMNS = ["coincidence_group", "n_coincident_targets", "coincident"]
+
+def tag_coincident_flares(flare_table, tol=0.01, min_targets=3):
+    """Tag flares that coincide in time with flares on other stars.
+
+    Parameters
+    ----------
+    flare_table : pandas.DataFrame
+        Flare table with columns TIC, mission, quarter_or_sector, and
+        tstart. Rows without a flare are ignored.
+    tol : float, optional
+        Flares that start at most this many days after the start of the
+        first flare in a group join the group. The default is 0.01.
+    min_targets : int, optional
+        Minimum number of different stars in a group of coincident
+        flares to tag them. The default is 3.
+
+    Returns
+    -------
+    flare_table : pandas.DataFrame
+        Copy of the input with the columns coincidence_group (-1 for
+        rows without a flare), n_coincident_targets, and coincident.
+    """
+    flare_table = flare_table.copy()
+    flares = flare_table[flare_table.tstart.notnull()]
+
+    # sort by light curve group and start time
+    flares = flares.sort_values(by=["mission", "quarter_or_sector", "tstart"])
+    keys = ["mission", "quarter_or_sector"]
+    tstart = flares.tstart.values
+
+    # number the light curve groups, and shift the start times of every
+    # group beyond the tolerance of the previous one, so that a single
+    # sorted array holds all groups
+    new_lc = np.insert((flares[keys].values[1:] != flares[keys].values[:-1]).any(axis=1),
+                       0, True)
+    lc = np.cumsum(new_lc) - 1
+    span = tstart.max() - tstart.min() + 2. * tol + 1. if len(tstart) > 0 else 0.
+    t = tstart + lc * span
+
+    # a group starts with the first flare after the tolerance of the
+    # previous group's first flare
+    starts = []
+    i = 0
+    while i < len(t):
+        starts.append(i)
+        i = int(np.searchsorted(t, t[i] + tol, side="right"))
+    isstart = np.zeros(len(t), dtype=int)
+    isstart[starts] = 1
+    group = np.cumsum(isstart) - 1
+
+    # count the different stars in every group
+    flares = flares.assign(coincidence_group=group)
+    n_targets = flares.groupby("coincidence_group").TIC.transform("nunique")
+
+    flare_table["coincidence_group"] = -1
+    flare_table.loc[flares.index, "coincidence_group"] = group
+    flare_table["n_coincident_targets"] = 0
+    flare_table.loc[flares.index, "n_coincident_targets"] = n_targets.values
+    flare_table["coincident"] = flare_table.n_coincident_targets >= min_targets
+
+    return flare_table
@@ -0,0 +1,129 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Module that screens the planet hosts for flux contamination by nearby
+sources from a local snapshot of a neighbour catalogue (e.g., Gaia).
+
+Sources are indexed in a KD-tree on the unit sphere, and all hosts are
+matched against it in one batched query. The contamination is the flux
+ratio of all sources within the aperture radius of the mission to the
+host itself.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+
+# approximate photometric aperture radii in arcsec, about two pixels
+APERTURE_RADIUS = {"Kepler": 8., "TESS": 42.}
+
+# sources closer than this many arcsec to the host position are the host
+MATCH_RADIUS = 2.
+
+
+def radec_to_xyz(ra, dec):
+    """Convert RA and Dec in degrees to unit vectors."""
+    ra, dec = np.radians(ra), np.radians(dec)
+    return np.column_stack([np.cos(dec) * np.cos(ra),
+                            np.cos(dec) * np.sin(ra),
+                            np.sin(dec)])
+
+
+def arcsec_to_chord(r):
+    """Convert an angular separation in arcsec to a chord length
+    on the unit sphere."""
+    return 2. * np.sin(np.radians(r / 3600.) / 2.)
+
+
+def get_contamination(hosts, catalog, radii=APERTURE_RADIUS,
+                      match_radius=MATCH_RADIUS):
+    """Compute the flux contamination of all hosts at once.
+
+    Parameters
+    ----------
+    hosts : pandas.DataFrame
+        Columns TIC, ra, and dec in degrees.
+    catalog : pandas.DataFrame
+        Neighbour catalogue with columns ra, dec in degrees, and mag.
+    radii : dict, optional
+        Aperture radius in arcsec for each mission.
+    match_radius : float, optional
+        Sources within this many arcsec of a host are taken as the host.
+        The brightest of them sets the host magnitude.
+
+    Returns
+    -------
+    contamination : pandas.DataFrame
+        For each host and mission, the number of neighbours in the
+        aperture and their flux relative to the host. NaN if the host
+        is not in the catalogue.
+    """
+    host_xyz = radec_to_xyz(hosts.ra.values, hosts.dec.values)
+    cat_xyz = radec_to_xyz(catalog.ra.values, catalog.dec.values)
+    mag = catalog.mag.values
+
+    # all host-source pairs within the largest aperture, in one query
+    tree = cKDTree(cat_xyz)
+    pairs = cKDTree(host_xyz).sparse_distance_matrix(
+        tree, arcsec_to_chord(max(radii.values())), output_type="ndarray")
+    ihost, isrc, dist = pairs["i"], pairs["j"], pairs["v"]
+
+    # host magnitude is the brightest source at the host position
+    is_host = dist <= arcsec_to_chord(match_radius)
+    host_mag = np.full(len(hosts), np.nan)
+    np.fmin.at(host_mag, ihost[is_host], mag[isrc[is_host]])
+
+    contamination = pd.DataFrame({"TIC": hosts.TIC.values})
+
+    for mission, r in radii.items():
+
+        # neighbours inside the aperture, without the host itself
+        inside = (dist <= arcsec_to_chord(r)) & ~is_host
+
+        ratio = 10**(-0.4 * (mag[isrc[inside]] - host_mag[ihost[inside]]))
+
+        n = np.bincount(ihost[inside], minlength=len(hosts))
+        flux = np.bincount(ihost[inside], weights=ratio, minlength=len(hosts))
+
+        contamination[f"n_neighbours_{mission.lower()}"] = n
+        contamination[f"contamination_{mission.lower()}"] = np.where(np.isfinite(host_mag),
+                                                                     flux, np.nan)
+
+    return contamination
+
+
+def flag_multiple_star_candidates(contamination, missions=None, threshold=0.1):
+    """Flag hosts where neighbours add more than `threshold` of the
+    host flux in any of the missions that observed them.
+
+    Parameters
+    ----------
+    contamination : pandas.DataFrame
+        Output of `get_contamination`.
+    missions : dict, optional
+        Maps TIC to the set of missions that observed the star.
+        By default, all missions are considered.
+    threshold : float, optional
+        Flux ratio threshold. The default is 0.1.
+
+    Returns
+    -------
+    flags : bool array
+        True for candidate multiple or contaminated stars.
+    """
+    flags = np.zeros(len(contamination), dtype=bool)
+
+    for mission in APERTURE_RADIUS.keys():
+        over = contamination[f"contamination_{mission.lower()}"].values > threshold
+
+        if missions is not None:
+            observed = np.array([mission in missions.get(tic, set())
+                                 for tic in contamination.TIC])
+            over &= observed
+
+        flags |= over
+
+    return flags
@@ -0,0 +1,164 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Module that keeps the coverage files of all systems, i.e., the expected
+cumulative distributions of flare phases (columns `p` and `f`), in one
+store instead of one `TIC_{tic}_cumhist.csv` file per system.
+
+The store in `src/data/cumhist_store` is a single binary file of
+float64 values, `values.bin`, and an index, `index.json`, with the
+offset and length of every system. A system is stored as its `p`
+array followed by its `f` array. Reading a system is a slice of a
+memory map, without copying. Rebuilding a system appends it to the end
+of the file and moves its entry in the index, so the old values stay
+unused until the store is compacted.
+
+Systems that are not in the store are read from their old coverage
+files, if there are any.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+import paths
+
+
+# location of the store
+STORE_DIR = paths.data / "cumhist_store"
+
+
+class CumhistStore:
+    """Store of the coverage of all systems.
+
+    Attributes
+    ----------
+    outdir : pathlib.Path
+        Folder of the store.
+    index : dict
+        Offset and length of every system in values, keyed by TIC.
+    """
+
+    def __init__(self, outdir=STORE_DIR):
+        self.outdir = outdir
+        self.values_path = outdir / "values.bin"
+        self.index_path = outdir / "index.json"
+
+        self.index = {}
+        if self.index_path.exists():
+            with open(self.index_path, "r") as f:
+                self.index = json.load(f)
+
+        self._values = None
+
+    def __contains__(self, tic):
+        return (str(tic) in self.index) | self.get_csv_path(tic).exists()
+
+    @property
+    def tics(self):
+        """TICs of the systems in the store."""
+        return sorted(int(tic) for tic in self.index)
+
+    def get_csv_path(self, tic):
+        """Path to the old coverage file of a system."""
+        return paths.data / f"TIC_{tic}_cumhist.csv"
+
+    def get_values(self):
+        """Memory map of all values in the store."""
+        if self._values is None:
+            if (not self.values_path.exists()) or (self.values_path.stat().st_size == 0):
+                return np.zeros(0)
+            self._values = np.memmap(self.values_path, dtype=np.float64, mode="r")
+        return self._values
+
+    def get(self, tic):
+        """Coverage of a system.
+
+        Parameters
+        ----------
+        tic : int
+            TIC of the system.
+
+        Returns
+        -------
+        p, f : arrays
+            Phases and cumulative fraction of the observing time,
+            read-only views of the store.
+        """
+        key = str(tic)
+
+        if key in self.index:
+            offset, n = self.index[key]
+            values = self.get_values()
+            return values[offset:offset + n], values[offset + n:offset + 2 * n]
+
+        # systems built before the store
+        path = self.get_csv_path(tic)
+        if path.exists():
+            df = pd.read_csv(path)
+            return df.p.values, df.f.values
+
+        raise KeyError(f"No coverage of TIC {tic}.")
+
+    def append(self, tic, p, f):
+        """Add or replace the coverage of a system. The index is written
+        with `write_index`.
+
+        Parameters
+        ----------
+        tic : int
+            TIC of the system.
+        p, f : arrays
+            Phases and cumulative fraction of the observing time.
+        """
+        p = np.asarray(p, dtype=np.float64)
+        f = np.asarray(f, dtype=np.float64)
+
+        self.outdir.mkdir(parents=True, exist_ok=True)
+
+        with open(self.values_path, "ab") as file:
+            offset = file.tell() // 8
+            file.write(p.tobytes())
+            file.write(f.tobytes())
+
+        self.index[str(tic)] = [offset, len(p)]
+
+        # the file grew, map it again on the next read
+        self._values = None
+
+    def write_index(self):
+        """Write the index, after the values it points to are written."""
+        self.outdir.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.index, f)
+        tmp.replace(self.index_path)
+
+    def get_unused_fraction(self):
+        """Fraction of the values that belong to replaced systems."""
+        total = len(self.get_values())
+        if total == 0:
+            return 0.
+        used = sum(2 * n for _, n in self.index.values())
+        return 1. - used / total
+
+    def compact(self):
+        """Rewrite the store with only the current coverage of every
+        system."""
+        values = self.get_values()
+
+        index, offset = {}, 0
+        tmp = self.values_path.with_suffix(".tmp")
+        with open(tmp, "wb") as file:
+            for key, (start, n) in self.index.items():
+                file.write(np.asarray(values[start:start + 2 * n]).tobytes())
+                index[key] = [offset, n]
+                offset += 2 * n
+
+        self._values = None
+        tmp.replace(self.values_path)
+        self.index = index
+        self.write_index()
@@ -0,0 +1,89 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Module that removes duplicates from the flare table in a single
+sort-and-mask pass.
+
+A light curve (TIC, mission, quarter or sector) can appear in several
+analyses, which differ in timestamp or total observing time. Only the
+first analysis of each light curve is kept. Within the kept analysis,
+flares that overlap an earlier flare of the same light curve, e.g., from
+a re-run appended on the same day, are dropped, too. All dropped rows
+are returned with the reason why they were dropped.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def get_changes(order, *columns):
+    """Mark rows where any of the columns differs from the row before,
+    after sorting by `order`."""
+    new = np.zeros(len(order), dtype=bool)
+    new[:1] = True
+    for col in columns:
+        col = col[order]
+        new[1:] |= col[1:] != col[:-1]
+    return new
+
+
+def deduplicate_flare_table(flare_table):
+    """Remove repeated analyses and overlapping flares from the flare table.
+
+    Parameters
+    ----------
+    flare_table : pandas.DataFrame
+        Flare table with TIC, mission, quarter_or_sector, timestamp,
+        total_time_observed_in_lc_days, tstart, and tstop.
+
+    Returns
+    -------
+    kept : pandas.DataFrame
+        The deduplicated flare table, in the original order.
+    dropped : pandas.DataFrame
+        The dropped rows, with a `dropped_reason` column, either
+        "repeated analysis" or "overlapping flare".
+    """
+    n = flare_table.shape[0]
+
+    # integer keys, timestamps and observing times sorted in their natural order
+    tic = flare_table.TIC.to_numpy()
+    qs = flare_table.quarter_or_sector.to_numpy()
+    mission = pd.factorize(flare_table.mission.astype(object), sort=True)[0]
+    timestamp = pd.factorize(flare_table.timestamp.astype(object), sort=True)[0]
+    total_time = pd.factorize(flare_table.total_time_observed_in_lc_days, sort=True)[0]
+    tstart = flare_table.tstart.to_numpy(float)
+    tstop = flare_table.tstop.to_numpy(float)
+
+    # sort by light curve, analysis, and flare start time
+    order = np.lexsort([tstart, total_time, timestamp, qs, mission, tic])
+
+    # number the light curves and analyses in sorted order
+    new_lc = get_changes(order, tic, mission, qs)
+    new_analysis = new_lc | get_changes(order, timestamp, total_time)
+    lc = np.cumsum(new_lc) - 1
+    analysis = np.cumsum(new_analysis) - 1
+
+    # keep only the first analysis of each light curve
+    repeated = analysis != analysis[new_lc][lc]
+
+    # within that analysis, find flares that start before an earlier
+    # flare of the same light curve has ended
+    kept = np.where(~repeated)[0]
+    lc_kept, start_kept = lc[kept], tstart[order][kept]
+    latest_stop = pd.Series(tstop[order][kept]).groupby(lc_kept).cummax().to_numpy()
+
+    overlap = np.zeros(len(kept), dtype=bool)
+    overlap[1:] = (lc_kept[1:] == lc_kept[:-1]) & (start_kept[1:] <= latest_stop[:-1])
+
+    # map the reasons back to the original rows
+    reason = np.full(n, "", dtype=object)
+    reason[order[repeated]] = "repeated analysis"
+    reason[order[kept[overlap]]] = "overlapping flare"
+
+    dropped = flare_table[reason != ""].copy()
+    dropped["dropped_reason"] = reason[reason != ""]
+
+    return flare_table[reason == ""], dropped
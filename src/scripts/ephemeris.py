@@ -0,0 +1,150 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Module that computes the orbital phases of flares for the whole flare
+catalogue at once. Flare times are converted to BJD, joined with the
+ephemerides of all planets in each system, and folded with the transit
+midtime T0 and the orbital period P, propagating their uncertainties.
+
+Systems without a transit midtime are folded with T0 = 0 BJD, as in the
+coverage files, and get no phase uncertainty.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# BJD of zero in BKJD and BTJD
+MISSION_BJD_OFFSET = {"Kepler": 2454833., "TESS": 2457000.}
+
+
+def to_bjd(time, mission, abs_time=None):
+    """Convert mission times to BJD.
+
+    Parameters
+    ----------
+    time : array
+        Times in BKJD or BTJD.
+    mission : array
+        "Kepler" or "TESS" for every time.
+    abs_time : array, optional
+        Times already in BJD, e.g., `abs_tstart`. Used where finite.
+
+    Returns
+    -------
+    bjd : array
+        Times in BJD.
+    """
+    offset = pd.Series(np.asarray(mission, dtype=object)).map(MISSION_BJD_OFFSET)
+    bjd = np.asarray(time, dtype=float) + offset.to_numpy(float)
+
+    if abs_time is not None:
+        abs_time = np.asarray(abs_time, dtype=float)
+        bjd = np.where(np.isfinite(abs_time), abs_time, bjd)
+
+    return bjd
+
+
+def fold(bjd, t0, orbper, t0_err=0., orbper_err=0.):
+    """Fold times with an ephemeris, and propagate its uncertainties.
+
+    Parameters
+    ----------
+    bjd : array
+        Times in BJD.
+    t0, orbper : arrays
+        Transit midtime in BJD and orbital period in days.
+    t0_err, orbper_err : arrays, optional
+        Uncertainties on T0 and P. The default is 0.
+
+    Returns
+    -------
+    phase : array
+        Orbital phase between 0 and 1.
+    phase_err : array
+        Uncertainty on the phase: the uncertainty on T0, plus that on
+        P accumulated over the number of orbits since T0, in units of P.
+    """
+    cycles = (np.asarray(bjd) - t0) / orbper
+
+    phase = cycles % 1.
+    phase_err = np.sqrt(np.asarray(t0_err)**2 + (cycles * orbper_err)**2) / orbper
+
+    return phase, phase_err
+
+
+def get_ephemerides(res):
+    """Get the ephemerides of all planets in the results table.
+
+    Parameters
+    ----------
+    res : pandas.DataFrame
+        The results table, one row per planet.
+
+    Returns
+    -------
+    ephemerides : pandas.DataFrame
+        TIC, planet (numbered in the order of the results table),
+        orbper_d, orbper_d_err, t0, and t0_err. Systems without a
+        numeric TIC or orbital period are skipped.
+    """
+    def get_column(col):
+        return res[col].values if col in res.columns else np.nan
+
+    ephemerides = pd.DataFrame({"TIC": pd.to_numeric(res.TIC, errors="coerce").values,
+                                "orbper_d": res.orbper_d.values,
+                                "orbper_d_err": get_column("orbper_d_err"),
+                                "t0": get_column("pl_tranmid"),
+                                "t0_err": get_column("pl_tranmiderr1")})
+
+    ephemerides = ephemerides.dropna(subset=["TIC", "orbper_d"])
+    ephemerides["TIC"] = ephemerides.TIC.astype(np.int64)
+
+    # number the planets of each system
+    ephemerides["planet"] = ephemerides.groupby("TIC").cumcount()
+
+    return ephemerides.reset_index(drop=True)
+
+
+def get_orbital_phases(flares, ephemerides):
+    """Compute the orbital phases of all flares with respect to all
+    planets in their system.
+
+    Parameters
+    ----------
+    flares : pandas.DataFrame
+        Flare table with TIC, mission, tstart, and optionally abs_tstart.
+    ephemerides : pandas.DataFrame
+        Output of `get_ephemerides`.
+
+    Returns
+    -------
+    phases : pandas.DataFrame
+        One row per flare and planet, with the flare's index in
+        `flares` as `flare_index`, TIC, planet, orbital_phase, and
+        orbital_phase_err. Flares of systems without an ephemeris
+        are dropped.
+    """
+    abs_tstart = flares.abs_tstart if "abs_tstart" in flares.columns else None
+
+    times = pd.DataFrame({"flare_index": flares.index,
+                          "TIC": flares.TIC.to_numpy(np.int64),
+                          "bjd": to_bjd(flares.tstart, flares.mission, abs_tstart)})
+
+    # every flare with every planet of its system
+    phases = times.merge(ephemerides, on="TIC", how="inner")
+
+    # without T0, phase zero is at BJD = 0, and the phase is not constrained
+    has_t0 = phases.t0.notnull().values
+    t0 = phases.t0.fillna(0.).values
+
+    phase, phase_err = fold(phases.bjd.values, t0, phases.orbper_d.values,
+                            phases.t0_err.fillna(0.).values,
+                            phases.orbper_d_err.fillna(0.).values)
+
+    phases["orbital_phase"] = phase
+    phases["orbital_phase_err"] = np.where(has_t0, phase_err, np.nan)
+
+    return phases[["flare_index", "TIC", "planet", "orbital_phase", "orbital_phase_err"]]
@@ -0,0 +1,180 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Module that represents the observing coverage of a star as good-time
+intervals (GTIs) and folds them analytically into orbital phase space.
+
+The exposure per unit phase is piecewise constant, so the expected
+cumulative distribution of flare phases under a constant flare rate
+is piecewise linear, with breakpoints at the folded interval edges.
+Computing it costs O(number of gaps) instead of O(number of cadences),
+and it is exact at every phase, not only at the flare phases.
+"""
+
+import numpy as np
+
+
+def get_gtis(time, cadence, max_gap=None):
+    """Convert an array of observing times into good-time intervals.
+
+    Each cadence is assumed to cover the time from half a cadence before
+    to half a cadence after its time stamp. Consecutive cadences that are
+    separated by more than `max_gap` start a new interval.
+
+    Parameters
+    ----------
+    time : array-like
+        Time stamps of the valid cadences, in days.
+    cadence : float
+        Exposure time of a single cadence, in days.
+    max_gap : float, optional
+        Largest separation between two time stamps that still counts
+        as continuous coverage. The default is 1.5 cadences.
+
+    Returns
+    -------
+    gtis : (N, 2) array
+        Start and stop times of the good-time intervals.
+    """
+    if max_gap is None:
+        max_gap = 1.5 * cadence
+
+    # only finite times count, sorted in case light curves were stitched
+    time = np.asarray(time, dtype=float)
+    time = np.sort(time[np.isfinite(time)])
+
+    if len(time) == 0:
+        return np.empty((0, 2))
+
+    # indices where a new interval begins
+    breaks = np.where(np.diff(time) > max_gap)[0] + 1
+    starts = np.insert(breaks, 0, 0)
+    stops = np.append(breaks, len(time)) - 1
+
+    return np.column_stack([time[starts] - cadence / 2.,
+                            time[stops] + cadence / 2.])
+
+
+def merge_gtis(*gtis):
+    """Merge several sets of good-time intervals into one set of
+    non-overlapping, sorted intervals, e.g., to combine Kepler and
+    TESS coverage of the same star.
+
+    Parameters
+    ----------
+    gtis : (N, 2) arrays
+        Good-time intervals on the same time axis (e.g., BJD).
+
+    Returns
+    -------
+    merged : (M, 2) array
+        Sorted, non-overlapping good-time intervals.
+    """
+    gtis = np.concatenate([np.asarray(g, dtype=float).reshape(-1, 2)
+                           for g in gtis])
+
+    if len(gtis) == 0:
+        return gtis
+
+    gtis = gtis[np.argsort(gtis[:, 0], kind="stable")]
+
+    # an interval starts a new block if it begins after all previous ones end
+    running_stop = np.maximum.accumulate(gtis[:, 1])
+    new_block = np.insert(gtis[1:, 0] > running_stop[:-1], 0, True)
+
+    starts = gtis[new_block, 0]
+    stops = np.maximum.reduceat(gtis[:, 1], np.where(new_block)[0])
+
+    return np.column_stack([starts, stops])
+
+
+def fold_gtis(gtis, period, t0=0.):
+    """Fold good-time intervals into phase space and return the exact,
+    piecewise linear cumulative exposure distribution.
+
+    Parameters
+    ----------
+    gtis : (N, 2) array
+        Start and stop times of the good-time intervals, in days.
+    period : float
+        Period to fold with, in days.
+    t0 : float, optional
+        Reference time of phase zero, on the same time axis as `gtis`.
+        The default is 0.
+
+    Returns
+    -------
+    p : array
+        Phases of the breakpoints, from 0 to 1.
+    f : array
+        Cumulative fraction of the exposure time at the breakpoints,
+        from 0 to 1.
+    """
+    gtis = np.asarray(gtis, dtype=float).reshape(-1, 2)
+
+    # phase at the start of each interval, and its length in phase
+    start = ((gtis[:, 0] - t0) / period) % 1.
+    length = (gtis[:, 1] - gtis[:, 0]) / period
+
+    if length.sum() <= 0:
+        raise ValueError("Good-time intervals have no exposure.")
+
+    # full cycles cover all phases equally
+    n_full = np.floor(length)
+    base = n_full.sum()
+
+    # the rest of each interval is an arc that may wrap around phase 1
+    rest = length - n_full
+    stop = start + rest
+    wraps = stop > 1.
+
+    # arcs add exposure at their start and remove it at their stop,
+    # wrapping arcs are split into [start, 1] and [0, stop - 1]
+    x = np.concatenate([start, np.where(wraps, 1., stop),
+                        np.zeros(wraps.sum()), stop[wraps] - 1.,
+                        [0., 1.]])
+    w = np.concatenate([np.ones_like(start), -np.ones_like(stop),
+                        np.ones(wraps.sum()), -np.ones(wraps.sum()),
+                        [0., 0.]])
+
+    # sort the breakpoints, and sum up the steps in exposure density
+    order = np.argsort(x, kind="stable")
+    x, w = x[order], w[order]
+    density = base + np.cumsum(w)
+
+    # integrate the piecewise constant density
+    cum = np.concatenate([[0.], np.cumsum(density[:-1] * np.diff(x))])
+
+    # collapse duplicate breakpoints, keeping the last value at each phase
+    last = np.append(x[1:] != x[:-1], True)
+    p, f = x[last], cum[last]
+
+    return p, f / f[-1]
+
+
+def exposure_cdf(phases, gtis, period, t0=0.):
+    """Expected cumulative distribution of flare phases for a constant
+    flare rate, evaluated at arbitrary phases.
+
+    Parameters
+    ----------
+    phases : array-like
+        Phases between 0 and 1 to evaluate the distribution at.
+    gtis : (N, 2) array
+        Start and stop times of the good-time intervals, in days.
+    period : float
+        Period to fold with, in days.
+    t0 : float, optional
+        Reference time of phase zero. The default is 0.
+
+    Returns
+    -------
+    cdf : array
+        Fraction of the exposure time spent below each phase.
+    """
+    p, f = fold_gtis(gtis, period, t0=t0)
+
+    # linear interpolation is exact, because the distribution is piecewise linear
+    return np.interp(phases, p, f)
@@ -0,0 +1,132 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Module that fits power laws to the flare frequency distributions (FFDs)
+of all systems at once.
+
+The ED of all flares are sorted by TIC, and the maximum likelihood
+estimate of the power law exponent alpha is computed from segmented sums
+over the systems (`np.add.reduceat`). The uncertainty on alpha comes
+from bootstrapping all systems at once, in batches of resamples, as half
+the 16th to 84th percentile range of the resampled alphas. The
+flare rate above the minimum ED is the number of flares divided by the
+total observing time of the system.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def get_observing_time(flare_table):
+    """Total observing time of every system in days.
+
+    Parameters
+    ----------
+    flare_table : pandas.DataFrame
+        Flare table with TIC, mission, quarter_or_sector, and
+        total_time_observed_in_lc_days.
+
+    Returns
+    -------
+    tobs : pandas.Series
+        Observing time, indexed by TIC.
+    """
+    lcs = flare_table.drop_duplicates(subset=["TIC", "mission", "quarter_or_sector"])
+    return lcs.groupby("TIC").total_time_observed_in_lc_days.sum()
+
+
+def get_alpha(logsum, n):
+    """Unbiased maximum likelihood estimate of the power law exponent from
+    the sum of log(ED / ED_min) of n flares. NaN for fewer than two flares."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(n > 1, 1. + (n - 1.) / logsum, np.nan)
+
+
+def fit_powerlaws(tic, ed, ed_min=None, tobs=None, nboot=1000, batchsize=100,
+                  rng=None):
+    """Fit power laws to the FFDs of all systems.
+
+    Parameters
+    ----------
+    tic : array
+        TIC of every flare.
+    ed : array
+        ED of every flare in s.
+    ed_min : float, optional
+        Minimum ED in s. Flares below it are ignored. The default is
+        the smallest ED in each system.
+    tobs : pandas.Series, optional
+        Observing time in days, indexed by TIC. Without it, the rate
+        is not computed.
+    nboot : int, optional
+        Number of bootstrap resamples. The default is 1000.
+    batchsize : int, optional
+        Number of resamples drawn at once. The default is 100.
+    rng : numpy.random.Generator or int, optional
+        Random number generator or seed.
+
+    Returns
+    -------
+    fits : pandas.DataFrame
+        TIC, n_flares, ed_min, alpha, alpha_err, rate, and rate_err
+        per system, with rates in flares per day.
+    """
+    rng = np.random.default_rng(rng)
+
+    tic = np.asarray(tic, dtype=np.int64)
+    ed = np.asarray(ed, dtype=float)
+
+    # only flares with a measured ED, above the minimum
+    valid = np.isfinite(ed) & (ed > 0)
+    if ed_min is not None:
+        valid &= ed >= ed_min
+    tic, ed = tic[valid], ed[valid]
+
+    # sort by TIC, and get the offsets of the systems
+    order = np.argsort(tic, kind="stable")
+    tic, ed = tic[order], ed[order]
+    tics, starts, n = np.unique(tic, return_index=True, return_counts=True)
+    seg = np.repeat(np.arange(len(tics)), n)
+
+    # minimum ED of every system
+    if ed_min is None:
+        edmin = np.minimum.reduceat(ed, starts) if len(ed) > 0 else ed
+    else:
+        edmin = np.full(len(tics), float(ed_min))
+
+    # maximum likelihood estimate
+    logratio = np.log(ed / edmin[seg])
+    logsum = np.add.reduceat(logratio, starts) if len(ed) > 0 else logratio
+    alpha = get_alpha(logsum, n)
+
+    # bootstrap: resample the flares of every system, in batches
+    first, nseg = starts[seg], n[seg].astype(np.float32)
+    alphas = []
+    for i in range(0, nboot, batchsize):
+        size = min(batchsize, nboot - i)
+        idx = first + (rng.random((size, len(ed)), dtype=np.float32) * nseg).astype(np.int64)
+        sums = np.add.reduceat(logratio[idx], starts, axis=1)
+        alphas.append(get_alpha(sums, n))
+
+    # resamples of only the smallest flare give infinite alpha,
+    # so take half the 16th to 84th percentile range instead of the std
+    if len(alphas) > 0:
+        low, high = np.percentile(np.concatenate(alphas), [16, 84], axis=0)
+        alpha_err = (high - low) / 2.
+    else:
+        alpha_err = np.nan
+
+    fits = pd.DataFrame({"TIC": tics, "n_flares": n, "ed_min": edmin,
+                         "alpha": alpha, "alpha_err": alpha_err})
+
+    # rate of flares above the minimum ED, with Poisson uncertainties
+    if tobs is not None:
+        t = tobs.reindex(tics).to_numpy(float)
+        fits["rate"] = n / t
+        fits["rate_err"] = np.sqrt(n) / t
+    else:
+        fits["rate"], fits["rate_err"] = np.nan, np.nan
+
+    return fits
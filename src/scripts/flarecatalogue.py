@@ -0,0 +1,319 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Module that keeps the flare table as a typed, columnar binary catalogue,
+so that scripts do not re-parse `PAPER_flare_table.csv` on every run.
+
+Each column is stored as its own `.npy` file in `src/data/flare_catalogue`,
+with the dtype declared in `schema.py`. TIC is an integer, times and
+fluxes are float64, and string columns like mission and ID are
+dictionary-encoded as integer codes with a list of categories. The loader memory-maps only the requested columns. The
+aliases and exclusions from `aliases.py` are applied when the catalogue
+is built, and it is rebuilt automatically when the CSV or the registry
+changes.
+
+The catalogue is sorted by TIC, so it can be processed out of core:
+`iter_flare_table` yields chunks that never split a system, and
+`load_system` reads only the rows of one system. The CSV is converted
+in chunks, too, only the sort keys are held in memory at once.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+import paths
+
+from aliases import apply_aliases, get_registry
+from schema import COLUMNS
+
+
+# location of the source table and the binary catalogue
+FLARE_TABLE_CSV = paths.data / "PAPER_flare_table.csv"
+CATALOGUE_DIR = paths.data / "flare_catalogue"
+
+# the catalogue is sorted by these columns
+SORT_BY = ["TIC", "mission", "quarter_or_sector", "tstart"]
+
+
+def get_source_signature(csv=FLARE_TABLE_CSV):
+    """Size and modification time of the source table, and the alias
+    registry, to tell whether the catalogue is out of date without
+    reading the table."""
+    stat = csv.stat()
+    return {"source": csv.name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+            "registry": get_registry()}
+
+
+def get_catalogue_dtype(col, values):
+    """Dtype of a column in the catalogue, from its declaration in the
+    schema registry. String columns are dictionary-encoded as
+    "category", and TIC is an integer once the aliases are applied.
+    Columns outside the registry are stored as floats or categories,
+    depending on the sample values.
+    """
+    if col == "TIC":
+        return "int64"
+    if col in COLUMNS:
+        dtype = COLUMNS[col]["dtype"]
+        return "category" if dtype == "str" else dtype
+    return "float64" if pd.api.types.is_numeric_dtype(values) else "category"
+
+
+def read_meta(outdir=CATALOGUE_DIR):
+    """Read the metadata of the catalogue, or None if there is none."""
+    path = outdir / "meta.json"
+    if not path.exists():
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def encode(values, categories):
+    """Dictionary-encode string values.
+
+    Parameters
+    ----------
+    values : pandas.Series
+        Values to encode, missing values get the code -1.
+    categories : dict
+        Maps every category to its code. New categories are added
+        in place, in the order they appear.
+
+    Returns
+    -------
+    codes : int32 array
+        The codes of the values.
+    """
+    strings = values[values.notnull()].astype(str)
+    for category in pd.unique(strings):
+        categories.setdefault(category, len(categories))
+
+    codes = np.full(len(values), -1, dtype=np.int32)
+    codes[values.notnull().to_numpy()] = strings.map(categories).to_numpy(np.int32)
+    return codes
+
+
+def build_flare_catalogue(csv=FLARE_TABLE_CSV, outdir=CATALOGUE_DIR, chunksize=500000):
+    """Convert the flare table to the typed columnar catalogue, reading
+    the table in chunks.
+
+    Parameters
+    ----------
+    csv : pathlib.Path, optional
+        Path to the flare table.
+    outdir : pathlib.Path, optional
+        Folder for the catalogue.
+    chunksize : int, optional
+        Number of rows read at once. The default is 500000.
+
+    Returns
+    -------
+    meta : dict
+        Metadata of the catalogue: source signature, number of rows,
+        dtypes, and categories.
+    """
+    head = pd.read_csv(csv, nrows=1000)
+    dtypes = {col: get_catalogue_dtype(col, head[col]) for col in head.columns}
+    strings = {col: str for col, dtype in dtypes.items() if dtype == "category"}
+    strings["TIC"] = str
+
+    # count the rows, and check the TICs
+    nrows = 0
+    for chunk in pd.read_csv(csv, usecols=["TIC", "ID"], dtype=str, chunksize=chunksize):
+        nrows += apply_aliases(chunk).shape[0]
+
+    outdir.mkdir(parents=True, exist_ok=True)
+
+    # write the columns in the order of the CSV to temporary files
+    unsorted = {col: np.lib.format.open_memmap(outdir / f"{col}.unsorted.npy", mode="w+",
+                                               dtype=np.int32 if dtype == "category" else dtype,
+                                               shape=(nrows,))
+                for col, dtype in dtypes.items()}
+    categories = {col: {} for col, dtype in dtypes.items() if dtype == "category"}
+
+    start = 0
+    for chunk in pd.read_csv(csv, dtype=strings, chunksize=chunksize):
+        chunk = apply_aliases(chunk)
+        stop = start + chunk.shape[0]
+        for col, dtype in dtypes.items():
+            if dtype == "category":
+                unsorted[col][start:stop] = encode(chunk[col], categories[col])
+            else:
+                unsorted[col][start:stop] = chunk[col].to_numpy(dtype)
+        start = stop
+
+    # sort all columns by the sort keys
+    order = np.lexsort([unsorted[col] for col in SORT_BY[::-1]])
+
+    for col, values in unsorted.items():
+        out = np.lib.format.open_memmap(outdir / f"{col}.npy", mode="w+",
+                                        dtype=values.dtype, shape=(nrows,))
+        for i in range(0, nrows, chunksize):
+            out[i:i + chunksize] = values[order[i:i + chunksize]]
+        out.flush()
+        del out
+
+    del unsorted
+    for col in dtypes:
+        (outdir / f"{col}.unsorted.npy").unlink()
+
+    meta = {"signature": get_source_signature(csv), "nrows": nrows,
+            "columns": list(dtypes), "dtypes": dtypes,
+            "categories": {col: list(c) for col, c in categories.items()}}
+
+    with open(outdir / "meta.json", "w") as f:
+        json.dump(meta, f, indent=1)
+
+    return meta
+
+
+def get_catalogue(csv=FLARE_TABLE_CSV, outdir=CATALOGUE_DIR):
+    """Get the metadata of an up-to-date catalogue, building it if needed."""
+    meta = read_meta(outdir)
+    if (meta is None) or (meta["signature"] != get_source_signature(csv)):
+        print(f"Build flare catalogue from {csv.name}")
+        meta = build_flare_catalogue(csv, outdir)
+    return meta
+
+
+def read_column(col, meta, outdir=CATALOGUE_DIR, rows=slice(None)):
+    """Read a column of the catalogue from the memory map.
+
+    Parameters
+    ----------
+    col : str
+        Column name.
+    meta : dict
+        Metadata of the catalogue.
+    outdir : pathlib.Path, optional
+        Folder of the catalogue.
+    rows : slice or array, optional
+        Rows to read. The default is all rows.
+
+    Returns
+    -------
+    values : array or pandas.Categorical
+        The column values.
+    """
+    values = np.load(outdir / f"{col}.npy", mmap_mode="r")[rows]
+
+    if meta["dtypes"][col] == "category":
+        return pd.Categorical.from_codes(values, categories=meta["categories"][col])
+
+    return values
+
+
+def load_flare_table(columns=None, csv=FLARE_TABLE_CSV, outdir=CATALOGUE_DIR):
+    """Load the flare table from the binary catalogue, reading only the
+    requested columns.
+
+    Parameters
+    ----------
+    columns : list of str, optional
+        Columns to read. The default is all columns.
+    csv : pathlib.Path, optional
+        Path to the flare table the catalogue is built from.
+    outdir : pathlib.Path, optional
+        Folder of the catalogue.
+
+    Returns
+    -------
+    flare_table : pandas.DataFrame
+        The flare table, sorted by TIC, mission, quarter_or_sector,
+        and tstart.
+    """
+    meta = get_catalogue(csv, outdir)
+
+    if columns is None:
+        columns = meta["columns"]
+
+    return pd.DataFrame({col: read_column(col, meta, outdir) for col in columns})
+
+
+def read_rows(meta, rows, columns=None, outdir=CATALOGUE_DIR):
+    """Read a range of rows of the catalogue into a DataFrame that keeps
+    the row numbers as index."""
+    if columns is None:
+        columns = meta["columns"]
+
+    return pd.DataFrame({col: read_column(col, meta, outdir, rows) for col in columns},
+                        index=pd.RangeIndex(rows.start, rows.stop))
+
+
+def get_system_rows(tic, outdir=CATALOGUE_DIR):
+    """Range of rows of a system in the catalogue. Since the catalogue
+    is sorted by TIC, only a binary search on the memory-mapped TIC
+    column is needed. TICs that are not integers have no rows.
+    """
+    tic = pd.to_numeric(pd.Series([tic]), errors="coerce")[0]
+    if np.isnan(tic):
+        return slice(0, 0)
+
+    tics = np.load(outdir / "TIC.npy", mmap_mode="r")
+    return slice(int(np.searchsorted(tics, tic, side="left")),
+                 int(np.searchsorted(tics, tic, side="right")))
+
+
+def load_system(tic, columns=None, csv=FLARE_TABLE_CSV, outdir=CATALOGUE_DIR):
+    """Load the rows of a single system from the catalogue.
+
+    Parameters
+    ----------
+    tic : int or str
+        TIC of the system.
+    columns : list of str, optional
+        Columns to read. The default is all columns.
+    csv : pathlib.Path, optional
+        Path to the flare table the catalogue is built from.
+    outdir : pathlib.Path, optional
+        Folder of the catalogue.
+
+    Returns
+    -------
+    flare_table : pandas.DataFrame
+        The rows of the system, empty if there are none.
+    """
+    meta = get_catalogue(csv, outdir)
+    return read_rows(meta, get_system_rows(tic, outdir), columns, outdir)
+
+
+def iter_flare_table(columns=None, chunksize=500000, csv=FLARE_TABLE_CSV,
+                     outdir=CATALOGUE_DIR):
+    """Iterate over the catalogue in chunks that never split a system,
+    so that group-bys by TIC, or by TIC and quarter or sector, can be
+    done chunk by chunk.
+
+    Parameters
+    ----------
+    columns : list of str, optional
+        Columns to read. The default is all columns.
+    chunksize : int, optional
+        Number of rows per chunk. A chunk is extended to the end of
+        its last system. The default is 500000.
+    csv : pathlib.Path, optional
+        Path to the flare table the catalogue is built from.
+    outdir : pathlib.Path, optional
+        Folder of the catalogue.
+
+    Yields
+    ------
+    chunk : pandas.DataFrame
+        Rows of the catalogue, indexed by row number.
+    """
+    meta = get_catalogue(csv, outdir)
+    tics = np.load(outdir / "TIC.npy", mmap_mode="r")
+    nrows = meta["nrows"]
+
+    start = 0
+    while start < nrows:
+
+        # extend the chunk to the last row of its last system
+        stop = min(start + chunksize, nrows)
+        stop = int(np.searchsorted(tics, tics[stop - 1], side="right"))
+
+        yield read_rows(meta, slice(start, stop), columns, outdir)
+        start = stop
@@ -0,0 +1,116 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Module that characterizes all flares of a light curve at once: equivalent
+duration (ED), its uncertainty, and the relative amplitude with its
+uncertainty. Instead of looping over flares, the per-cadence quantities
+are reduced over all flare windows with segmented reductions
+(`np.add.reduceat` and friends).
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def get_indices(time, tstart, tstop):
+    """Convert flare start and stop times to indices in a light curve.
+
+    Times are matched to the nearest cadence within half a cadence,
+    so that rounding in a text table does not shift the flares.
+
+    Parameters
+    ----------
+    time : array
+        Sorted time stamps of the light curve.
+    tstart, tstop : arrays
+        Start and stop times of the flares, on the same time axis.
+
+    Returns
+    -------
+    istart, istop : int arrays
+        Index of the first flare cadence, and index after the last
+        flare cadence.
+    """
+    tol = np.nanmedian(np.diff(time)) / 2.
+
+    istart = np.searchsorted(time, np.asarray(tstart) - tol, side="left")
+    istop = np.searchsorted(time, np.asarray(tstop) + tol, side="right")
+    return istart, istop
+
+
+def characterize_flares(time, rel_flux, rel_flux_err, istart, istop):
+    """Measure ED, ED uncertainty, relative amplitude, and its uncertainty
+    for all flares of a light curve at once.
+
+    The ED is the trapezoidal integral of the relative flux from the first
+    flare cadence to the cadence after the last one, where available.
+
+    Parameters
+    ----------
+    time : array
+        Time stamps in days.
+    rel_flux : array
+        Detrended flux relative to the quiescent flux, minus one.
+    rel_flux_err : array
+        Uncertainty on the relative flux.
+    istart, istop : int arrays
+        Index of the first flare cadence, and index after the last
+        flare cadence, for every flare.
+
+    Returns
+    -------
+    flares : pandas.DataFrame
+        ED and ED_err in seconds, rel_amplitude, and rel_amplitude_err,
+        one row per flare.
+    """
+    n = len(time)
+    nflares = len(istart)
+
+    # every flare covers at least one cadence inside the light curve
+    istart = np.clip(np.asarray(istart, dtype=np.int64), 0, n - 1)
+    istop = np.maximum(np.asarray(istop, dtype=np.int64), istart + 1)
+
+    if nflares == 0:
+        return pd.DataFrame(columns=["ED", "ED_err", "rel_amplitude",
+                                     "rel_amplitude_err"], dtype=float)
+
+    # per-cadence contributions, in seconds; the last value is padding
+    # so that segments can end at the end of the light curve
+    dt = np.nan_to_num(np.append(np.diff(time), 0.)) * 86400.
+
+    # do not integrate across gaps in the light curve
+    dt[dt > 1.5 * np.median(dt[dt > 0])] = 0.
+    rel = np.nan_to_num(rel_flux)
+    err = np.nan_to_num(rel_flux_err)
+    area = np.append((rel[:-1] + rel[1:]) / 2. * dt[:-1], [0., 0.])
+    var = np.append((err * dt) ** 2, 0.)
+
+    # integrate up to the cadence after the flare, but not beyond the end
+    iend = np.minimum(istop, n - 1)
+    iend = np.maximum(iend, istart + 1)
+
+    # sum over all flare windows at once, taking every other segment
+    idx = np.column_stack([istart, iend]).ravel()
+    ED = np.add.reduceat(area, idx)[::2]
+    ED_err = np.sqrt(np.add.reduceat(var, idx)[::2])
+
+    # peak of every flare
+    idx = np.column_stack([istart, istop]).ravel()
+    peak = np.maximum.reduceat(np.append(rel, 0.), idx)[::2]
+
+    # find the index of the peak: mark all cadences of each flare
+    lengths = istop - istart
+    seg = np.repeat(np.arange(nflares), lengths)
+    cadences = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    cadences += np.repeat(istart, lengths)
+
+    # first cadence in each flare that reaches the peak
+    at_peak = rel[cadences] == peak[seg]
+    _, first = np.unique(seg[at_peak], return_index=True)
+    ipeak = cadences[at_peak][first]
+
+    return pd.DataFrame({"ED": ED, "ED_err": ED_err,
+                         "rel_amplitude": peak,
+                         "rel_amplitude_err": err[ipeak]})
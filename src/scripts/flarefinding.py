@@ -0,0 +1,346 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Module that finds flares in the cached light curves and returns them
+in the schema of `PAPER_flare_table.csv`.
+
+Light curves are read from the memory-mapped FITS files in chunks. Each
+chunk is detrended with a rolling median, candidates are flagged against
+a rolling robust scatter with the criteria from Chang et al. (2015), and
+runs of consecutive outliers are found with vectorized run-length logic.
+Chunks overlap by as much as the rolling windows need, so the result does
+not depend on the chunk size. Runs that reach the end of a chunk are
+carried over to the next one, so memory is bounded by the chunk size
+and the longest flare.
+"""
+
+import datetime
+
+import numpy as np
+import pandas as pd
+from astropy.io import fits
+
+from flarecharacterization import characterize_flares
+from lightcurves import get_bjd_offset, get_mission, is_flagged, read_light_curve
+
+
+# columns of the flare table, in order
+FLARE_TABLE_COLUMNS = ["TIC", "ID", "mission", "quarter_or_sector", "timestamp",
+                       "total_time_observed_in_lc_days", "orbital_phase",
+                       "orbital_phase_err", "rel_amplitude", "rel_amplitude_err",
+                       "tstart", "tstop", "ED", "ED_err", "abs_tstart"]
+
+
+def rolling_median(flux, window):
+    """Centered rolling median that ignores NaNs.
+
+    Parameters
+    ----------
+    flux : array
+        Flux array.
+    window : int
+        Window size in cadences.
+
+    Returns
+    -------
+    trend : array
+        The rolling median of the flux.
+    """
+    return pd.Series(flux).rolling(window, center=True, min_periods=1).median().values
+
+
+def find_runs(mask, n_min):
+    """Find runs of at least `n_min` consecutive True values.
+
+    Parameters
+    ----------
+    mask : bool array
+        Flagged cadences.
+    n_min : int
+        Minimum length of a run.
+
+    Returns
+    -------
+    starts, stops : int arrays
+        Start and stop indices of the runs, stops are exclusive.
+    """
+    edges = np.diff(np.concatenate([[0], mask.astype(np.int8), [0]]))
+    starts = np.where(edges == 1)[0]
+    stops = np.where(edges == -1)[0]
+
+    keep = (stops - starts) >= n_min
+    return starts[keep], stops[keep]
+
+
+def flag_candidates(rel_flux, rel_flux_err, sigma, N1=3, N2=2):
+    """Flag flare candidates following Chang et al. (2015).
+
+    Parameters
+    ----------
+    rel_flux : array
+        Detrended flux relative to the quiescent flux, minus one.
+    rel_flux_err : array
+        Uncertainty on the relative flux.
+    sigma : array
+        Local scatter of the relative flux.
+    N1 : float, optional
+        Minimum excess in units of the scatter. The default is 3.
+    N2 : float, optional
+        Minimum excess minus the flux uncertainty in units of
+        the scatter. The default is 2.
+
+    Returns
+    -------
+    flags : bool array
+        True for candidate cadences.
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (rel_flux / sigma > N1) & ((rel_flux - rel_flux_err) / sigma > N2)
+
+
+def get_window_size(window_days, cadence):
+    """Odd number of cadences in the rolling median window, at least 3."""
+    return max(int(np.round(window_days / cadence)) // 2 * 2 + 1, 3)
+
+
+def detrend_and_flag(flux, flux_err, window, N1=3, N2=2):
+    """Detrend a flux array with a rolling median, and flag flare candidates
+    against the rolling robust scatter of the detrended flux.
+
+    Parameters
+    ----------
+    flux, flux_err : arrays
+        Flux and uncertainty, invalid cadences are NaN.
+    window : int
+        Window size in cadences.
+    N1, N2 : float, optional
+        Detection thresholds, see `flag_candidates`.
+
+    Returns
+    -------
+    rel_flux, rel_flux_err : arrays
+        Detrended relative flux minus one, and its uncertainty.
+    flags : bool array
+        True for candidate cadences.
+    """
+    trend = rolling_median(flux, window)
+    rel_flux = flux / trend - 1.
+    rel_flux_err = flux_err / trend
+
+    # local robust scatter
+    sigma = 1.4826 * rolling_median(np.abs(rel_flux), window)
+
+    flags = flag_candidates(rel_flux, rel_flux_err, sigma, N1=N1, N2=N2)
+
+    return rel_flux, rel_flux_err, flags
+
+
+def read_detrended(path, window_days=0.25):
+    """Read a whole cached light curve, and detrend it the same way
+    as `find_flares_in_file` does.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        Path to the light curve FITS file.
+    window_days : float, optional
+        Width of the rolling median window in days. The default is 0.25.
+
+    Returns
+    -------
+    time, rel_flux, rel_flux_err : arrays
+        Time on the mission time axis, detrended relative flux minus
+        one, and its uncertainty. Invalid cadences have NaN flux.
+    """
+    time, flux, flux_err, cadence = read_light_curve(path)
+
+    window = get_window_size(window_days, cadence)
+    rel_flux, rel_flux_err, _ = detrend_and_flag(flux, flux_err, window)
+
+    return time, rel_flux, rel_flux_err
+
+
+def find_flares_in_arrays(time, flux, flux_err, cadence, window_days=0.25,
+                          N1=3, N2=2, N3=3):
+    """Find flares in a light curve that is already in memory, e.g.,
+    after injecting synthetic flares.
+
+    Parameters
+    ----------
+    time, flux, flux_err : arrays
+        Light curve, invalid cadences have NaN flux.
+    cadence : float
+        Exposure time of a single cadence, in days.
+    window_days : float, optional
+        Width of the rolling median window in days. The default is 0.25.
+    N1, N2, N3 : float, float, int, optional
+        Detection thresholds, see `find_flares_in_file`.
+
+    Returns
+    -------
+    flares : pandas.DataFrame
+        istart, istop, tstart, tstop, rel_amplitude, rel_amplitude_err,
+        ED, and ED_err of the flares.
+    """
+    window = get_window_size(window_days, cadence)
+    rel_flux, rel_flux_err, flags = detrend_and_flag(flux, flux_err, window,
+                                                     N1=N1, N2=N2)
+
+    starts, stops = find_runs(flags, N3)
+
+    flares = characterize_flares(time, rel_flux, rel_flux_err, starts, stops)
+    flares["istart"] = starts
+    flares["istop"] = stops
+    flares["tstart"] = time[starts]
+    flares["tstop"] = time[stops - 1]
+
+    return flares
+
+
+def find_flares_in_file(path, window_days=0.25, chunksize=100000,
+                        N1=3, N2=2, N3=3):
+    """Find flares in a cached light curve, reading it in chunks.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        Path to the light curve FITS file.
+    window_days : float, optional
+        Width of the rolling median window in days. The default is 0.25.
+    chunksize : int, optional
+        Number of cadences per chunk. The default is 100000.
+    N1, N2, N3 : float, float, int, optional
+        Detection thresholds, N3 is the minimum number of consecutive
+        candidate cadences. The defaults are 3, 2, and 3.
+
+    Returns
+    -------
+    flares : pandas.DataFrame
+        tstart, tstop, abs_tstart, rel_amplitude, rel_amplitude_err,
+        ED, and ED_err of the flares.
+    total_time : float
+        Total time observed in days, from the number of valid cadences.
+    """
+    with fits.open(path, memmap=True) as hdul:
+        header, data = hdul[1].header, hdul[1].data
+
+        cadence = header["TIMEDEL"]
+        offset = get_bjd_offset(header)
+        mission = get_mission(path, header)
+        nrows = len(data)
+
+        # window size in cadences, and the overlap that the trend
+        # and the scatter need together
+        window = get_window_size(window_days, cadence)
+        overlap = 2 * (window // 2)
+
+        flares, nvalid, carry = [], 0, None
+
+        for start in range(0, nrows, chunksize):
+            stop = min(start + chunksize, nrows)
+
+            # read the chunk with enough overlap for exact rolling medians
+            lo, hi = max(start - overlap, 0), min(stop + overlap, nrows)
+            rows = data[lo:hi]
+            time = np.array(rows["TIME"], dtype=float)
+            flux = np.array(rows["PDCSAP_FLUX"], dtype=float)
+            flux_err = np.array(rows["PDCSAP_FLUX_ERR"], dtype=float)
+
+            valid = np.isfinite(time) & np.isfinite(flux) & ~is_flagged(rows["QUALITY"], mission)
+            flux[~valid] = np.nan
+
+            # detrend and flag candidates
+            rel_flux, rel_flux_err, flags = detrend_and_flag(flux, flux_err, window,
+                                                             N1=N1, N2=N2)
+
+            # keep only the core of the chunk
+            core = slice(start - lo, stop - lo)
+            time, valid = time[core], valid[core]
+            rel_flux, rel_flux_err, flags = rel_flux[core], rel_flux_err[core], flags[core]
+            nvalid += valid.sum()
+
+            # prepend a run that was still open at the end of the last chunk
+            if carry is not None:
+                time, rel_flux, rel_flux_err, flags = [
+                    np.concatenate([c, a]) for c, a in
+                    zip(carry, [time, rel_flux, rel_flux_err, flags])]
+
+            starts, stops = find_runs(flags, 1)
+
+            # carry over a run that is still open at the end of the chunk
+            carry = None
+            if (len(stops) > 0) and (stops[-1] == len(flags)) and (stop < nrows):
+                carry = [a[starts[-1]:] for a in [time, rel_flux, rel_flux_err, flags]]
+                starts, stops = starts[:-1], stops[:-1]
+
+            # apply the minimum number of consecutive cadences
+            long_enough = (stops - starts) >= N3
+            starts, stops = starts[long_enough], stops[long_enough]
+
+            if len(starts) == 0:
+                continue
+
+            # characterize all flares of the chunk at once
+            chunk_flares = characterize_flares(time, rel_flux, rel_flux_err,
+                                               starts, stops)
+            chunk_flares["tstart"] = time[starts]
+            chunk_flares["tstop"] = time[stops - 1]
+            flares.append(chunk_flares)
+
+    if len(flares) > 0:
+        flares = pd.concat(flares, ignore_index=True)
+    else:
+        flares = pd.DataFrame(columns=["tstart", "tstop", "rel_amplitude",
+                                       "rel_amplitude_err", "ED", "ED_err"],
+                              dtype=float)
+
+    flares["abs_tstart"] = flares.tstart + offset
+
+    return flares, nvalid * cadence
+
+
+def find_flares(tic, ID, mission, quarter_or_sector, lcpaths, **kwargs):
+    """Find flares in all files of a light curve, and return them as
+    rows of the flare table. A light curve without flares gets one
+    row with empty flare columns.
+
+    Parameters
+    ----------
+    tic : int
+        TIC of the star.
+    ID : str
+        Name of the star.
+    mission : str
+        "Kepler" or "TESS".
+    quarter_or_sector : int
+        Kepler quarter or TESS sector.
+    lcpaths : list of pathlib.Path
+        Cached files of the light curve.
+    kwargs : dict
+        Passed to `find_flares_in_file`.
+
+    Returns
+    -------
+    flare_table : pandas.DataFrame
+        Rows in the schema of `PAPER_flare_table.csv`. Orbital phases
+        are left empty.
+    """
+    results = [find_flares_in_file(path, **kwargs) for path in lcpaths]
+
+    flares = pd.concat([r[0] for r in results], ignore_index=True)
+    total_time = np.sum([r[1] for r in results])
+
+    # light curves without flares still count as searched
+    if flares.shape[0] == 0:
+        flares = pd.DataFrame({"tstart": [np.nan]})
+
+    flares["TIC"] = tic
+    flares["ID"] = ID
+    flares["mission"] = mission
+    flares["quarter_or_sector"] = quarter_or_sector
+    flares["timestamp"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    flares["total_time_observed_in_lc_days"] = total_time
+
+    return flares.reindex(columns=FLARE_TABLE_COLUMNS)
@@ -0,0 +1,112 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Module that indexes the flares of many systems at once. All flares are
+sorted by TIC and orbital phase in a single sort, and the offsets of each
+system into the sorted arrays are kept. The cumulative distributions
+(ECDFs) of all systems are computed in one segmented pass, so that the
+phases and the ECDF of any system are slices of the same arrays.
+"""
+
+import numpy as np
+
+
+def get_segmented_ecdf(values, offsets):
+    """ECDFs of all segments of an array at once.
+
+    Each ECDF is padded with (0, 0) at the start and (1, 1) at the
+    end, as in the cumulative distribution plots.
+
+    Parameters
+    ----------
+    values : array
+        Values sorted within each segment, e.g., orbital phases.
+    offsets : int array
+        Start index of each segment, and the length of `values`
+        as the last entry.
+
+    Returns
+    -------
+    x, y : arrays
+        Padded values and cumulative fractions of all segments.
+    pad_offsets : int array
+        Offsets of the segments in `x` and `y`.
+    """
+    counts = np.diff(offsets)
+    nseg = len(counts)
+
+    # rank of every value within its segment
+    seg = np.repeat(np.arange(nseg), counts)
+    rank = np.arange(len(values)) - offsets[seg] + 1
+
+    # every segment gets two more entries
+    pad_offsets = offsets + 2 * np.arange(nseg + 1)
+    x = np.empty(pad_offsets[-1])
+    y = np.empty(pad_offsets[-1])
+
+    # padding at the start and the end of each segment
+    x[pad_offsets[:-1]], y[pad_offsets[:-1]] = 0., 0.
+    x[pad_offsets[1:] - 1], y[pad_offsets[1:] - 1] = 1., 1.
+
+    # the values in between
+    idx = np.arange(len(values)) + 2 * seg + 1
+    x[idx] = values
+    y[idx] = rank / counts[seg]
+
+    return x, y, pad_offsets
+
+
+class FlareIndex:
+    """Flares of many systems sorted by TIC and phase, with the
+    offsets of each system and the ECDFs of all systems.
+
+    Parameters
+    ----------
+    tic : array
+        TIC of every flare.
+    phase : array
+        Orbital phase of every flare.
+    """
+
+    def __init__(self, tic, phase):
+        tic = np.asarray(tic, dtype=np.int64)
+        phase = np.asarray(phase, dtype=float)
+
+        # one sort for all systems
+        order = np.lexsort([phase, tic])
+        self.tic, self.phase = tic[order], phase[order]
+
+        # offsets of each system into the sorted arrays
+        self.tics, starts = np.unique(self.tic, return_index=True)
+        self.offsets = np.append(starts, len(self.tic))
+
+        # look up systems by TIC as a string, as in the results table
+        self.lookup = {str(t): i for i, t in enumerate(self.tics)}
+
+        # ECDFs of all systems
+        self.x, self.y, self.pad_offsets = get_segmented_ecdf(self.phase, self.offsets)
+
+    def count(self, tic):
+        """Number of flares of a system, zero if it has none."""
+        i = self.lookup.get(str(tic))
+        if i is None:
+            return 0
+        return self.offsets[i + 1] - self.offsets[i]
+
+    def get_phases(self, tic):
+        """Sorted phases of the flares of a system."""
+        i = self.lookup.get(str(tic))
+        if i is None:
+            return self.phase[:0]
+        return self.phase[self.offsets[i]:self.offsets[i + 1]]
+
+    def get_ecdf(self, tic):
+        """Padded phases and cumulative fractions of the flares of
+        a system, empty if it has no flares."""
+        i = self.lookup.get(str(tic))
+        if i is None:
+            return self.x[:0], self.y[:0]
+        s = slice(self.pad_offsets[i], self.pad_offsets[i + 1])
+        return self.x[s], self.y[s]
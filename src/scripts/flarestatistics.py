@@ -0,0 +1,120 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Module that accumulates the statistics of the flare table that go into
+the manuscript, i.e., the numbers of flares, systems, and light curves,
+in a single streaming pass over the flare catalogue.
+
+The state of the accumulator can be saved and loaded again, so that the
+statistics can be updated with newly appended light curves without
+reading the whole table again.
+"""
+
+import json
+
+import numpy as np
+
+import paths
+
+
+# state of the accumulator
+STATISTICS_PATH = paths.data / "flare_table_statistics.json"
+
+
+def get_light_curve_keys(chunk):
+    """Identify the light curve of every row by TIC, mission, and
+    quarter or sector, e.g., "277539431_TESS_12"."""
+    return (chunk.TIC.astype(np.int64).astype(str) + "_" +
+            chunk.mission.astype(str) + "_" +
+            chunk.quarter_or_sector.astype(str))
+
+
+class FlareTableStatistics:
+    """Accumulate the numbers of flares, systems, and light curves in
+    the flare table, chunk by chunk.
+
+    Light curves are counted once. Rows of light curves that were
+    already counted are skipped, so that appended light curves can be
+    added to a saved state.
+    """
+
+    def __init__(self):
+        self.n_rows = 0
+        self.n_flares = 0
+        self.systems = set()
+        self.systems_with_flares = set()
+        self.light_curves = set()
+        self.light_curves_without_flares = set()
+
+    def update(self, chunk):
+        """Add the rows of a chunk of the flare table.
+
+        Parameters
+        ----------
+        chunk : pandas.DataFrame
+            Rows of the flare table with TIC, mission, quarter_or_sector,
+            and tstart. All rows of a light curve must be in one chunk.
+        """
+        keys = get_light_curve_keys(chunk)
+
+        # skip light curves that were already counted
+        new = ~keys.isin(self.light_curves).values
+        chunk, keys = chunk[new], keys[new]
+        has_flare = chunk.tstart.notnull().values
+
+        self.n_rows += chunk.shape[0]
+        self.n_flares += int(has_flare.sum())
+
+        self.systems.update(chunk.TIC.astype(int).tolist())
+        self.systems_with_flares.update(chunk.TIC[has_flare].astype(int).tolist())
+
+        # light curves without flares have a row without a flare
+        self.light_curves.update(keys)
+        self.light_curves_without_flares.update(keys[~has_flare])
+
+    def count_light_curves(self, mission):
+        """Number of light curves of a mission, i.e., quarters or sectors
+        of single stars, not the number of distinct quarters or sectors."""
+        return sum(key.split("_")[1] == mission for key in self.light_curves)
+
+    def get_macros(self):
+        """All values of the flare table that go into the manuscript,
+        keyed by the name of their output file."""
+        return {"PAPER_total_number_of_flares": self.n_flares,
+                "PAPER_total_number_of_systems_with_flares": len(self.systems_with_flares),
+                "PAPER_total_number_of_light_curves": len(self.light_curves),
+                "PAPER_total_number_of_light_curves_without_flares": len(self.light_curves_without_flares),
+                "PAPER_total_number_of_kepler_light_curves": self.count_light_curves("Kepler"),
+                "PAPER_total_number_of_tess_light_curves": self.count_light_curves("TESS")}
+
+    def write_macros(self, outdir=paths.output):
+        """Write every value to its own file in the output folder."""
+        for name, value in self.get_macros().items():
+            with open(outdir / f"{name}.txt", "w") as f:
+                f.write(f"{value}")
+
+    def save(self, path=STATISTICS_PATH):
+        """Save the state of the accumulator."""
+        state = {"n_rows": self.n_rows, "n_flares": self.n_flares,
+                 "systems": sorted(self.systems),
+                 "systems_with_flares": sorted(self.systems_with_flares),
+                 "light_curves": sorted(self.light_curves),
+                 "light_curves_without_flares": sorted(self.light_curves_without_flares)}
+        with open(path, "w") as f:
+            json.dump(state, f)
+
+    @classmethod
+    def load(cls, path=STATISTICS_PATH):
+        """Load a saved state of the accumulator."""
+        with open(path, "r") as f:
+            state = json.load(f)
+
+        stats = cls()
+        stats.n_rows, stats.n_flares = state["n_rows"], state["n_flares"]
+        for name in ["systems", "systems_with_flares", "light_curves",
+                     "light_curves_without_flares"]:
+            setattr(stats, name, set(state[name]))
+
+        return stats
@@ -0,0 +1,291 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Module that measures flare detection completeness by injecting synthetic
+flares (Davenport 2014 template) into the cached light curves, running
+the flare search on them, and matching the recovered flares.
+
+Every trial injects many well-separated flares into the same light curve
+at once, and adds all profiles in one vectorized step. The results are
+binned into grids of recovery probability and ED bias (recovered over
+injected ED) as a function of injected ED and amplitude, and stored as
+one compressed `.npz` file per light curve.
+"""
+
+import numpy as np
+
+import paths
+
+from flarefinding import find_flares_in_arrays
+from lightcurves import read_light_curve
+
+
+# folder with the recovery grids
+INJREC_DIR = paths.data / "injrec"
+
+# default grid in ED [s] and relative amplitude
+ED_BINS = np.logspace(-1, 4, 26)
+AMPL_BINS = np.logspace(-3, 0, 16)
+
+# integral of the Davenport (2014) template in units of FWHM
+TEMPLATE_INTEGRAL = ((1. - 1.941 / 2. - 0.175 / 3. + 2.246 / 4. - 1.125 / 5.) +
+                     (0.6890 / 1.600 + 0.3030 / 0.2783))
+
+
+def davenport_template(x):
+    """Flare template from Davenport et al. (2014), normalized to
+    an amplitude of one.
+
+    Parameters
+    ----------
+    x : array
+        Time from the peak in units of the FWHM.
+
+    Returns
+    -------
+    model : array
+        Relative flux of the flare.
+    """
+    model = np.zeros_like(x)
+
+    rise = (x > -1.) & (x <= 0.)
+    xr = x[rise]
+    model[rise] = 1. + 1.941 * xr - 0.175 * xr**2 - 2.246 * xr**3 - 1.125 * xr**4
+
+    decay = x > 0.
+    xd = x[decay]
+    model[decay] = 0.6890 * np.exp(-1.600 * xd) + 0.3030 * np.exp(-0.2783 * xd)
+
+    return model
+
+
+def get_injected_ed(fwhm, ampl):
+    """ED in seconds of a template flare with FWHM in days."""
+    return TEMPLATE_INTEGRAL * fwhm * 86400. * ampl
+
+
+def inject_flares(time, flux, tpeak, fwhm, ampl, ndecay=30.):
+    """Add many flares to a light curve at once.
+
+    Parameters
+    ----------
+    time, flux : arrays
+        Light curve with finite, sorted time stamps.
+    tpeak, fwhm, ampl : arrays
+        Peak time and FWHM in days, and relative amplitude of every flare.
+    ndecay : float, optional
+        Number of FWHMs after the peak to add the decay to.
+        The default is 30.
+
+    Returns
+    -------
+    flux : array
+        The light curve with all flares added.
+    """
+    # range of cadences that every flare touches
+    i0 = np.searchsorted(time, tpeak - fwhm, side="left")
+    i1 = np.searchsorted(time, tpeak + ndecay * fwhm, side="right")
+
+    # flat indices of all touched cadences, and the flare they belong to
+    lengths = i1 - i0
+    seg = np.repeat(np.arange(len(tpeak)), lengths)
+    idx = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    idx += np.repeat(i0, lengths)
+
+    # evaluate all profiles, and add them up
+    model = np.zeros_like(flux)
+    x = (time[idx] - tpeak[seg]) / fwhm[seg]
+    np.add.at(model, idx, davenport_template(x) * ampl[seg])
+
+    return flux * (1. + model)
+
+
+def match_flares(tpeak, tstart, tstop, tol):
+    """Match injected flares to recovered ones.
+
+    Parameters
+    ----------
+    tpeak : array
+        Peak times of the injected flares.
+    tstart, tstop : arrays
+        Start and stop times of the recovered flares, sorted.
+    tol : float
+        Tolerance in days, usually a cadence.
+
+    Returns
+    -------
+    recovered : bool array
+        True for injected flares that fall into a recovered flare.
+    j : int array
+        Index of the matching recovered flare, -1 if not recovered.
+    """
+    if len(tstart) == 0:
+        return np.zeros(len(tpeak), dtype=bool), np.full(len(tpeak), -1)
+
+    j = np.searchsorted(tstart, tpeak + tol, side="right") - 1
+    recovered = (j >= 0) & (tpeak <= np.asarray(tstop)[np.maximum(j, 0)] + tol)
+    return recovered, np.where(recovered, j, -1)
+
+
+def inject_recover(lcpaths, ntrials=100, nflares=20, fwhm_range=(1. / 1440., 1. / 24.),
+                   ampl_range=(1e-3, 1.), seed=None, **kwargs):
+    """Run injection-recovery trials on a light curve.
+
+    Parameters
+    ----------
+    lcpaths : list of pathlib.Path
+        Cached files of the light curve.
+    ntrials : int, optional
+        Number of trials, each runs the flare search once. The default,
+        with `nflares`, gives 2000 injected flares per light curve.
+    nflares : int, optional
+        Number of flares injected per trial. They are spread evenly,
+        so that they do not overlap. Slots that are too short to take
+        a flare, e.g., in short or mostly masked light curves, are
+        skipped, so fewer flares may be injected.
+    fwhm_range : tuple, optional
+        Range of FWHM in days, sampled log-uniformly.
+    ampl_range : tuple, optional
+        Range of relative amplitudes, sampled log-uniformly.
+    seed : int, optional
+        Seed for the random number generator.
+    kwargs : dict
+        Passed to `find_flares_in_arrays`.
+
+    Returns
+    -------
+    injected : dict of arrays
+        ED and amplitude of all injected flares, whether they were
+        recovered, and the recovered ED.
+    """
+    rng = np.random.default_rng(seed)
+
+    lcs = [read_light_curve(path) for path in lcpaths]
+    time, flux, flux_err = [np.concatenate(a) for a in list(zip(*lcs))[:3]]
+    cadence = lcs[0][3]
+
+    # only cadences with finite time stamps can take flares
+    finite = np.isfinite(time)
+    time, flux, flux_err = time[finite], flux[finite], flux_err[finite]
+
+    # flares peak on valid cadences, one flare per slot of valid cadences
+    valid = np.where(np.isfinite(flux))[0]
+    # the flares peak early in their slot, so that the decay does not
+    # run into the next flare
+    slots = [s[len(s) // 10: len(s) - len(s) // 4] for s in np.array_split(valid, nflares)]
+    slots = [s for s in slots if len(s) > 0]
+    nflares = len(slots)
+
+    ed, ampl, recovered, ed_rec = [], [], [], []
+
+    for _ in range(ntrials if nflares > 0 else 0):
+
+        # draw the flares of this trial
+        tpeak = np.array([time[rng.choice(s)] for s in slots])
+        fwhm = np.exp(rng.uniform(*np.log(fwhm_range), size=nflares))
+        a = np.exp(rng.uniform(*np.log(ampl_range), size=nflares))
+
+        # inject and search
+        injected_flux = inject_flares(time, flux, tpeak, fwhm, a)
+        flares = find_flares_in_arrays(time, injected_flux, flux_err, cadence, **kwargs)
+
+        # match
+        rec, j = match_flares(tpeak, flares.tstart.values, flares.tstop.values, cadence)
+
+        found = np.full(nflares, np.nan)
+        found[rec] = flares.ED.values[j[rec]]
+
+        ed.append(get_injected_ed(fwhm, a))
+        ampl.append(a)
+        recovered.append(rec)
+        ed_rec.append(found)
+
+    # light curves without valid cadences get empty results
+    if len(ed) == 0:
+        return {"ED": np.zeros(0), "ampl": np.zeros(0),
+                "recovered": np.zeros(0, dtype=bool), "ED_rec": np.zeros(0)}
+
+    return {"ED": np.concatenate(ed), "ampl": np.concatenate(ampl),
+            "recovered": np.concatenate(recovered),
+            "ED_rec": np.concatenate(ed_rec)}
+
+
+def get_recovery_grid(injected, ed_bins=ED_BINS, ampl_bins=AMPL_BINS):
+    """Bin injection-recovery results into grids.
+
+    Parameters
+    ----------
+    injected : dict of arrays
+        Output of `inject_recover`.
+    ed_bins, ampl_bins : arrays, optional
+        Bin edges in injected ED [s] and relative amplitude.
+
+    Returns
+    -------
+    grid : dict of arrays
+        Bin edges, number of injected flares, recovery probability,
+        and mean ratio of recovered to injected ED per bin.
+    """
+    bins = [ed_bins, ampl_bins]
+    ed, ampl, rec = injected["ED"], injected["ampl"], injected["recovered"]
+
+    n_inj = np.histogram2d(ed, ampl, bins=bins)[0]
+    n_rec = np.histogram2d(ed[rec], ampl[rec], bins=bins)[0]
+    ratio = np.histogram2d(ed[rec], ampl[rec], bins=bins,
+                           weights=injected["ED_rec"][rec] / ed[rec])[0]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        recovery_probability = n_rec / n_inj
+        ed_ratio = ratio / n_rec
+
+    return {"ed_bins": ed_bins, "ampl_bins": ampl_bins,
+            "n_injected": n_inj.astype(np.int32),
+            "recovery_probability": recovery_probability.astype(np.float32),
+            "ed_ratio": ed_ratio.astype(np.float32)}
+
+
+def get_grid_path(tic, mission, quarter_or_sector):
+    """Path to the recovery grid of a light curve."""
+    return INJREC_DIR / f"{mission}_TIC_{int(tic)}_{quarter_or_sector}.npz"
+
+
+def write_recovery_grid(grid, tic, mission, quarter_or_sector):
+    """Write a recovery grid to a compressed file."""
+    INJREC_DIR.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(get_grid_path(tic, mission, quarter_or_sector), **grid)
+
+
+def read_recovery_grid(tic, mission, quarter_or_sector):
+    """Read the recovery grid of a light curve."""
+    with np.load(get_grid_path(tic, mission, quarter_or_sector)) as grid:
+        return dict(grid)
+
+
+def get_recovery_probability(ed, ampl, grid):
+    """Look up recovery probability and ED bias for flares.
+
+    Parameters
+    ----------
+    ed, ampl : arrays
+        ED [s] and relative amplitude of the flares.
+    grid : dict of arrays
+        Recovery grid of the light curve.
+
+    Returns
+    -------
+    recovery_probability, ed_ratio : arrays
+        Values of the grid cells the flares fall into, NaN outside the grid.
+    """
+    i = np.digitize(ed, grid["ed_bins"]) - 1
+    j = np.digitize(ampl, grid["ampl_bins"]) - 1
+
+    inside = ((i >= 0) & (i < len(grid["ed_bins"]) - 1) &
+              (j >= 0) & (j < len(grid["ampl_bins"]) - 1))
+    i, j = np.where(inside, i, 0), np.where(inside, j, 0)
+
+    p = np.where(inside, grid["recovery_probability"][i, j], np.nan)
+    r = np.where(inside, grid["ed_ratio"][i, j], np.nan)
+
+    return p, r
@@ -0,0 +1,308 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Module that gives access to the cached Kepler and TESS light curves in
+`src/data/lcs`. Files are the original mission FITS products, named
+
+    {mission}_TIC_{tic}_{quarter_or_sector}.fits
+
+with an optional `_{part}` suffix for light curves that are split into
+several files per quarter, like Kepler short cadence data.
+
+The files are opened memory-mapped, so that reading a short time window
+only touches the rows of the binary table inside that window.
+"""
+
+import re
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from astropy.io import fits
+
+import paths
+
+from exposure import get_gtis
+
+
+# pattern of the file names in the light curve cache
+LC_FILENAME = re.compile(r"^(Kepler|TESS)_TIC_(\d+)_(\d+)(?:_(\d+))?\.fits$")
+
+# quality flags that mask a cadence, lightkurve's "default" bitmask, with
+# which the light curves of the paper were downloaded; cosmic ray flags,
+# which can sit on flare peaks, are not in it
+DEFAULT_BITMASK = {"Kepler": 1130799, "TESS": 17087}
+
+
+def cached_light_curves(tic=None):
+    """List the light curves in the cache.
+
+    Parameters
+    ----------
+    tic : int or str, optional
+        If given, only list the light curves of this star.
+
+    Returns
+    -------
+    lcs : pandas.DataFrame
+        One row per file with columns TIC, mission, quarter_or_sector,
+        part, and path, sorted by TIC, mission, and quarter_or_sector.
+    """
+    pattern = "*.fits" if tic is None else f"*_TIC_{int(tic)}_*.fits"
+
+    rows = []
+    for path in paths.lcs.glob(pattern):
+        match = LC_FILENAME.match(path.name)
+        if match is None:
+            continue
+        mission, tic_, qs, part = match.groups()
+        rows.append({"TIC": int(tic_), "mission": mission,
+                     "quarter_or_sector": int(qs),
+                     "part": 0 if part is None else int(part),
+                     "path": path})
+
+    lcs = pd.DataFrame(rows, columns=["TIC", "mission", "quarter_or_sector",
+                                      "part", "path"])
+
+    return lcs.sort_values(by=["TIC", "mission", "quarter_or_sector", "part"],
+                           ignore_index=True)
+
+
+def get_bjd_offset(header):
+    """Get the offset between the mission time axis (BKJD or BTJD)
+    and BJD from the header of the light curve extension.
+
+    Parameters
+    ----------
+    header : astropy.io.fits.Header
+        Header of the binary table extension.
+
+    Returns
+    -------
+    offset : float
+        Add this to the TIME column to get BJD.
+    """
+    return header["BJDREFI"] + header["BJDREFF"]
+
+
+def get_mission(path, header):
+    """Mission of a light curve, from the name of the cached file, or
+    from the TELESCOP keyword of the header if the name does not match.
+    """
+    match = LC_FILENAME.match(Path(path).name)
+    return header["TELESCOP"] if match is None else match.group(1)
+
+
+def is_flagged(quality, mission):
+    """True for the cadences with a quality flag in the default bitmask
+    of the mission, "Kepler" or "TESS"."""
+    return (np.asarray(quality, dtype=np.int64) & DEFAULT_BITMASK[mission]) != 0
+
+
+def read_gtis(path, bjd=True):
+    """Read the good-time intervals of a cached light curve, counting
+    only cadences with finite flux and no quality flags in the default
+    bitmask.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        Path to the light curve FITS file.
+    bjd : bool, optional
+        If True, return the intervals in BJD, so that Kepler and TESS
+        coverage can be merged. Otherwise, use the mission time axis.
+        The default is True.
+
+    Returns
+    -------
+    gtis : (N, 2) array
+        Start and stop times of the good-time intervals.
+    """
+    with fits.open(path, memmap=True) as hdul:
+        header = hdul[1].header
+        data = hdul[1].data
+
+        # read only the columns needed to find valid cadences
+        time = np.array(data["TIME"], dtype=float)
+        flux = np.array(data["PDCSAP_FLUX"], dtype=float)
+        flagged = is_flagged(data["QUALITY"], get_mission(path, header))
+
+        cadence = header["TIMEDEL"]
+        offset = get_bjd_offset(header) if bjd else 0.
+
+    valid = np.isfinite(time) & np.isfinite(flux) & ~flagged
+
+    return get_gtis(time[valid], cadence) + offset
+
+
+def read_light_curve(path):
+    """Read a whole cached light curve, with invalid cadences masked.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        Path to the light curve FITS file.
+
+    Returns
+    -------
+    time, flux, flux_err : arrays
+        Time on the mission time axis, PDCSAP flux and its uncertainty.
+        Cadences with quality flags in the default bitmask or missing
+        data have NaN flux.
+    cadence : float
+        Exposure time of a single cadence, in days.
+    """
+    with fits.open(path, memmap=True) as hdul:
+        header, data = hdul[1].header, hdul[1].data
+
+        time = np.array(data["TIME"], dtype=float)
+        flux = np.array(data["PDCSAP_FLUX"], dtype=float)
+        flux_err = np.array(data["PDCSAP_FLUX_ERR"], dtype=float)
+
+        valid = (np.isfinite(time) & np.isfinite(flux) &
+                 ~is_flagged(data["QUALITY"], get_mission(path, header)))
+        flux[~valid] = np.nan
+
+        cadence = header["TIMEDEL"]
+
+    return time, flux, flux_err, cadence
+
+
+def _find_rows(data, header, tmin, tmax):
+    """Find a slice of rows of a light curve table that contains all
+    cadences between `tmin` and `tmax`, reading only a few rows.
+
+    The row is estimated from the regular cadence, and the slice is
+    widened until it brackets the window, because time stamps can
+    be missing (NaN) or slightly irregular.
+    """
+    nrows = len(data)
+    cadence = header["TIMEDEL"]
+    tstart = header["TSTART"]
+
+    # first guess from the regular cadence
+    i0 = int(np.floor((tmin - tstart) / cadence))
+    i1 = int(np.ceil((tmax - tstart) / cadence)) + 1
+
+    margin = 16
+    while True:
+        start, stop = max(i0 - margin, 0), min(max(i1 + margin, 0), nrows)
+
+        time = np.array(data["TIME"][start:stop], dtype=float)
+        finite = time[np.isfinite(time)]
+
+        # the slice brackets the window if it starts before tmin
+        # and ends after tmax, or hits the edges of the table
+        lower_ok = (start == 0) or ((len(finite) > 0) and (finite[0] < tmin))
+        upper_ok = (stop == nrows) or ((len(finite) > 0) and (finite[-1] > tmax))
+
+        if lower_ok and upper_ok:
+            return start, stop
+
+        margin *= 4
+
+
+def read_window(path, tmin, tmax, columns=("TIME", "PDCSAP_FLUX",
+                                           "PDCSAP_FLUX_ERR", "QUALITY")):
+    """Read only the rows of a cached light curve inside a time window.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        Path to the light curve FITS file.
+    tmin, tmax : float
+        Time window on the mission time axis (BKJD or BTJD).
+    columns : tuple of str, optional
+        Columns of the binary table to read.
+
+    Returns
+    -------
+    lc : pandas.DataFrame
+        The requested columns for all cadences with
+        tmin <= TIME <= tmax, in native byte order.
+    """
+    with fits.open(path, memmap=True) as hdul:
+        header = hdul[1].header
+        data = hdul[1].data
+
+        # skip files that do not overlap with the window, using the header only
+        if (header["TSTOP"] < tmin) | (header["TSTART"] > tmax):
+            start, stop = 0, 0
+        else:
+            start, stop = _find_rows(data, header, tmin, tmax)
+
+        rows = data[start:stop]
+        lc = pd.DataFrame({col: rows[col].astype(rows[col].dtype.newbyteorder("="))
+                           for col in columns})
+
+    return lc[(lc.TIME >= tmin) & (lc.TIME <= tmax)].reset_index(drop=True)
+
+
+def read_cached_window(tic, mission, quarter_or_sector, tmin, tmax, **kwargs):
+    """Read a time window from the cached light curves of a star,
+    combining all files of the quarter or sector.
+
+    Parameters
+    ----------
+    tic : int or str
+        TIC of the star.
+    mission : str
+        "Kepler" or "TESS".
+    quarter_or_sector : int
+        Kepler quarter or TESS sector.
+    tmin, tmax : float
+        Time window on the mission time axis (BKJD or BTJD).
+    kwargs : dict
+        Passed to `read_window`.
+
+    Returns
+    -------
+    lc : pandas.DataFrame
+        The requested columns for all cadences in the window.
+    """
+    lcs = cached_light_curves(tic)
+    lcs = lcs[(lcs.mission == mission) & (lcs.quarter_or_sector == quarter_or_sector)]
+
+    if lcs.shape[0] == 0:
+        raise FileNotFoundError(f"No cached {mission} light curve for TIC {tic} "
+                                f"in quarter or sector {quarter_or_sector}.")
+
+    windows = [read_window(path, tmin, tmax, **kwargs) for path in lcs.path]
+
+    return pd.concat(windows, ignore_index=True)
+
+
+def fetch_light_curve(search_result, tic, mission, quarter_or_sector, part=None):
+    """Download a light curve with lightkurve once, and keep the original
+    FITS file in the cache.
+
+    Parameters
+    ----------
+    search_result : lightkurve.SearchResult
+        Search result with a single light curve.
+    tic : int or str
+        TIC of the star.
+    mission : str
+        "Kepler" or "TESS".
+    quarter_or_sector : int
+        Kepler quarter or TESS sector.
+    part : int, optional
+        Number of the file within the quarter or sector.
+
+    Returns
+    -------
+    path : pathlib.Path
+        Path to the cached file.
+    """
+    suffix = "" if part is None else f"_{part}"
+    path = paths.lcs / f"{mission}_TIC_{int(tic)}_{quarter_or_sector}{suffix}.fits"
+
+    if not path.exists():
+        paths.lcs.mkdir(parents=True, exist_ok=True)
+        lc = search_result.download(download_dir=str(paths.lcs))
+        shutil.copy(lc.meta["FILENAME"], path)
+
+    return path
@@ -9,7 +9,6 @@ expected values for the power of SPI (Lanza 2012), with and without
 planetary magnetic fields, and also vs the X-ray luminosity.
 """
 
-import pandas as pd
 import numpy as np
 
 import matplotlib.pyplot as plt
@@ -17,6 +16,7 @@ from matplotlib.lines import Line2D
 from adjustText import adjust_text
 
 import paths
+from results import get_results
 
 
 def get_sigma_values():
@@ -368,21 +368,8 @@ if __name__ == "__main__":
     # ------------------------------------------------------------
     # THE ACTUAL PLOTTING
 
-    # read in results table
-    df = pd.read_csv(paths.data / "results.csv")
-
-    # remove GJ 1061 because it does not have a rotation period
-    df = df[df["ID"] != "GJ 1061"]
-
-    # drop rows with TIC 67646988 and 236387002, the brown dwarfs
-    df = df[df.TIC != "67646988" ]
-    df = df[df.TIC != "236387002" ]
-
-    # the old Kepler-411 instance
-    df = df[df.TIC != "399954349(c)" ]
-
-    # remove multiple stars
-    df = df[df["multiple_star"].isnull()]
+    # read in results table, only the systems in the paper sample
+    df = get_results("paper_sample")
 
     # FOUR SCENARIO PLOTS
 
@@ -15,24 +15,12 @@ import matplotlib.pyplot as plt
 import paths
 
 import adjustText as aT
+from results import get_results
 
 if __name__ == "__main__":
 
-    # read results
-    df = pd.read_csv(paths.data / 'results.csv')
-
-     # remove GJ 1061 because it does not have a rotation period
-    df = df[df["ID"] != "GJ 1061"]
-
-    # drop rows with TIC 67646988 and 236387002, the brown dwarfs
-    df = df[df.TIC != "67646988" ]
-    df = df[df.TIC != "236387002" ]
-
-    # the old Kepler-411 instance
-    df = df[df.TIC != "399954349(c)" ]
-
-    # remove multiple stars
-    df = df[df["multiple_star"].isnull()]
+    # read results, only the systems in the paper sample
+    df = get_results("paper_sample")
 
     # read AS
     AS = pd.read_csv(paths.data / 'AS_estimation.csv')
@@ -10,15 +10,18 @@ the results in the paper are normalized.
 import pandas as pd
 import paths
 import numpy as np
+from results import get_results
 
 
 if __name__ == "__main__":
 
     # read results
-    df = pd.read_csv(paths.data / "results.csv")
+    cols = [f"p_spi{s}{e}" for s in ["_erg_s", "_erg_s_bp0", "_kav22", "_kav22_bp0"]
+            for e in ["", "_high", "_low"]]
+    df = get_results(columns=["TIC"] + cols)
 
     # select AU Mic
-    aumicspi = df.loc[df.TIC == "441420236"]
+    aumicspi = df.loc[df.TIC == 441420236]
 
     # select SPI scenarios
     vals = [("p_spi_erg_s", r"$P_{\rm spi,sb}$", "stretch-and-break", "1"),
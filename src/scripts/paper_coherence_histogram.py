@@ -9,11 +9,11 @@ show that the orbital period is coherent enough for our analysis,
 while the rotation period is not.
 """
 
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 
 import paths
+from results import get_results
 
 if __name__ == "__main__":
 
@@ -21,7 +21,7 @@ if __name__ == "__main__":
     plt.style.use(paths.scripts / 'paper.mplstyle')
 
     # read in flare table
-    df = pd.read_csv(paths.data / "results.csv")
+    df = get_results(columns=["coherence_ratio_rotation", "coherence_ratio_orbit"])
 
     # define the same bin for both rotation and orbit
     bins = np.logspace(-5.5, 2., 30)
@@ -12,6 +12,7 @@ import numpy as np
 import paths
 
 from scipy.stats import spearmanr, pearsonr
+from results import get_results
 
 if __name__ == "__main__":
 
@@ -34,25 +35,12 @@ if __name__ == "__main__":
         print(plogcoeff)
         print("")
 
-    # read magnetic SPI table
-    df = pd.read_csv(paths.data / "results.csv")
-
-    # select only the single stars
-    singles = df[df.multiple_star.isnull()]
+    # read magnetic SPI table, only the systems in the paper sample
+    singles = get_results("paper_sample")
 
     # rename the column with the source of the rotation period
     singles = singles.rename(columns={"st_rotp_source":"st_rotp_bibkey"})
 
-    # drop rows with TIC 67646988 and 236387002, the brown dwarfs
-    singles = singles[singles.TIC != "67646988" ]
-    singles = singles[singles.TIC != "236387002" ]
-
-    # the old Kepler-411 instance
-    singles = singles[singles.TIC != "399954349(c)" ]
-
-    # GJ 1061 because rotation is unclear
-    singles = singles[singles.TIC != "79611981" ]
-
     print("MAGNETIC INTERACTION corr-coeffs")
 
     # calculate the Spearman and Pearson correlation coefficients
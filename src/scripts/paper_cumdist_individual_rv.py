@@ -9,10 +9,29 @@ plot for the paper using the final flare table.
 
 import paths
 
-import pandas as pd
-import numpy as np
+from cumhiststore import CumhistStore
+from ephemeris import get_ephemerides, get_orbital_phases
+from flarecatalogue import load_flare_table
+from flareindex import FlareIndex
+
 import matplotlib.pyplot as plt
 from matplotlib.lines import Line2D
+from results import get_results
+
+
+def get_flares(tics):
+    """Read the real flares above 1 s in ED of the systems from the
+    flare catalogue, in one pass over the columns used here."""
+
+    # read in flare table, only the columns used here
+    flares = load_flare_table(columns=["TIC", "ID", "mission", "tstart", "abs_tstart",
+                                       "ED", "coincident"])
+
+    # pick only flares above 1 s in ED of the selected systems
+    flares = flares[(flares.ED > 1) & flares.TIC.isin(tics)]
+
+    # pick only real flares, without the coincident ones
+    return flares[(~flares.tstart.isnull()) & ~flares.coincident]
 
 
 if __name__ == "__main__":
@@ -20,32 +39,36 @@ if __name__ == "__main__":
     # get matplotlib style
     plt.style.use(paths.scripts / 'paper.mplstyle')
 
-    # read in flare table
-    flares = pd.read_csv(paths.data / "PAPER_flare_table.csv")
+    # only use the systems that appear in the results table
+    res = get_results()
 
-    # pick only flares above 1 s in ED
-    flares = flares[flares.ED > 1]
+    # only the single stars without a brown dwarf companion, and without transits
+    tics = get_results(["singles_no_bd", "rv"])
+    tics = tics.sort_values(by="number_of_flares", ascending=False)
 
-    # pick only real flares
-    flares = flares[(~flares.tstart.isnull()) & (flares.orbital_phase==-1)]
 
-    # only use the systems that appear in the results table
-    res = pd.read_csv(paths.data / "results.csv")
+    # read the flares of all systems
+    flares = get_flares(tics.TIC)
 
-    tics = res[(res.multiple_star.isnull()) & (res.multiple_star_source != "BD") & (res.TIC != "399954349(c)")]
-    tics = tics.sort_values(by="number_of_flares", ascending=False)
+    # fold the flare times in BJD with the ephemeris of the first planet
+    # listed for each system, the same as in the coverage files
+    phases = get_orbital_phases(flares, get_ephemerides(res))
+    phases = phases[phases.planet == 0]
 
+    # sort the phases of all systems at once, and get their ECDFs
+    index = FlareIndex(phases.TIC, phases.orbital_phase)
+
+    # get the ID of each system
+    ids = flares.drop_duplicates(subset="TIC")
+    ids = dict(zip(ids.TIC.astype(str), ids.ID))
 
-    # Add the number of flares to the TICs
-    n_flares = []
-    for tic in tics.TIC:
-        n_flares.append(flares[flares.TIC.astype(str) == str(tic)].shape[0])
-    
-    
     # sort the TICs by the number of flares
-    tics["n_flares"] = n_flares
+    tics["n_flares"] = [index.count(tic) for tic in tics.TIC]
     tics = tics.sort_values(by="n_flares", ascending=False)
 
+    # coverage of all systems
+    store = CumhistStore()
+
     # make a plot for 15 panels
     fig, ax = plt.subplots(nrows=3, ncols=3, figsize=(14,9.5), sharex=True)
 
@@ -56,48 +79,32 @@ if __name__ == "__main__":
     # create a subplot for each star
     for tic in tics.TIC:
 
-        # print(g.shape)
-        g = flares[(flares.TIC.astype(str) == tic)]
-        print(tic, g.shape, len(ax))
+        print(tic, index.count(tic), len(ax))
         # pick only stars with more than 0 flares
-        if ((g.shape[0]>3) & (len(ax)>0)):
+        if ((index.count(tic)>3) & (len(ax)>0)):
             
             # pick an axis
             a = ax.pop()
             
             # gey the ID
-            ID = g.ID.iloc[0]
+            ID = ids[str(tic)]
             
             # if no ID, use TIC instead
             if str(ID)=="nan":
                 print(ID)
-                ID = f"TIC {g.TIC.iloc[0]}"
+                ID = f"TIC {tic}"
 
-            # read in file with phase distribution
-            df = pd.read_csv(paths.data / f"TIC_{tic}_cumhist.csv")
+            # read in the phase distribution
+            p, f = store.get(tic)
             
             # plot the distribution
-            a.plot(df.p, df.f, color="blue", linewidth=1.5)
+            a.plot(p, f, color="blue", linewidth=1.5)
 
 
-            # get the orbital period
-            orbper = res[res.TIC.astype(str) == tic].orbper_d.values[0]
-            
-            # calculate the phases
-            phases = g.tstart.values / orbper % 1.
+            # get the sorted phases and the histogram,
+            # with 0 and 1 at the beginning and the end
+            phases, hist = index.get_ecdf(tic)
 
-            # sort the phases
-            phases = np.sort(phases)
-            
-            # plot the histogram
-            hist = np.cumsum(np.ones_like(phases))
-            hist = hist/hist[-1]
-            # insert 1 and 0 at the beginning and the end
-            hist = np.append(hist, 1)
-            hist = np.insert(hist, 0, 0)
-            phases = np.append(phases, 1)
-            phases = np.insert(phases, 0, 0)
-           
             a.plot(phases, hist, color="k", linewidth=1.5)
 
             # make a line for the legend
@@ -9,53 +9,50 @@ plot for the paper using the final flare table.
 
 import paths
 
-import pandas as pd
-import numpy as np
+from cumhiststore import CumhistStore
+from flarecatalogue import load_flare_table
+from flareindex import FlareIndex
+
 import matplotlib.pyplot as plt
 from matplotlib.lines import Line2D
+from results import get_results
 
 
-if __name__ == "__main__":
-
-    # get matplotlib style
-    plt.style.use(paths.scripts / 'paper.mplstyle')
-
-    # read in flare table
-    flares = pd.read_csv(paths.data / "PAPER_flare_table.csv")
-
-    # pick only flares above 1 s in ED
-    flares = flares[flares.ED > 1]
+def get_flares(tics):
+    """Read the real flares above 1 s in ED of the systems from the
+    flare catalogue, in one pass over the columns used here."""
 
-    # pick only real flares
-    flares = flares[flares.orbital_phase != -1]
+    # read in flare table, only the columns used here
+    flares = load_flare_table(columns=["TIC", "ED", "orbital_phase", "coincident"])
 
-    # only use the systems that appear in the results table
-    tics = pd.read_csv(paths.data / "results.csv")
+    # pick only flares above 1 s in ED of the selected systems
+    flares = flares[(flares.ED > 1) & flares.TIC.isin(tics)]
 
-    # remove old Kepler-411 instance
-    tics = tics[tics.TIC != '399954349(c)']
+    # pick only real flares, without the coincident ones
+    return flares[~flares.coincident]
 
-    # remove GJ 1061 because it does not have a rotation period
-    tics = tics[tics["ID"] != "GJ 1061"]
 
-    # drop rows with TIC 67646988 and 236387002, the brown dwarfs
-    tics = tics[tics.TIC != "67646988" ]
-    tics = tics[tics.TIC != "236387002" ]
+if __name__ == "__main__":
 
+    # get matplotlib style
+    plt.style.use(paths.scripts / 'paper.mplstyle')
 
-    tics = tics[(tics.multiple_star.isnull()) & (tics.multiple_star_source != "BD")]
+    # only use the transiting systems in the paper sample
+    tics = get_results(["paper_sample", "transiting"])
     tics = tics.sort_values(by="number_of_flares", ascending=False)
 
 
-    # Add the number of flares to the TICs
-    n_flares = []
-    for tic in tics.TIC:
-        n_flares.append(flares[flares.TIC.astype(str) == str(tic)].shape[0])
-    
+    # read the flares of all systems, sort their phases at once, and get their ECDFs
+    flares = get_flares(tics.TIC)
+    index = FlareIndex(flares.TIC, flares.orbital_phase)
+
     # sort the TICs by the number of flares
-    tics["n_flares"] = n_flares
+    tics["n_flares"] = [index.count(tic) for tic in tics.TIC]
     tics = tics.sort_values(by="n_flares", ascending=False)
 
+    # coverage of all systems
+    store = CumhistStore()
+
     # make a plot for 15 panels
     fig, ax = plt.subplots(nrows=6, ncols=3, figsize=(14,17), sharex=True)
 
@@ -66,30 +63,19 @@ if __name__ == "__main__":
     # create a subplot for each star
     for id_, row in tics.iterrows():
 
-        # get the orbital phases
-        phases = flares[flares.TIC.astype(str) == str(row.TIC)].orbital_phase.values
-
-        if (len(phases) > 2) & (len(ax) > 0):
+        if (index.count(row.TIC) > 2) & (len(ax) > 0):
             a = ax.pop()
 
-            # read in file with phase distribution
-            df = pd.read_csv(paths.data / f"TIC_{row.TIC}_cumhist.csv")
+            # read in the phase distribution
+            p, f = store.get(row.TIC)
             
             # plot the distribution
-            a.plot(df.p, df.f, color="blue", linewidth=1.5)
+            a.plot(p, f, color="blue", linewidth=1.5)
 
             # plot the flares
-            # sort the phases
-            phases = np.sort(phases)
-            print(len(phases))
-            # plot the histogram
-            hist = np.cumsum(np.ones_like(phases))
-            hist = hist/hist[-1]
-            # insert 1 and 0 at the beginning and the end
-            hist = np.append(hist, 1)
-            hist = np.insert(hist, 0, 0)
-            phases = np.append(phases, 1)
-            phases = np.insert(phases, 0, 0)
+            # get the sorted phases and the histogram,
+            # with 0 and 1 at the beginning and the end
+            phases, hist = index.get_ecdf(row.TIC)
             print(phases)
             a.plot(phases, hist, color="k", linewidth=1.5)
 
@@ -8,6 +8,8 @@ from scipy.interpolate import interp1d
 from scipy.misc import derivative
 import paths
 
+from exposure import get_gtis, merge_gtis, exposure_cdf
+
 
 def sample_AD_for_custom_distribution(f, nobs, N):
     """
@@ -138,12 +140,12 @@ if __name__ == "__main__":
     # download HIP 67522 TESS lcs
     lcs = lk.search_lightcurve('HIP 67522', mission='TESS', cadence="short", author="SPOC").download_all()#.stitch().remove_nans()
 
-    # from all lcs, extract the time and convert to orbital phase with period 6.95 d
-    times = []
+    # from all lcs, extract the good-time intervals of the observations
+    gtis = []
     for lc in lcs:
-        times.append(lc.time.value)
-    times = np.concatenate(times)
-    times = (times % 6.95) / 6.95
+        time = lc.time.value
+        gtis.append(get_gtis(time, np.nanmedian(np.diff(time))))
+    gtis = merge_gtis(*gtis)
     # assume for simplicity that the flare rate is constant
     # calculate the expected distribution function with the time array
     # and the flare rate
@@ -169,17 +171,9 @@ if __name__ == "__main__":
     # add zero to the beginning and one to the end
     flares = np.concatenate([[0], flares_, [1]])
 
-    # make histogram
-    hist = np.histogram(times, bins=flares)[0]
-
-    # make cumulative histogram
-    cum_hist = np.cumsum(hist)
-
-    # normalize
-    cum_hist = cum_hist / cum_hist[-1]
-
-    # add zero to the beginning
-    cum_hist_ = np.concatenate([[0], cum_hist])
+    # fold the coverage with period 6.95 d, and get the exact
+    # cumulative exposure at the flare phases
+    cum_hist_ = exposure_cdf(flares, gtis, 6.95)
 
 
     plt.plot(flares, cum_hist_)
@@ -6,47 +6,103 @@ Ekaterina Ilin, 2023, MIT License
 Script that grabs two light curves of planet hosts that we found with 
 false positives, both physical (SSO) and instrumental (argabrightening),
 makes a two panel figure for the appendix.
+
+Only the zoomed time windows are read from the cached light curves, the
+light curves are downloaded once if they are not in the cache yet.
 """
 
 import lightkurve as lk
 import matplotlib.pyplot as plt
+import numpy as np
 
 import paths
 
+from results import get_results
+from lightcurves import cached_light_curves, fetch_light_curve, is_flagged, read_cached_window
+
+
+def get_window(tic, mission, qs, xlim, search, part=None):
+    """Read a time window from the cached light curve, and download
+    the light curve to the cache first if needed.
+
+    Parameters
+    ----------
+    tic : int or str
+        TIC of the star.
+    mission : str
+        "Kepler" or "TESS".
+    qs : int
+        Kepler quarter or TESS sector.
+    xlim : tuple
+        Time window on the mission time axis.
+    search : func
+        Returns the lightkurve search result to download if
+        the light curve is not cached.
+    part : int, optional
+        Number of the file within the quarter or sector.
+
+    Returns
+    -------
+    lc : pandas.DataFrame
+        Time, flux, and quality of the cadences in the window. Cadences
+        with quality flags in the default bitmask have NaN flux.
+    """
+    # files without a part number are part 0 in the cache
+    lcs = cached_light_curves(tic)
+    if not ((lcs.mission == mission) & (lcs.quarter_or_sector == qs) &
+            (lcs.part == (0 if part is None else part))).any():
+        fetch_light_curve(search(), tic, mission, qs, part=part)
+
+    lc = read_cached_window(tic, mission, qs, *xlim)
+
+    # mask flagged cadences, as in read_light_curve
+    lc.loc[is_flagged(lc.QUALITY, mission), "PDCSAP_FLUX"] = np.nan
+
+    return lc
+
 
 if __name__ == '__main__':
 
+    # get the TICs of the stars from the results table
+    res = get_results()
+    get_tic = lambda ID: res.loc[res.ID == ID, "TIC"].values[0]
 
     # get Kepler light curve of Kepler-235
     kicname = 'Kepler-235'
-    lcskic = lk.search_lightcurve('Kepler-235', author='Kepler', cadence='short', quarter=14)
-    lckic = lcskic[2].download()
     kictitle = 'Instrumental False Positive: Possible Argabrightening'
     xlimkic = (1337.45, 1337.55)
     ylimkic = (5100, 5600)
+    lckic = get_window(get_tic(kicname), 'Kepler', 14, xlimkic, part=2,
+                       search=lambda: lk.search_lightcurve('Kepler-235', author='Kepler',
+                                                           cadence='short', quarter=14)[2])
 
     # get TESS light curve of TIC 435339847
     ticname = 'K2-77'
-    lcstic = lk.search_lightcurve('TIC 435339847', cadence='short', sector=44)
-    lctic = lcstic[0].download()
     tictitle = 'Physical False Positive: Solar System Object'
     xlimtic = (2516.6, 2518.3)
     ylimtic = (4500, None)
+    lctic = get_window(435339847, 'TESS', 44, xlimtic,
+                       search=lambda: lk.search_lightcurve('TIC 435339847', cadence='short',
+                                                           sector=44)[0])
 
     # Get flare light curve of GJ 3323
     flcname = 'GJ 3323'
-    lcs = lk.search_lightcurve('GJ 3323', author='SPOC', exptime=120, sector=5)
-    flc = lcs[0].download()
     ftitle = 'Flare Light Curve'
     fxlim = (1445.5, 1445.9)
     fylim = (13200, 15800)
+    flc = get_window(get_tic(flcname), 'TESS', 5, fxlim,
+                     search=lambda: lk.search_lightcurve('GJ 3323', author='SPOC',
+                                                         exptime=120, sector=5)[0])
 
     # plot the light curves side by side in one figure
     fig, ax = plt.subplots(1, 3, figsize=(15, 4))
-    flc.plot(ax=ax[0], linewidth=1, label=flcname)
-    lckic.plot(ax=ax[1], linewidth=1, label=kicname)
-    lctic.plot(ax=ax[2], linewidth=1, label=ticname)
+    for a, lc, name in zip(ax, [flc, lckic, lctic], [flcname, kicname, ticname]):
+        a.plot(lc.TIME, lc.PDCSAP_FLUX, linewidth=1, color="k", label=name)
+        a.set_ylabel(r"Flux [e$^-$s$^{-1}$]")
 
+    ax[1].set_xlabel("Time - 2454833 [BKJD days]")
+    ax[0].set_xlabel("Time - 2457000 [BTJD days]")
+    ax[2].set_xlabel("Time - 2457000 [BTJD days]")
 
     # set the limits of the x and y axes separately for each light curve
     ax[1].set_xlim(xlimkic)
@@ -5,41 +5,27 @@ results of the flare finding and characterization.
 
 """
 
-import paths
-import pandas as pd
+from flarecatalogue import iter_flare_table
+from flarestatistics import FlareTableStatistics
 
 if __name__ == "__main__":
 
-    # Load the data
-    flare_table = pd.read_csv(paths.data / "PAPER_flare_table.csv")
+    # count everything in one pass over the table, chunks never split a system
+    stats = FlareTableStatistics()
+    for chunk in iter_flare_table(columns=["TIC", "mission", "quarter_or_sector", "tstart"]):
+        stats.update(chunk)
 
-    # define total number of flares and write to file
-    total_number_of_flares = flare_table[~flare_table["tstart"].isnull()].shape[0]
-    print("Total number of flares: ", total_number_of_flares)
+    # keep the state, so that appended light curves can be added later
+    stats.save()
 
-    with open(paths.output / "PAPER_total_number_of_flares.txt", "w") as f:
-        f.write(f"{total_number_of_flares}")
+    # print the values, and write each to its own file
+    for name, value in stats.get_macros().items():
+        print(f"{name}: {value}")
 
-
-    # total number of systems with flares
-    total_number_of_systems_with_flares = flare_table[~flare_table["tstart"].isnull()]["TIC"].unique().shape[0]
-    print("Total number of systems with flares: ", total_number_of_systems_with_flares)
-
-    with open(paths.output / "PAPER_total_number_of_systems_with_flares.txt", "w") as f:
-        f.write(f"{total_number_of_systems_with_flares}")
+    stats.write_macros()
 
     # table contains only systems that flare
-    assert flare_table["TIC"].unique().shape[0] == total_number_of_systems_with_flares
-
-    # total number of light curves searched
-    total_number_of_light_curves = flare_table.groupby(["TIC", "quarter_or_sector"]).size().shape[0]
-    print("Total number of light curves: ", total_number_of_light_curves)
-
-    with open(paths.output / "PAPER_total_number_of_light_curves.txt", "w") as f:
-        f.write(f"{total_number_of_light_curves}")
+    assert len(stats.systems) == len(stats.systems_with_flares)
 
-    # total number of light curves without flares
-    light_curves_without_flares = flare_table[flare_table["tstart"].isnull()].groupby(["TIC", "quarter_or_sector"]).size().shape[0]
-    print("Total number of light curves without flares: ", light_curves_without_flares)
- 
-    assert flare_table.shape[0] == total_number_of_flares + light_curves_without_flares
+    # every row is either a flare or a light curve without flares
+    assert stats.n_rows == stats.n_flares + len(stats.light_curves_without_flares)
@@ -8,51 +8,45 @@ results of the flare finding and characterization.
 import paths
 import pandas as pd
 
+from deduplication import deduplicate_flare_table
+from flarecatalogue import iter_flare_table
+from schema import get_header
 from stringmanipulation import get_err_string
 
 if __name__ == "__main__":
 
-    # Load the data
-    flare_table = pd.read_csv(paths.data / "PAPER_flare_table.csv")
-
-    # Sort the data by orbital phase
-    flare_table = flare_table.sort_values(by="tstart", ascending=True)
-
-    # remove duplicates 
-    # Group by TIC and quarter_or_sector, then by timestamp and total_time_observed_in_lc_days, and remove all but first in each group
-    for l, g in flare_table.groupby(['TIC', 'quarter_or_sector']):
-        grouped = g.groupby(['timestamp', 'total_time_observed_in_lc_days'])
-
-        # now keep only the first group
-        flare_table = flare_table.drop(grouped.tail(len(grouped)-1).index)
-
-    print(flare_table[flare_table.ID == "HIP 67522"])
-
-    flare_table.to_csv(paths.data / "zenodo/Table_2_flares.csv", index=False)
-
-    # add text to the top of the written table with explanations of each column
-    top_text = ("# TIC and ID, star designations\n"
-                "# mission, TESS or Kepler\n"
-                "# quarter_or_sector, TESS sector or Kepler quarter\n"
-                "# timestamp, date when light curve was downloaded and analysed\n"
-                "# total_time_observed_in_lc_days, total time observed in this light curve, calculated by summing all valid data points times the cadence\n"
-                "# orbital_phase, orbital phase of the flare\n"
-                "# orbital_phase_err, uncertainty on the orbital phase, derived only for the stars in the final sample\n"
-                "# rel_amplitude, relative amplitude of the flare\n"
-                "# rel_amplitude_err, uncertainty on the relative amplitude\n"
-                "# tstart, start time of the flare\n"
-                "# tstop, stop time of the flare\n"
-                "# ED, equivalent duration of the flare in s\n"
-                "# ED_err, uncertainty on the equivalent duration\n"
-                "# abs_tstart, flare start time in BJD instead of with Kepler/TESS offsets\n")
-    
-    # add the top text to the top of the table in the zenodo folder
-    with open(paths.data / "zenodo/Table_2_flares.csv", "r") as f:
-        lines = f.readlines()
-    with open(paths.data / "zenodo/Table_2_flares.csv", "w") as f:
-        f.write(top_text)
-        f.writelines(lines)
+    # the table is processed chunk by chunk, chunks never split a system,
+    # so that duplicates are always in the same chunk
+    earliest = []
 
+    dropped_path = paths.data / "flare_table_dropped_rows.csv"
+
+    with open(paths.data / "zenodo/Table_2_flares.csv", "w") as f, open(dropped_path, "w") as fdropped:
+
+        for i, chunk in enumerate(iter_flare_table()):
+
+            # remove repeated analyses of a light curve and overlapping flares
+            chunk, dropped = deduplicate_flare_table(chunk)
+
+            # Sort the data by orbital phase
+            chunk = chunk.sort_values(by="tstart", ascending=True)
+
+            print(chunk[chunk.ID == "HIP 67522"])
+
+            # add the explanations of the columns to the top of the table in the zenodo folder
+            if i == 0:
+                f.write(get_header(chunk.columns))
+
+            chunk.to_csv(f, index=False, header=(i == 0))
+
+            # report what was dropped
+            dropped.to_csv(fdropped, index=False, header=(i == 0))
+
+            # keep only the first 20 flares in time for the LaTeX table,
+            # without the suspected instrumental false positives
+            earliest.append(chunk[~chunk.coincident].head(20))
+
+    flare_table = pd.concat(earliest).sort_values(by="tstart", ascending=True).head(20)
 
     # Get ED with uncertainties in one expression
     # flare_table[r"$ED$ [s]"] = flare_table.apply(lambda x: fr"${x.ED:.2f} \pm {x.ED_err:.2f}$",
@@ -9,71 +9,28 @@ sources in the sample to the Rossby number and magnetic field strength.
 
 import numpy as np
 import matplotlib.pyplot as plt
-import pandas as pd
-from astropy.constants import L_sun
-from astropy.table import Table
 
 import paths
 
 import adjustText as aT
-
-
-def tau_wright2018(V, Ks, err=False, eV=None, eKs=None):
-    """Convective turnover time from Wright et al. 2018 using
-    Eq. 5 from that paper.
-
-    Parameters
-    ----------
-    V : float
-        The V magnitude of the star.
-    Ks : float
-        The Ks magnitude of the star.
-    err : bool, optional
-        If True, return the error on the Rossby number.
-        The default is False.
-    eV : float, optional
-        The error on the V magnitude of the star.
-        The default is None.
-    eKs : float, optional
-        The error on the Ks magnitude of the star.
-        The default is None.
-
-    Returns 
-    -------
-    tau : float
-        The convective turnover time of the star.
-    tau_err_high : float
-        The upper error on the convective turnover time.
-    tau_err_low : float
-        The lower error on the convective turnover time.
-
-    """
-
-    tau = 0.64 + 0.25 * (V - Ks)
-
-    if err:
-        tau_err_high = 0.74 + 0.33 * (V + eV - Ks + eKs)
-        tau_err_low = 0.54 + 0.17 * (V - eV - Ks - eKs)
-        return 10**tau, 10**tau_err_high, 10**tau_err_low
-    else:
-        return 10**tau
-
+from refcatalogues import get_reference_catalogue
+from results import get_results
+from stellar import L_SUN_ERG_S, propagate_stellar_parameters
 
 
 if __name__ == "__main__":
 
-    # convert L_sun to erg/s
-    L_sun = L_sun.to('erg/s').value
-
     # read in the data
-    df = pd.read_csv(paths.data / 'results.csv')
+    df = get_results(columns=["ID", "Ro", "Ro_high", "Ro_low", "B_G", "B_G_high", "B_G_low",
+                              "st_rotp", "st_rotp_err", "st_lum", "st_lumerr1", "st_lumerr2",
+                              "xray_flux_erg_s", "xray_flux_err_erg_s"])
 
     # calculate Lx/Lbol
-    lxlbol = df.xray_flux_erg_s/10**df.st_lum/L_sun
+    lxlbol = df.xray_flux_erg_s/10**df.st_lum/L_SUN_ERG_S
 
-    # error propagation
-    lxlbol_err = lxlbol * np.sqrt((df.xray_flux_err_erg_s/df.xray_flux_erg_s)**2 +
-                                  ((df.st_lumerr1-df.st_lumerr2)/2./df.st_lum)**2)
+    # error bars from the percentiles of the uncertainties propagated from Lx and Lbol
+    pct = propagate_stellar_parameters(df, rng=42)
+    lxlbol_err = np.clip([lxlbol - pct.lxlbol_low, pct.lxlbol_high - lxlbol], 0, None)
     
     # make the plot
     fig, [ax1, ax2] = plt.subplots(ncols=1, nrows=2, figsize=(6,9))
@@ -83,14 +40,12 @@ if __name__ == "__main__":
     # Upper panel: Lx vs Ro
 
 
-    # read Wright et al. 2011 data
-    wright2011 = Table.read(paths.data / "wright2011.fit")
-    wright2011["tau"] = tau_wright2018(wright2011["Vmag"], wright2011["Vmag"] - wright2011["V-K"])
-    wright2011["Ro"] = wright2011["Prot"] / wright2011["tau"]   
+    # read Wright et al. 2011 data, with Ro derived
+    wright2011 = get_reference_catalogue("wright2011")
 
         
     # Wright et al. 2011 data
-    ax1.scatter(wright2011["Ro"].value, 10**wright2011["Lx_bol"].value,
+    ax1.scatter(wright2011["Ro"], 10**wright2011["Lx_bol"],
                 label="Wright et al. 2011", c="grey", zorder=-10, marker="x", alpha=0.2)
 
     ax1.errorbar(df.Ro, lxlbol, xerr=[df.Ro - df.Ro_low, df.Ro_high - df.Ro],
@@ -119,15 +74,12 @@ if __name__ == "__main__":
     # ---------------------------------------------------------------------
     # Lower panel: Lx vs B
 
-    # read Reiners et al. 2022 data tsv with tab delimiter
-    reiners2022 = pd.read_csv(paths.data / "reiners2022.tsv", delimiter="\t",
-                              skiprows=72)
-    # replace empty strings
-    reiners2022.replace('     ', np.nan, inplace=True)
+    # read Reiners et al. 2022 data, empty entries are NaN
+    reiners2022 = get_reference_catalogue("reiners2022")
 
     # plot Reiners et al. 2022 data as scatter
-    ax2.scatter(reiners2022["<B>"].astype(float),
-                10**reiners2022["logLX/Lbol"].astype(float), 
+    ax2.scatter(reiners2022["<B>"],
+                10**reiners2022["logLX/Lbol"], 
                 label="Reiners et al. 2022",
                 c="grey", zorder=-10, marker="x", alpha=0.55)
 
@@ -15,6 +15,8 @@ import paths
 import re
 
 from stringmanipulation import get_err_string
+from results import get_results
+from schema import get_labels, write_table
 
 def round_to_1(x):
     if x == 0:
@@ -108,38 +110,13 @@ if __name__ == "__main__":
 
             ("mean", "std","err")]
     
-    # define the latex column names
-    map_col_names = {
-        "st_rotp":r"$P_{\rm rot}$",
-        "orbper_d":r"$P_{\rm orb}$",
-        "st_rad":r"$R_{*}$",
-        "pl_radj":r"$R_{\rm p}$",
-        "a_au":r"$a$",
-        "pl_orbeccen":"$e$",
-        "st_lum":"log$_{10} L_{*}$",
-        "Ro":r"$R$o",
-        "B_G":r"$B$",
-        "p_spi_sb_bp1_erg_s":r"log$_{10} P_{\rm spi,sb}$",
-        "p_spi_aw_bp1_erg_s":r"log$_{10} P_{\rm spi,aw}$",
-        "p_spi_sb_bp0_erg_s":r"log$_{10} P_{\rm spi,sb0}$",
-        "p_spi_aw_bp0_erg_s":r"log$_{10} P_{\rm spi,aw0}$",
-        "v_rel_km_s":r"$v_{\mathrm{rel}}$",
-        "mean":r"$p$-value",
-        "obstime_d":"obs. time",
-        "a_rstar":r"$a/R_*$",
-        }
+    # get the latex column names from the registry
+    map_col_names = get_labels([col[0] for col in cols] + ["obstime_d"])
     
 
 
-    # read table to texify
-    df = pd.read_csv(paths.data / "results.csv")
-
-    # convert au and au_err to 10^-2 au
-    df["a_au"] = df["a_au"] * 100
-    df["a_au_err"] = df["a_au_err"] * 100
-
-    # select only the columns we want
-    sel = df[["ID","TIC",'obstime_d',"st_spectype","st_spectype_bibkey",
+    # read table to texify, only the columns we want of the systems in the paper sample
+    singles = get_results("paper_sample", columns=["ID","TIC",'obstime_d',"st_spectype","st_spectype_bibkey",
                 'st_rotp','st_rotp_err','st_rotp_source', 
                 "orbper_d","orbper_d_err", "pl_orbper_bibkey",
                 "pl_orbeccen", "pl_orbeccenerr1", "pl_orbeccenerr2", "pl_orbeccen_bibkey",
@@ -156,25 +133,7 @@ if __name__ == "__main__":
                'p_spi_aw_bp1_erg_s', 'p_spi_aw_bp1_erg_s_high','p_spi_aw_bp1_erg_s_low', 
                "p_spi_sb_bp0_erg_s","p_spi_sb_bp0_erg_s_high","p_spi_sb_bp0_erg_s_low",
                'p_spi_aw_bp0_erg_s', 'p_spi_aw_bp0_erg_s_high','p_spi_aw_bp0_erg_s_low',
-                "mean", "std","a_rstar", "a_rstar_err"]]
-    
-
-    
-    # select only the single stars
-    singles = sel[sel.multiple_star.isnull()]
-
-
-
-    # drop rows with TIC 67646988 and 236387002, the brown dwarfs
-    singles = singles[singles.TIC != "67646988" ]
-    singles = singles[singles.TIC != "236387002" ]
-
-    # the old Kepler-411 instance
-    singles = singles[singles.TIC != "399954349(c)" ]
-
-    # GJ 1061 because rotation is unclear
-    singles = singles[singles.TIC != "79611981" ]
-
+                "mean", "std","a_rstar", "a_rstar_err"])
 
     # rename the column with the source of the rotation period
     singles = singles.rename(index=str, columns={"st_rotp_source":"st_rotp_bibkey",
@@ -186,6 +145,17 @@ if __name__ == "__main__":
 
     fulltable = singles.copy()
 
+    # write the table without the bibkeys to a csv file in the zenodo folder,
+    # with a header that explains the columns
+    s = singles.drop(columns=[col for col in singles.columns if "bibkey" in col] +
+                             ["multiple_star", "multiple_star_source", "orbits_covered"])
+    write_table(s, paths.data / "zenodo/Tables_1_3_star_planet_systems.csv",
+                names={"obstime_d": "obs. time"})
+
+    # convert au and au_err to 10^-2 au
+    singles["a_au"] = singles["a_au"] * 100
+    singles["a_au_err"] = singles["a_au_err"] * 100
+
 
     # calc log10 of the values in the list of columns
     convtolog10 = ["p_spi_sb_bp1_erg_s","p_spi_sb_bp1_erg_s_high","p_spi_sb_bp1_erg_s_low",
@@ -214,61 +184,6 @@ if __name__ == "__main__":
     del singles["multiple_star_source"]
     del singles["orbits_covered"]
 
-    s = singles.copy()
-
-    # drop all bibkey columns
-    for col in s.columns:
-        if "bibkey" in col:
-            del s[col]
-
-    # write the singles table to a csv file in the zenodo folder
-    s.to_csv(paths.data / "zenodo/Tables_1_3_star_planet_systems.csv", index=False)
-
-    # add text to the top of the table that explains the columns
-    top_text = ("# ID and TIC,star identifier\n"
-                "# obs. time, time span of the observations in days\n"
-                "# st_spectype, spectral type of the star\n"
-                "# st_rotp, rotation period of the star in days\n"
-                "# st_rotp_err, uncertainty on the rotation period\n"
-                "# orbper_d, orbital period of the planet in days\n"
-                "# orbper_d_err, uncertainty on the orbital period\n"
-                "# pl_orbeccen, orbital eccentricity of the innermost planet\n"
-                "# pl_orbeccenerr1, upper uncertainty on the orbital eccentricity\n"
-                "# pl_orbeccenerr2, lower uncertainty on the orbital eccentricity\n"
-                "# st_rad, stellar radius in solar radii\n"
-                "# st_rad_err1, upper uncertainty on the stellar radius\n"
-                "# pl_radj, planetary radius in Jupiter radii\n"
-                "# pl_radjerr1, upper uncertainty on the planetary radius\n"
-                "# pl_raderr2, lower uncertainty on the planetary radius\n"
-                "# Ro, Rossby number\n"
-                "# Ro_high, Ro + upper uncertainty on the Rossby number\n"
-                "# Ro_low, Ro - lower uncertainty on the Rossby number\n"
-                "# st_lum, stellar luminosity in solar luminosities\n"
-                "# st_lumerr1, upper uncertainty on the stellar luminosity\n"
-                "# st_lumerr2, lower uncertainty on the stellar luminosity\n"
-                "# a_au, planet-star distance in au\n"
-                "# a_au_err, uncertainty on the planet-star distance\n"
-                "# B_G, stellar surface magnetic field strength in Gauss\n"
-                "# B_G_high, B_G + upper uncertainty on the stellar surface magnetic field strength\n"
-                "# B_G_low, B_G - lower uncertainty on the stellar surface magnetic field strength\n"
-                "# v_rel_km_s, relative velocity between corotating stellar magnetic field and planet at the planet's orbital distance in km/s\n"
-                "# v_rel_err_km_s, uncertainty on the relative velocity\n"
-                "# p_spi_sb_bp1_erg_s, power of magnetic star-planet interaction with a 1G planetary field using the stretch-and-break mechanism in erg/s\n"
-                "# p_spi_sb_bp1_erg_s_high, power + upper uncertainty on the power of magnetic star-planet interaction with a 1G planetary field using the stretch-and-break mechanism\n"
-                "# p_spi_sb_bp1_erg_s_low, power - lower uncertainty on the power of magnetic star-planet interaction with a 1G planetary field using the stretch-and-break mechanism\n"
-                "# p_spi_aw_bp1_erg_s, power of magnetic star-planet interaction with a 1G planetary field using the Alfvén wave mechanism in erg/s\n"
-                "# p_spi_aw_bp1_erg_s_high, power + upper uncertainty on the power of magnetic star-planet interaction with a 1G planetary field using the Alfvén wave mechanism\n"
-                "# p_spi_aw_bp1_erg_s_low, power - lower uncertainty on the power of magnetic star-planet interaction with a 1G planetary field using the Alfvén wave mechanism\n"
-                "# p_spi_sb_bp0_erg_s, power of magnetic star-planet interaction with an unmagnetized planet using the stretch-and-break mechanism in erg/s\n"
-                "# p_spi_sb_bp0_erg_s_high, power + upper uncertainty on the power of magnetic star-planet interaction with an unmagnetized planet using the stretch-and-break mechanism\n"
-                "# p_spi_sb_bp0_erg_s_low, power - lower uncertainty on the power of magnetic star-planet interaction with an unmagnetized planet using the stretch-and-break mechanism\n"
-                "# p_spi_aw_bp0_erg_s, power of magnetic star-planet interaction with an unmagnetized planet using the Alfvén wave mechanism in erg/s\n"
-                "# p_spi_aw_bp0_erg_s_high, power + upper uncertainty on the power of magnetic star-planet interaction with an unmagnetized planet using the Alfvén wave mechanism\n"
-                "# p_spi_aw_bp0_erg_s_low, power - lower uncertainty on the power of magnetic star-planet interaction with an unmagnetized planet using the Alfvén wave mechanism\n"
-                "# mean, mean p-value of the Anderson-Darling test\n"
-                "# std, standard deviation of the p-values of the Anderson-Darling test\n"
-                "# a_rstar, planet-star distance in stellar radii\n"
-                "# a_rstar_err, uncertainty on the planet-star distance in stellar radii\n")
 
 
     # add the bibkey to the spectral type
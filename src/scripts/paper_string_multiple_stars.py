@@ -7,15 +7,15 @@ Script that generates a list of excluded stars based on multiplicity and
 contamination, with reference to where the multiplicity info was found.
 """
 
-import pandas as pd
 
 import paths
+from results import get_results
 
 if __name__ == "__main__":
 
     # read table
     print("[UP ]Read results table ", paths.data / "results.csv")
-    df = pd.read_csv(paths.data / "results.csv")
+    df = get_results(columns=["ID", "multiple_star", "multiple_star_source"])
 
     # select only multiple or contaminated stars
     multiples = df[~df.multiple_star.isnull()]
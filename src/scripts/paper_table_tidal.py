@@ -9,10 +9,11 @@ references for the footnote), and 2. derived interaction, and AD test results
 for the Porb/2 (i.e., in phase with tidal bulges). 
 """
 
-import pandas as pd
 import numpy as np
 import paths
 
+from schema import read_table, write_table
+
 def round_to_1(x):
     if x == 0:
         return 0
@@ -78,8 +79,16 @@ def g(row, col, oneerr=False):
 
 if __name__ == "__main__":
 
-    # read in the tidal results
-    df = pd.read_csv(paths.data / "TIS_with_ADtests.csv")
+    # select columns to go on zenodo
+    cols = ["TIC", "ID", "M_star", "M_star_up_err", "M_star_low_err",
+            "M_pl", "M_pl_up_err", "M_pl_low_err",	"grav_pert", 
+            "grav_pert_low_err", "grav_pert_up_err", "tidal_disip_timescale",
+            "tidal_disip_timescale_up_err", "tidal_disip_timescale_low_err",
+            "torque_conv", "torque_conv_up_err", "torque_conv_low_err", "mean", "std"]
+
+    # read in the tidal results, only the columns used here
+    df = read_table(paths.data / "TIS_with_ADtests.csv",
+                    columns=cols + ["st_mass_bibkey", "pl_bmassj_bibkey"])
 
     # sort by p-value
     df = df.sort_values(by="mean", ascending=False)
@@ -95,42 +104,9 @@ if __name__ == "__main__":
 
     dfz = df.copy()
 
-    # select columns to go on zenodo
-    cols = ["TIC", "ID", "M_star", "M_star_up_err", "M_star_low_err",
-            "M_pl", "M_pl_up_err", "M_pl_low_err",	"grav_pert", 
-            "grav_pert_low_err", "grav_pert_up_err", "tidal_disip_timescale",
-            "tidal_disip_timescale_up_err", "tidal_disip_timescale_low_err",
-            "torque_conv", "torque_conv_up_err", "torque_conv_low_err", "mean", "std"]
-
-    # save table to file in the zenodo folder
-    dfz[cols].to_csv(paths.data / "zenodo/Table_4_tidal_interaction.csv", index=False)
-
-    # add text to the top of the written table with explanations of each column
-    top_text = ("# TIC and ID, star designations\n"
-                "# M_star, stellar mass in solar masses\n"
-                "# M_star_up_err, upper uncertainty on the stellar mass\n"
-                "# M_star_low_err, lower uncertainty on the stellar mass\n"
-                "# M_pl, planetary mass in Jupiter masses\n"
-                "# M_pl_up_err, upper uncertainty on the planetary mass\n"
-                "# M_pl_low_err, lower uncertainty on the planetary mass\n"
-                "# grav_pert, gravitational perturbation\n"
-                "# grav_pert_low_err, lower uncertainty on the gravitational perturbation\n"
-                "# grav_pert_up_err, upper uncertainty on the gravitational perturbation\n"
-                "# tidal_disip_timescale, tidal dissipation timescale in years\n"
-                "# tidal_disip_timescale_up_err, upper uncertainty on the tidal dissipation timescale\n"
-                "# tidal_disip_timescale_low_err, lower uncertainty on the tidal dissipation timescale\n"
-                "# torque_conv, convective torque in solar masses x (km/s)^2\n"
-                "# torque_conv_up_err, upper uncertainty on the convective torque\n"
-                "# torque_conv_low_err, lower uncertainty on the convective torque\n"
-                "# mean, mean of the Anderson-Darling test p-values\n"
-                "# std, standard deviation of the Anderson-Darling test p-values\n")
-    
-    # add the top text to the top of the table in the zenodo folder
-    with open(paths.data / "zenodo/Table_4_tidal_interaction.csv", "r") as f:
-        lines = f.readlines()
-    with open(paths.data / "zenodo/Table_4_tidal_interaction.csv", "w") as f:
-        f.write(top_text)
-        f.writelines(lines)
+    # save table to file in the zenodo folder, with a header that
+    # explains each column
+    write_table(dfz[cols], paths.data / "zenodo/Table_4_tidal_interaction.csv")
 
 
     # take absolute value of torque_conv_up_err and torque_conv_low_err
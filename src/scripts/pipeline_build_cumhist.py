@@ -0,0 +1,177 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Script that builds the coverage, i.e., the expected cumulative
+distribution of flare phases (columns `p` and `f`), of every system in
+the results table from the cached light curves, and keeps it in the
+coverage store (see `cumhiststore.py`).
+
+Kepler and TESS coverage of the same star is merged in BJD and folded
+with the orbital period. A manifest records which light curves and
+which ephemeris went into each file, so that only systems with new or
+changed light curves are rebuilt. Systems are built in a process pool,
+and added to the store as they finish.
+
+Usage: python pipeline_build_cumhist.py [--workers N] [--force]
+"""
+
+import argparse
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import paths
+
+from cumhiststore import CumhistStore
+from ephemeris import get_ephemerides
+from exposure import merge_gtis, fold_gtis
+from lightcurves import cached_light_curves, read_gtis
+from results import get_results
+
+
+# keeps track of the inputs of every coverage file
+MANIFEST = paths.data / "cumhist_manifest.json"
+
+# compact the store when replaced coverage takes up more than this fraction
+MAX_UNUSED_FRACTION = 0.5
+
+
+def read_manifest():
+    """Read the manifest of the coverage files, keyed by TIC."""
+    if MANIFEST.exists():
+        with open(MANIFEST, "r") as f:
+            return json.load(f)
+    return {}
+
+
+def write_manifest(manifest):
+    """Write the manifest of the coverage files."""
+    with open(MANIFEST, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+
+
+def compact_if_unused(store):
+    """Drop the replaced coverage from the store if it takes up more
+    than `MAX_UNUSED_FRACTION` of it."""
+    if store.get_unused_fraction() > MAX_UNUSED_FRACTION:
+        store.compact()
+
+
+def get_systems(res):
+    """Get TIC, orbital period, and transit midtime for every system,
+    using the ephemeris of the first planet listed.
+
+    Systems without a numeric TIC are skipped. If the results table
+    has no transit midtime, phase zero is at BJD = 0.
+
+    Parameters
+    ----------
+    res : pandas.DataFrame
+        The results table.
+
+    Returns
+    -------
+    systems : pandas.DataFrame
+        Columns TIC, orbper_d, and t0 with one row per star.
+    """
+    systems = get_ephemerides(res)
+
+    # without T0, phase zero is at BJD = 0, as in `ephemeris.get_orbital_phases`
+    systems = systems[systems.planet == 0].fillna({"t0": 0.})
+
+    return systems[["TIC", "orbper_d", "t0"]]
+
+
+def get_signature(lcs, orbper, t0):
+    """Describe the inputs of a coverage file so that changes can be
+    detected: the light curves (mission, quarter or sector, part) and
+    the ephemeris.
+    """
+    lcnames = [f"{row.mission}_{row.quarter_or_sector}_{row.part}"
+               for row in lcs.itertuples()]
+    return {"light_curves": lcnames, "orbper_d": float(orbper), "t0": float(t0)}
+
+
+def build_cumhist(tic, lcpaths, orbper, t0):
+    """Merge the coverage of all light curves of a star, and fold it
+    with the orbital period.
+
+    Parameters
+    ----------
+    tic : int
+        TIC of the star.
+    lcpaths : list of pathlib.Path
+        Paths to the cached light curves of the star.
+    orbper : float
+        Orbital period in days.
+    t0 : float
+        Reference time of phase zero in BJD.
+
+    Returns
+    -------
+    tic : int
+        TIC of the star, to match results from the process pool.
+    p, f : arrays
+        Phases and cumulative fraction of the observing time.
+    """
+    gtis = merge_gtis(*[read_gtis(path) for path in lcpaths])
+
+    p, f = fold_gtis(gtis, orbper, t0=t0)
+
+    return tic, p, f
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Build the coverage files.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of processes, default is all cores")
+    parser.add_argument("--force", action="store_true",
+                        help="rebuild all systems")
+    args = parser.parse_args()
+
+    # read results table
+    res = get_results()
+    systems = get_systems(res)
+
+    # list all cached light curves
+    lcs = cached_light_curves()
+
+    # compare the inputs of every system to the manifest
+    manifest = {} if args.force else read_manifest()
+    store = CumhistStore()
+
+    todo = []
+    for row in systems.itertuples():
+
+        g = lcs[lcs.TIC == row.TIC]
+
+        # no light curves, no coverage
+        if g.shape[0] == 0:
+            continue
+
+        signature = get_signature(g, row.orbper_d, row.t0)
+
+        if (manifest.get(str(row.TIC)) != signature) | (str(row.TIC) not in store.index):
+            todo.append((row.TIC, list(g.path), row.orbper_d, row.t0, signature))
+
+    print(f"Rebuild coverage of {len(todo)} out of {systems.shape[0]} systems.")
+
+    # build the affected systems in parallel, and keep the store and the
+    # manifest up to date for all finished systems even if one of them fails
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = {pool.submit(build_cumhist, tic, lcpaths, orbper, t0): signature
+                       for tic, lcpaths, orbper, t0, signature in todo}
+
+            for future in as_completed(futures):
+                tic, p, f = future.result()
+                store.append(tic, p, f)
+                manifest[str(tic)] = futures[future]
+    finally:
+        store.write_index()
+        write_manifest(manifest)
+
+    # drop the replaced coverage if it takes up most of the store
+    compact_if_unused(store)
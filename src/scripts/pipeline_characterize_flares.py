@@ -0,0 +1,104 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Script that recomputes ED, ED_err, rel_amplitude, and rel_amplitude_err
+for all flares in a flare table from the cached light curves, e.g.,
+after a change in the detrending. The flare start and stop times are
+kept. Light curves are processed in parallel, and all flares of a
+light curve are characterized at once.
+
+Usage: python pipeline_characterize_flares.py [--input FILE] [--output FILE]
+                                              [--window DAYS] [--workers N]
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+import paths
+
+from flarecharacterization import characterize_flares, get_indices
+from flarefinding import read_detrended
+from lightcurves import cached_light_curves
+
+
+def recharacterize(lcpaths, tstart, tstop, window_days=0.25):
+    """Characterize the flares of one light curve.
+
+    Parameters
+    ----------
+    lcpaths : list of pathlib.Path
+        Cached files of the light curve.
+    tstart, tstop : arrays
+        Start and stop times of the flares on the mission time axis.
+    window_days : float, optional
+        Width of the rolling median window in days.
+
+    Returns
+    -------
+    flares : pandas.DataFrame
+        ED, ED_err, rel_amplitude, and rel_amplitude_err of the flares,
+        in the order of `tstart`.
+    """
+    lcs = [read_detrended(path, window_days=window_days) for path in lcpaths]
+    time, rel_flux, rel_flux_err = [np.concatenate(a) for a in zip(*lcs)]
+
+    # sort by time, in case the files are not in order
+    order = np.argsort(time, kind="stable")
+    time, rel_flux, rel_flux_err = time[order], rel_flux[order], rel_flux_err[order]
+
+    istart, istop = get_indices(time, tstart, tstop)
+
+    return characterize_flares(time, rel_flux, rel_flux_err, istart, istop)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Recompute the flare properties.")
+    parser.add_argument("--input", default="PAPER_flare_table.csv",
+                        help="flare table in the data folder")
+    parser.add_argument("--output", default="PAPER_flare_table_recharacterized.csv",
+                        help="output file in the data folder")
+    parser.add_argument("--window", type=float, default=0.25,
+                        help="rolling median window in days")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of processes, default is all cores")
+    args = parser.parse_args()
+
+    # read in flare table
+    flare_table = pd.read_csv(paths.data / args.input)
+    flare_table["TIC_int"] = pd.to_numeric(flare_table.TIC, errors="coerce")
+
+    # cached light curves, grouped in the same way as the flare table
+    lcs = cached_light_curves()
+    lcpaths = {key: list(g.path) for key, g in
+               lcs.groupby(["TIC", "mission", "quarter_or_sector"])}
+
+    # one task per light curve with flares
+    flares = flare_table[flare_table.tstart.notnull() & flare_table.TIC_int.notnull()]
+    tasks, rows = [], []
+    for (tic, mission, qs), g in flares.groupby(["TIC_int", "mission", "quarter_or_sector"]):
+        key = (int(tic), mission, int(qs))
+        if key not in lcpaths:
+            print(f"No cached light curve for {key}, keep old values.")
+            continue
+        tasks.append((lcpaths[key], g.tstart.values, g.tstop.values))
+        rows.append(g.index)
+
+    print(f"Characterize flares in {len(tasks)} light curves.")
+
+    # characterize all light curves in parallel
+    cols = ["ED", "ED_err", "rel_amplitude", "rel_amplitude_err"]
+    run = partial(recharacterize, window_days=args.window)
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for index, new in zip(rows, pool.map(run, *zip(*tasks), chunksize=4)):
+            flare_table.loc[index, cols] = new[cols].values
+
+    # write to file
+    del flare_table["TIC_int"]
+    flare_table.to_csv(paths.data / args.output, index=False)
@@ -0,0 +1,58 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Script that screens all hosts in the results table for contamination
+from nearby sources in the local neighbour catalogue snapshot
+`neighbours.csv` (columns ra, dec, mag), and writes candidate
+`multiple_star` flags to `multiple_star_candidates.csv` for comparison
+with the curated flags.
+
+Usage: python pipeline_contamination_screening.py [--threshold FLUXRATIO]
+"""
+
+import argparse
+
+import pandas as pd
+
+import paths
+
+from contamination import get_contamination, flag_multiple_star_candidates
+from flarecatalogue import load_flare_table
+from results import get_results
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Screen hosts for contamination.")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="flux ratio of neighbours to host to flag a host")
+    args = parser.parse_args()
+
+    # read results table and neighbour catalogue
+    res = get_results()
+    catalog = pd.read_csv(paths.data / "neighbours.csv")
+
+    # missions that observed each star
+    flares = load_flare_table(columns=["TIC", "mission"])
+    missions = flares.groupby("TIC").mission.agg(set).to_dict()
+
+    # compute contamination for all hosts at once
+    hosts = res[["TIC", "ID", "ra", "dec", "multiple_star"]].dropna(subset=["ra", "dec"])
+    contamination = get_contamination(hosts, catalog)
+    contamination.insert(1, "ID", hosts.ID.values)
+
+    contamination["multiple_star_candidate"] = flag_multiple_star_candidates(
+        contamination, missions=missions, threshold=args.threshold)
+
+    # compare to the curated flags
+    curated = hosts.multiple_star.notnull().values
+    candidate = contamination.multiple_star_candidate.values
+    print(f"{candidate.sum()} candidates, {(candidate & curated).sum()} of them "
+          f"already flagged, {(candidate & ~curated).sum()} new, "
+          f"{(~candidate & curated).sum()} curated flags not recovered.")
+
+    # write to file
+    print("Write to file ", paths.data / "multiple_star_candidates.csv")
+    contamination.to_csv(paths.data / "multiple_star_candidates.csv", index=False)
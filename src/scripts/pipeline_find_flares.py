@@ -0,0 +1,57 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Script that searches all cached light curves for flares in a process
+pool, and writes the results in the schema of `PAPER_flare_table.csv`
+to `flare_table_detected.csv`.
+
+Usage: python pipeline_find_flares.py [--workers N] [--chunksize N]
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import pandas as pd
+
+import paths
+
+from flarefinding import find_flares
+from lightcurves import cached_light_curves
+from results import get_results
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Find flares in all light curves.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of processes, default is all cores")
+    parser.add_argument("--chunksize", type=int, default=100000,
+                        help="number of cadences read at once")
+    args = parser.parse_args()
+
+    # get the names of the stars from the results table
+    res = get_results()
+    names = res.drop_duplicates(subset="TIC")
+    names = dict(zip(names.TIC, names.ID))
+
+    # one task per light curve, combining all files of a quarter or sector
+    lcs = cached_light_curves()
+    tasks = [(tic, names.get(tic, f"TIC {tic}"), mission, qs, list(g.path))
+             for (tic, mission, qs), g in lcs.groupby(["TIC", "mission", "quarter_or_sector"])]
+
+    print(f"Search {len(tasks)} light curves for flares.")
+
+    # search all light curves in parallel
+    search = partial(find_flares, chunksize=args.chunksize)
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        flare_table = list(pool.map(search, *zip(*tasks), chunksize=4))
+
+    flare_table = pd.concat(flare_table, ignore_index=True)
+
+    print(f"Found {flare_table.tstart.notnull().sum()} flares.")
+
+    # write to file
+    flare_table.to_csv(paths.data / "flare_table_detected.csv", index=False)
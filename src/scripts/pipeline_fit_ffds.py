@@ -0,0 +1,49 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Script that fits power laws to the flare frequency distributions of all
+systems in the flare catalogue, chunk by chunk, and writes alpha, the
+flare rate, and their uncertainties to `ffd_fits.csv`.
+
+Usage: python pipeline_fit_ffds.py [--edmin S] [--nboot N] [--seed N]
+"""
+
+import argparse
+
+import pandas as pd
+
+import paths
+
+from ffd import fit_powerlaws, get_observing_time
+from flarecatalogue import iter_flare_table
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Fit the FFDs of all systems.")
+    parser.add_argument("--edmin", type=float, default=None,
+                        help="minimum ED in s, default is the smallest ED per system")
+    parser.add_argument("--nboot", type=int, default=1000,
+                        help="number of bootstrap resamples")
+    parser.add_argument("--seed", type=int, default=42,
+                        help="seed for the bootstrap")
+    args = parser.parse_args()
+
+    columns = ["TIC", "mission", "quarter_or_sector", "total_time_observed_in_lc_days", "ED",
+               "coincident"]
+
+    # chunks never split a system, so every system is fitted in one piece,
+    # the coincident flares are left out, but not their observing time
+    fits = [fit_powerlaws(chunk.TIC, chunk.ED.where(~chunk.coincident), ed_min=args.edmin,
+                          tobs=get_observing_time(chunk), nboot=args.nboot,
+                          rng=args.seed + i)
+            for i, chunk in enumerate(iter_flare_table(columns=columns))]
+
+    fits = pd.concat(fits, ignore_index=True)
+
+    print(f"Fitted {fits.alpha.notnull().sum()} out of {fits.shape[0]} systems.")
+
+    # write to file
+    fits.to_csv(paths.data / "ffd_fits.csv", index=False)
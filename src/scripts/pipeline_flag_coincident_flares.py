@@ -0,0 +1,57 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Script that tags flare candidates that occur simultaneously on several
+stars in the same quarter or sector as suspected instrumental false
+positives, and writes the tag to the flare table, in the columns
+coincidence_group, n_coincident_targets, and coincident. All other
+values of the table are written as they were read. The FFD fits, the AD
+tests, and the LaTeX flare table leave out the coincident flares.
+
+Usage: python pipeline_flag_coincident_flares.py [--input FILE] [--output FILE]
+                                                 [--tol DAYS] [--min_targets N]
+"""
+
+import argparse
+
+import pandas as pd
+
+import paths
+
+from coincidence import COINCIDENCE_COLUMNS, tag_coincident_flares
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Flag coincident flares.")
+    parser.add_argument("--input", default="PAPER_flare_table.csv",
+                        help="flare table in the data folder")
+    parser.add_argument("--output", default=None,
+                        help="tagged flare table in the data folder, default is the input")
+    parser.add_argument("--tol", type=float, default=0.01,
+                        help="tolerance for coincidence in days")
+    parser.add_argument("--min_targets", type=int, default=3,
+                        help="minimum number of stars in a coincident group")
+    args = parser.parse_args()
+
+    # read in flare table, and keep all values as they are written
+    flare_table = pd.read_csv(paths.data / args.input)
+    raw = pd.read_csv(paths.data / args.input, dtype=str, keep_default_na=False)
+
+    # tag the coincident flares
+    tagged = tag_coincident_flares(flare_table, tol=args.tol,
+                                   min_targets=args.min_targets)
+    suspects = tagged[tagged.coincident]
+
+    print(f"{suspects.shape[0]} flares in {suspects.coincidence_group.nunique()} "
+          f"coincident groups are suspected false positives.")
+
+    # write to file
+    for col in COINCIDENCE_COLUMNS:
+        raw[col] = tagged[col]
+
+    outfile = paths.data / (args.input if args.output is None else args.output)
+    print("Write to file ", outfile)
+    raw.to_csv(outfile, index=False)
@@ -0,0 +1,57 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Script that runs injection-recovery trials on all cached light curves in
+a process pool, and stores the recovery probability and ED bias grids in
+`src/data/injrec`. Light curves that already have a grid are skipped.
+
+Usage: python pipeline_injection_recovery.py [--ntrials N] [--nflares N]
+                                             [--workers N] [--force]
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from injrec import (inject_recover, get_recovery_grid, get_grid_path,
+                    write_recovery_grid)
+from lightcurves import cached_light_curves
+
+
+def run_light_curve(tic, mission, qs, lcpaths, ntrials, nflares):
+    """Run the trials on one light curve and write its grid."""
+    injected = inject_recover(lcpaths, ntrials=ntrials, nflares=nflares,
+                              seed=int(tic) + int(qs))
+    write_recovery_grid(get_recovery_grid(injected), tic, mission, qs)
+    return tic, mission, qs
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Injection-recovery trials.")
+    parser.add_argument("--ntrials", type=int, default=100,
+                        help="number of trials per light curve")
+    parser.add_argument("--nflares", type=int, default=20,
+                        help="number of flares injected per trial")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of processes, default is all cores")
+    parser.add_argument("--force", action="store_true",
+                        help="rerun light curves that already have a grid")
+    args = parser.parse_args()
+
+    # one task per light curve, combining all files of a quarter or sector
+    lcs = cached_light_curves()
+    tasks = [(tic, mission, qs, list(g.path))
+             for (tic, mission, qs), g in lcs.groupby(["TIC", "mission", "quarter_or_sector"])
+             if args.force or not get_grid_path(tic, mission, qs).exists()]
+
+    print(f"Run injection-recovery on {len(tasks)} light curves.")
+
+    # run all light curves in parallel
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(run_light_curve, *task, args.ntrials, args.nflares)
+                   for task in tasks]
+        for future in as_completed(futures):
+            tic, mission, qs = future.result()
+            print(f"Wrote {get_grid_path(tic, mission, qs).name}")
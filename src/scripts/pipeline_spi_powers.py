@@ -0,0 +1,40 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Script that calculates the relative velocity and the expected power of
+magnetic star-planet interaction in all four scenarios for all systems
+in the results table, normalizes the powers to AU Mic, and writes them
+to `spi_powers.csv`.
+
+Usage: python pipeline_spi_powers.py [--nsamples N] [--seed N]
+"""
+
+import argparse
+
+import paths
+
+from results import get_results
+from schema import write_table
+from spi import COLUMNS, SPICalculator
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Calculate the expected power of SPI.")
+    parser.add_argument("--nsamples", type=int, default=10000,
+                        help="number of Monte Carlo draws per system")
+    parser.add_argument("--seed", type=int, default=42,
+                        help="seed for the draws")
+    args = parser.parse_args()
+
+    df = get_results(columns=["ID"] + COLUMNS)
+
+    spi = SPICalculator(df, nsamples=args.nsamples, rng=args.seed)
+    table = spi.get_table()
+    table.insert(1, "ID", df.ID)
+
+    path = paths.data / "spi_powers.csv"
+    write_table(table, path)
+    print(f"Wrote the SPI powers of {table.shape[0]} systems to {path}")
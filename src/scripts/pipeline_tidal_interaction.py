@@ -0,0 +1,61 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Script that calculates the gravitational perturbation, tidal
+dissipation timescale, and tidal torque for all systems with stellar
+and planetary masses in `TIS_with_ADtests.csv`, using the radii, orbits,
+and rotation periods from the results table, and writes them with the
+masses to `tidal_interaction.csv`.
+
+Usage: python pipeline_tidal_interaction.py [--nsamples N] [--seed N]
+"""
+
+import argparse
+import warnings
+
+import numpy as np
+
+import paths
+
+from aliases import normalize_tic
+from results import get_results
+from schema import read_table, write_table
+from tidal import COLUMNS, MODELS, calculate_tidal_interaction
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Calculate the tidal interaction strength.")
+    parser.add_argument("--nsamples", type=int, default=10000,
+                        help="number of Monte Carlo draws per system")
+    parser.add_argument("--seed", type=int, default=42,
+                        help="seed for the draws")
+    args = parser.parse_args()
+
+    # masses from the literature
+    masses = ["M_star", "M_star_up_err", "M_star_low_err", "M_pl", "M_pl_up_err", "M_pl_low_err"]
+    tis = read_table(paths.data / "TIS_with_ADtests.csv", columns=["TIC", "ID"] + masses)
+    tis["TIC"] = normalize_tic(tis.TIC)
+    tis = tis.dropna(subset=["TIC"]).astype({"TIC": np.int64})
+
+    # radii, orbits, and rotation periods
+    res = get_results(columns=["TIC"] + [col for col in COLUMNS if col not in masses])
+    df = tis.merge(res, on="TIC", how="left", indicator=True)
+
+    # systems that are not in the results table have no radii and orbits
+    missing = df._merge == "left_only"
+    if missing.any():
+        warnings.warn(f"{missing.sum()} systems are not in the results table, "
+                      f"and are dropped: {list(df.ID[missing])}")
+    df = df[~missing].drop(columns="_merge")
+
+    df = df.join(calculate_tidal_interaction(df, nsamples=args.nsamples, rng=args.seed))
+
+    columns = ["TIC", "ID"] + masses + [f"{model}{err}" for model in MODELS
+                                        for err in ["", "_up_err", "_low_err"]]
+
+    path = paths.data / "tidal_interaction.csv"
+    write_table(df[columns], path)
+    print(f"Wrote the tidal interaction of {df.shape[0]} systems to {path}")
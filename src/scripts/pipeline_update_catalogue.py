@@ -0,0 +1,177 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Script that updates the derived products of the catalogue only for the
+systems that changed since the last run. The flare table and the cached
+light curves are compared to the last snapshot by light curve (TIC,
+mission, quarter or sector), and the ephemerides in the results table
+by system. For every affected system, the script
+
+- rebuilds the coverage in the coverage store,
+- repeats the AD test of the flare phases against the coverage, and
+  replaces the system's row in `adtests.csv` (TIC, n_flares, A2, mean,
+  std), and
+- writes the mean and std of the p-value to the row of the system's
+  first planet in `results.csv`, from which the figures, tables, and the
+  query service read them. The other columns and rows of the results
+  table are left as they are.
+
+Systems that are no longer in the results table are dropped from
+`adtests.csv`, and the coverage store is compacted when replaced
+coverage takes up most of it, as in `pipeline_build_cumhist.py`. The
+snapshot is only updated when all systems are done.
+
+Usage: python pipeline_update_catalogue.py [--force] [--nsamples N] [--ndraws N]
+"""
+
+import argparse
+import warnings
+
+import numpy as np
+import pandas as pd
+
+import paths
+
+from adtest import ad_test
+from aliases import EXCLUDED_IDS, EXCLUDED_TICS, normalize_tic
+from cumhiststore import CumhistStore
+from ephemeris import get_ephemerides, get_orbital_phases
+from flarecatalogue import load_system
+from lightcurves import cached_light_curves
+from pipeline_build_cumhist import (build_cumhist, compact_if_unused, get_signature,
+                                    get_systems, read_manifest, write_manifest)
+from results import RESULTS_CSV, get_results
+from snapshot import get_affected_systems, read_snapshot, take_snapshot, write_snapshot
+
+
+# AD test results of all systems
+ADTESTS_PATH = paths.data / "adtests.csv"
+
+
+def run_ad_test(tic, ephemerides, store, nsamples, ndraws):
+    """AD test of the phases of the flares above 1 s in ED of a system,
+    without the coincident flares, against its coverage from the store.
+
+    Returns
+    -------
+    row : dict
+        TIC, n_flares, A2, mean and std of the p-value. The statistics
+        are NaN if the system has no flares or no coverage.
+    """
+    row = {"TIC": tic, "n_flares": 0, "A2": np.nan, "mean": np.nan, "std": np.nan}
+
+    flares = load_system(tic, columns=["TIC", "mission", "tstart", "abs_tstart", "ED",
+                                       "coincident"])
+    flares = flares[(flares.tstart.notnull()) & (flares.ED > 1) & ~flares.coincident]
+
+    # phases with respect to the first planet, as in the coverage files
+    phases = get_orbital_phases(flares, ephemerides)
+    phases = phases[phases.planet == 0]
+    row["n_flares"] = phases.shape[0]
+
+    if (phases.shape[0] == 0) | (tic not in store):
+        return row
+
+    p, f = store.get(tic)
+    row["A2"], row["mean"], row["std"] = ad_test(phases.orbital_phase.values, p, f,
+                                                 phases_err=phases.orbital_phase_err.values,
+                                                 ndraws=ndraws, nsamples=nsamples, rng=tic)
+    return row
+
+
+def update_results(rows, path=RESULTS_CSV):
+    """Write the mean and std of the AD tests to the row of the first
+    planet of every system in the results table, and keep everything
+    else in the table as it is.
+
+    Parameters
+    ----------
+    rows : pandas.DataFrame
+        AD tests with columns TIC, mean, and std.
+    path : pathlib.Path, optional
+        Path to the results table.
+    """
+    # read all values as they are written
+    res = pd.read_csv(path, dtype=str, keep_default_na=False)
+
+    # excluded systems are not updated, other rows are already warned about
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        tic = pd.Series(normalize_tic(res.TIC), index=res.index)
+    tic[res.TIC.isin(EXCLUDED_TICS) | res.ID.isin(EXCLUDED_IDS)] = np.nan
+
+    # first planet of every system
+    first = tic.notnull() & ~tic.duplicated()
+    tests = rows.set_index("TIC")
+    update = first & tic.isin(tests.index)
+
+    for col in ["mean", "std"]:
+        values = tests[col].reindex(tic[update]).to_numpy(float)
+        res.loc[update, col] = ["" if np.isnan(v) else repr(float(v)) for v in values]
+
+    res.to_csv(path, index=False)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Update the affected systems.")
+    parser.add_argument("--force", action="store_true",
+                        help="update all systems")
+    parser.add_argument("--nsamples", type=int, default=10000,
+                        help="samples of the AD statistic under the null hypothesis")
+    parser.add_argument("--ndraws", type=int, default=100,
+                        help="draws of the phases within their uncertainties")
+    args = parser.parse_args()
+
+    res = get_results()
+    systems = get_systems(res)
+
+    # compare to the last snapshot
+    ephemerides = get_ephemerides(res)
+    old, new = read_snapshot(), take_snapshot(ephemerides)
+
+    if args.force | (old is None) | (not ADTESTS_PATH.exists()):
+        affected = systems
+    else:
+        affected = systems[systems.TIC.isin(get_affected_systems(old, new))]
+
+    print(f"Update {affected.shape[0]} out of {systems.shape[0]} systems.")
+
+    # rebuild the coverage of the affected systems
+    lcs = cached_light_curves()
+    manifest = read_manifest()
+    store = CumhistStore()
+
+    for row in affected.itertuples():
+        g = lcs[lcs.TIC == row.TIC]
+        if g.shape[0] > 0:
+            store.append(*build_cumhist(row.TIC, list(g.path), row.orbper_d, row.t0))
+            manifest[str(row.TIC)] = get_signature(g, row.orbper_d, row.t0)
+
+    store.write_index()
+    write_manifest(manifest)
+
+    # drop the replaced coverage if it takes up most of the store
+    compact_if_unused(store)
+
+    # repeat the AD tests of the affected systems
+    rows = pd.DataFrame([run_ad_test(tic, ephemerides, store, args.nsamples, args.ndraws)
+                         for tic in affected.TIC],
+                        columns=["TIC", "n_flares", "A2", "mean", "std"])
+
+    # replace the rows of the affected systems, and drop removed systems
+    adtests = rows
+    if ADTESTS_PATH.exists():
+        adtests = pd.read_csv(ADTESTS_PATH)
+        adtests = adtests[~adtests.TIC.isin(affected.TIC) & adtests.TIC.isin(systems.TIC)]
+        adtests = pd.concat([adtests, rows], ignore_index=True)
+
+    adtests.sort_values(by="TIC").to_csv(ADTESTS_PATH, index=False)
+
+    # the p-values of the affected systems in the results table
+    update_results(rows)
+
+    # all systems are up to date
+    write_snapshot(new)
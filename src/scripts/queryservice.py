@@ -0,0 +1,254 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Script that runs a small local HTTP service that answers queries about
+single systems from memory, for dashboards that poll the results.
+
+The results table, the flare phases, and the coverage store are loaded
+once, with lookups by TIC and by ID, and sorted indexes for range
+queries that are built on first use. Before every query, the service
+checks the modification times of `results.csv`, the flare table, and
+the coverage store index, and reloads everything if one of them
+changed. All responses are JSON:
+
+- GET /systems/{TIC or ID}: row of the results table and the number
+  of flares
+- GET /systems/{TIC or ID}/flares: sorted orbital phases of the flares
+- GET /systems/{TIC or ID}/coverage: coverage `p` and `f`
+- GET /systems?column=mean&min=0&max=0.05: TIC, ID, and value of all
+  systems with the column in [min, max], sorted by value
+- GET /status: number of systems and flares, and load time
+
+Usage: python queryservice.py [--host HOST] [--port N]
+"""
+
+import argparse
+import json
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+import numpy as np
+import pandas as pd
+
+from cumhiststore import STORE_DIR, CumhistStore
+from ephemeris import get_ephemerides, get_orbital_phases
+from flarecatalogue import FLARE_TABLE_CSV, load_flare_table
+from flareindex import FlareIndex
+from results import RESULTS_CSV, get_results, load_results
+
+
+def to_json_value(value):
+    """Convert a table value to a JSON value, NaN becomes null."""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+class QueryIndex:
+    """Snapshot of the results, the flare phases, and the coverage, with
+    lookups by TIC and ID.
+
+    Attributes
+    ----------
+    results : pandas.DataFrame
+        The results table.
+    records : list of dict
+        Rows of the results table as JSON objects.
+    by_tic, by_id : dict
+        Row number of every system by TIC, and by lower-case ID.
+    flares : FlareIndex
+        Orbital phases of the flares above 1 s in ED, with respect to
+        the first planet of each system.
+    store : CumhistStore
+        Coverage of all systems.
+    sorted : dict
+        Sort order and sorted values of the numerical columns that were
+        queried, keyed by column.
+    """
+
+    def __init__(self):
+        self.loaded = time.time()
+
+        self.results = get_results().reset_index(drop=True)
+
+        self.records = [{col: to_json_value(v) for col, v in row.items()}
+                        for row in self.results.to_dict("records")]
+        self.by_tic = {int(tic): i for i, tic in enumerate(self.results.TIC)}
+        self.by_id = {str(id_).lower(): i for i, id_ in enumerate(self.results.ID)}
+
+        # phases of the flares above 1 s in ED, without the coincident ones, as in the AD tests
+        flares = load_flare_table(columns=["TIC", "mission", "tstart", "abs_tstart", "ED",
+                                           "coincident"])
+        flares = flares[(flares.tstart.notnull()) & (flares.ED > 1) & ~flares.coincident]
+        phases = get_orbital_phases(flares, get_ephemerides(self.results))
+        phases = phases[phases.planet == 0]
+        self.flares = FlareIndex(phases.TIC, phases.orbital_phase)
+
+        self.store = CumhistStore()
+        self.sorted = {}
+
+    def find(self, key):
+        """Row number of a system by TIC or ID, or None."""
+        if key.isdigit() and int(key) in self.by_tic:
+            return self.by_tic[int(key)]
+        return self.by_id.get(key.lower())
+
+    def get_system(self, i):
+        """Row of the results table and the number of flares."""
+        record = dict(self.records[i])
+        record["n_flares"] = int(self.flares.count(record["TIC"]))
+        return record
+
+    def get_flares(self, i):
+        """Sorted orbital phases of the flares of a system."""
+        tic = self.records[i]["TIC"]
+        return {"TIC": tic, "orbital_phase": self.flares.get_phases(tic).tolist()}
+
+    def get_coverage(self, i):
+        """Coverage of a system, or None if it has none."""
+        tic = self.records[i]["TIC"]
+        if tic not in self.store:
+            return None
+        p, f = self.store.get(tic)
+        return {"TIC": tic, "p": np.asarray(p).tolist(), "f": np.asarray(f).tolist()}
+
+    def get_range(self, column, vmin=-np.inf, vmax=np.inf):
+        """Systems with a numerical column in [vmin, vmax], sorted by
+        the column, using a sorted index of the column."""
+        if column not in self.sorted:
+            values = self.results[column].to_numpy(dtype=float)
+            order = np.argsort(values, kind="stable")
+            self.sorted[column] = (order, values[order])
+
+        order, values = self.sorted[column]
+        start = np.searchsorted(values, vmin, side="left")
+        stop = np.searchsorted(values, vmax, side="right")
+
+        return [{"TIC": self.records[i]["TIC"], "ID": self.records[i]["ID"],
+                 column: to_json_value(values[j])}
+                for j, i in zip(range(start, stop), order[start:stop])]
+
+
+class QueryService:
+    """Keeps a QueryIndex up to date with the files it is loaded from."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.signature = self.get_signature()
+        self.index = QueryIndex()
+
+    def get_signature(self):
+        """Modification times and sizes of the source files."""
+        files = [RESULTS_CSV, FLARE_TABLE_CSV, STORE_DIR / "index.json"]
+        return [(f.stat().st_mtime_ns, f.stat().st_size) if f.exists() else None
+                for f in files]
+
+    def get_index(self):
+        """The current index, reloaded if a source file changed. If the
+        reload fails, e.g., because a file is only half written, the old
+        index is kept, and the reload is tried again on the next query."""
+        signature = self.get_signature()
+        if signature != self.signature:
+            with self.lock:
+                # another thread may have reloaded in the meantime
+                if signature != self.signature:
+                    print("Source files changed, reload.")
+                    try:
+                        load_results.cache_clear()
+                        self.index = QueryIndex()
+                        self.signature = signature
+                    except Exception as err:
+                        print(f"Reload failed, keep the old index: {err!r}")
+        return self.index
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """Answers GET requests with JSON from the service of the server."""
+
+    def send_json(self, obj, status=200):
+        body = json.dumps(obj).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [unquote(part) for part in url.path.strip("/").split("/") if part != ""]
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        index = self.server.service.get_index()
+
+        if parts == ["status"]:
+            return self.send_json({"systems": len(index.records),
+                                   "flares": len(index.flares.tic),
+                                   "loaded": index.loaded})
+
+        if parts == ["systems"]:
+            column = query.get("column")
+            if (column is None) or (column not in index.results.columns):
+                return self.send_json({"error": f"Unknown column {column}."}, 400)
+            if not pd.api.types.is_numeric_dtype(index.results[column]):
+                return self.send_json({"error": f"Column {column} is not numerical, "
+                                                "range queries need numbers."}, 400)
+            try:
+                vmin = float(query.get("min", "-inf"))
+                vmax = float(query.get("max", "inf"))
+            except ValueError:
+                return self.send_json({"error": "min and max must be numbers."}, 400)
+            return self.send_json(index.get_range(column, vmin, vmax))
+
+        if (len(parts) in [2, 3]) and (parts[0] == "systems"):
+            i = index.find(parts[1])
+            if i is None:
+                return self.send_json({"error": f"Unknown system {parts[1]}."}, 404)
+
+            if len(parts) == 2:
+                return self.send_json(index.get_system(i))
+            elif parts[2] == "flares":
+                return self.send_json(index.get_flares(i))
+            elif parts[2] == "coverage":
+                coverage = index.get_coverage(i)
+                if coverage is None:
+                    return self.send_json({"error": f"No coverage of {parts[1]}."}, 404)
+                return self.send_json(coverage)
+
+        return self.send_json({"error": f"Unknown path {url.path}."}, 404)
+
+    def log_message(self, format, *args):
+        # keep the polling out of the terminal
+        pass
+
+
+def get_server(host="127.0.0.1", port=8000):
+    """HTTP server with a loaded query service, one thread per request."""
+    server = ThreadingHTTPServer((host, port), QueryHandler)
+    server.service = QueryService()
+    return server
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Serve queries about single systems.")
+    parser.add_argument("--host", type=str, default="127.0.0.1",
+                        help="host, default is localhost only")
+    parser.add_argument("--port", type=int, default=8000,
+                        help="port")
+    args = parser.parse_args()
+
+    server = get_server(args.host, args.port)
+    print(f"Serving {len(server.service.index.records)} systems on "
+          f"http://{args.host}:{args.port}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -0,0 +1,191 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Module that keeps the reference catalogues from the literature as typed
+binary arrays, so that the plot scripts do not parse the FITS and TSV
+files, and do not import astropy, on every run.
+
+- wright2011: Wright et al. 2011, from `wright2011.fit`, with the
+  convective turnover time `tau` from Wright et al. 2018, and the
+  Rossby number `Ro` derived
+- reiners2022: Reiners et al. 2022, from `reiners2022.tsv`, with the
+  blank entries as NaN
+
+Every numerical column is stored as its own float64 `.npy` file in
+`src/data/reference_catalogues/{name}`. A catalogue is rebuilt when the
+MD5 checksum of its source file changes, and its columns are only read,
+as memory maps, when they are accessed.
+"""
+
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+
+import paths
+
+from stellar import tau_wright2018
+
+
+# location of the binary catalogues
+CACHE_DIR = paths.data / "reference_catalogues"
+
+
+def read_wright2011(path):
+    """Read the Wright et al. 2011 table, and derive tau and Ro."""
+    # astropy is only needed to build the catalogue
+    from astropy.table import Table
+
+    df = Table.read(path).to_pandas()
+    df["tau"] = tau_wright2018(df["Vmag"], df["Vmag"] - df["V-K"])
+    df["Ro"] = df["Prot"] / df["tau"]
+    return df
+
+
+def read_reiners2022(path):
+    """Read the Reiners et al. 2022 table, skipping the VizieR header."""
+    return pd.read_csv(path, delimiter="\t", skiprows=72)
+
+
+# source file and reader of every catalogue
+SOURCES = {"wright2011": ("wright2011.fit", read_wright2011),
+           "reiners2022": ("reiners2022.tsv", read_reiners2022)}
+
+
+def get_checksum(path):
+    """MD5 checksum of a file."""
+    md5 = hashlib.md5()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(2**20), b""):
+            md5.update(block)
+    return md5.hexdigest()
+
+
+def get_numerical_columns(df):
+    """Convert the columns of a table to float64 arrays. Blank entries
+    become NaN, and columns that are not numbers, like names, are left
+    out.
+
+    Returns
+    -------
+    columns : dict
+        float64 arrays, keyed by column name.
+    """
+    columns = {}
+
+    for col in df.columns:
+        values = df[col]
+        blank = values.isnull() | values.astype(str).str.strip().eq("")
+        numbers = pd.to_numeric(values.where(~blank), errors="coerce")
+
+        # keep the column if every non-blank entry is a number
+        if numbers.notnull().sum() == (~blank).sum():
+            columns[col] = numbers.to_numpy(np.float64)
+
+    return columns
+
+
+def build_reference_catalogue(name, outdir=CACHE_DIR):
+    """Parse the source file of a catalogue, and write its numerical
+    columns as `.npy` files.
+
+    Parameters
+    ----------
+    name : str
+        Name of the catalogue, one of `SOURCES`.
+    outdir : pathlib.Path, optional
+        Folder of the binary catalogues.
+
+    Returns
+    -------
+    meta : dict
+        Metadata of the catalogue: source checksum, number of rows, and
+        the file of every column.
+    """
+    source, reader = SOURCES[name]
+    path = paths.data / source
+
+    columns = get_numerical_columns(reader(path))
+
+    catdir = outdir / name
+    catdir.mkdir(parents=True, exist_ok=True)
+
+    # column names contain characters like / and <, so number the files
+    files = {}
+    for i, (col, values) in enumerate(columns.items()):
+        files[col] = f"col{i:03d}.npy"
+        np.save(catdir / files[col], values)
+
+    nrows = len(next(iter(columns.values()))) if len(columns) > 0 else 0
+    meta = {"source": source, "checksum": get_checksum(path), "nrows": nrows,
+            "columns": files}
+
+    with open(catdir / "meta.json", "w") as f:
+        json.dump(meta, f, indent=1)
+
+    return meta
+
+
+class ReferenceCatalogue:
+    """Columns of a binary reference catalogue, memory-mapped when
+    they are accessed.
+
+    Attributes
+    ----------
+    name : str
+        Name of the catalogue.
+    meta : dict
+        Metadata of the catalogue.
+    catdir : pathlib.Path
+        Folder of the catalogue.
+    """
+
+    def __init__(self, name, meta, outdir=CACHE_DIR):
+        self.name = name
+        self.meta = meta
+        self.catdir = outdir / name
+
+    @property
+    def columns(self):
+        """Names of the columns."""
+        return list(self.meta["columns"])
+
+    def __len__(self):
+        return self.meta["nrows"]
+
+    def __getitem__(self, col):
+        """Read-only float64 array of a column."""
+        return np.load(self.catdir / self.meta["columns"][col], mmap_mode="r")
+
+
+def get_reference_catalogue(name, outdir=CACHE_DIR):
+    """Get an up-to-date reference catalogue, building it if needed.
+
+    Parameters
+    ----------
+    name : str
+        Name of the catalogue, one of `SOURCES`.
+    outdir : pathlib.Path, optional
+        Folder of the binary catalogues.
+
+    Returns
+    -------
+    catalogue : ReferenceCatalogue
+        The catalogue.
+    """
+    source, _ = SOURCES[name]
+
+    meta = None
+    metapath = outdir / name / "meta.json"
+    if metapath.exists():
+        with open(metapath, "r") as f:
+            meta = json.load(f)
+
+    if (meta is None) or (meta["checksum"] != get_checksum(paths.data / source)):
+        print(f"Build reference catalogue {name} from {source}")
+        meta = build_reference_catalogue(name, outdir)
+
+    return ReferenceCatalogue(name, meta, outdir)
@@ -0,0 +1,178 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Module that loads the results table once, and gives all scripts the
+same selection of systems.
+
+The table is parsed with the registry from `aliases.py` applied, and
+the named boolean masks below are computed along with it. Both are
+cached in-process and in `src/data/results_cache.pkl`, which is
+rebuilt when `results.csv`, the registry, or the masks change.
+Selecting a sample is then only a mask lookup:
+
+- singles: no known stellar companion or contamination
+- singles_no_bd: singles that are not flagged with a brown dwarf
+  companion in `multiple_star_source`
+- paper_sample: singles without the brown dwarfs, and without GJ 1061,
+  which has no clear rotation period
+- transiting: planets with a transit midtime, for which the flares have
+  orbital phases
+- rv: planets without a transit midtime, for which the orbital phases
+  of the flares are -1
+
+Masks can be combined, e.g., `get_results(["paper_sample", "transiting"])`.
+
+Scripts that need only a few columns parse only those, and the columns
+that the masks need.
+"""
+
+from functools import lru_cache
+
+import pandas as pd
+
+import paths
+
+from aliases import read_results
+from flarecatalogue import get_source_signature
+
+
+# location of the source table and of the cache
+RESULTS_CSV = paths.data / "results.csv"
+RESULTS_CACHE = paths.data / "results_cache.pkl"
+
+# brown dwarf hosts
+BROWN_DWARF_TICS = [67646988, 236387002]
+
+# GJ 1061, rotation is unclear
+NO_ROTATION_TICS = [79611981]
+
+# names of the masks
+MASKS = ["singles", "singles_no_bd", "paper_sample", "transiting", "rv"]
+
+# columns that the registry and the masks need
+MASK_COLUMNS = ["TIC", "ID", "multiple_star", "multiple_star_source", "pl_tranmid"]
+
+
+def get_masks(df):
+    """Compute the named masks of the results table.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Results table with the registry applied.
+
+    Returns
+    -------
+    masks : pandas.DataFrame
+        One boolean column per mask, with the index of the table.
+    """
+    singles = df.multiple_star.isnull()
+    bd_source = df.multiple_star_source == "BD"
+    bds = df.TIC.isin(BROWN_DWARF_TICS) | bd_source
+
+    # without transit midtimes, all planets are RV planets
+    transiting = (df.pl_tranmid.notnull() if "pl_tranmid" in df.columns
+                  else pd.Series(False, index=df.index))
+
+    masks = pd.DataFrame({"singles": singles,
+                          "singles_no_bd": singles & ~bd_source,
+                          "paper_sample": singles & ~bds & ~df.TIC.isin(NO_ROTATION_TICS),
+                          "transiting": transiting,
+                          "rv": ~transiting},
+                         index=df.index)
+    return masks[MASKS]
+
+
+def get_cache_signature(csv=RESULTS_CSV):
+    """Signature of the source table and the names of the masks, so
+    that the cache is rebuilt when either changes."""
+    return {**get_source_signature(csv), "masks": MASKS}
+
+
+def build_results_cache(csv=RESULTS_CSV, cache=RESULTS_CACHE):
+    """Parse the results table, compute the masks, and write both to
+    the cache with the signature of the source table."""
+    df = read_results(csv)
+    masks = get_masks(df)
+    pd.to_pickle({"signature": get_cache_signature(csv), "table": df,
+                  "masks": masks}, cache)
+    return df, masks
+
+
+@lru_cache(maxsize=None)
+def load_results(csv=RESULTS_CSV, cache=RESULTS_CACHE):
+    """Get the parsed results table and its masks, from the cache if it
+    is up to date. Cached in-process, so do not modify the returned
+    objects, use `get_results` instead.
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        Results table with the registry applied.
+    masks : pandas.DataFrame
+        Named masks of the table.
+    """
+    if cache.exists():
+        cached = pd.read_pickle(cache)
+        if cached["signature"] == get_cache_signature(csv):
+            return cached["table"], cached["masks"]
+
+    return build_results_cache(csv, cache)
+
+
+@lru_cache(maxsize=None)
+def load_results_columns(columns, csv=RESULTS_CSV):
+    """Get some columns of the results table and the masks, parsing
+    only the columns that are needed. Cached in-process.
+
+    Parameters
+    ----------
+    columns : tuple of str
+        Columns to return.
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        The columns of the results table with the registry applied.
+    masks : pandas.DataFrame
+        Named masks of the table.
+    """
+    # the mask columns that the table has
+    header = pd.read_csv(csv, nrows=0).columns
+    needed = [col for col in MASK_COLUMNS if col in header]
+
+    df = read_results(csv, columns=list(dict.fromkeys(needed + list(columns))))
+    return df[list(columns)], get_masks(df)
+
+
+def get_results(mask=None, columns=None):
+    """Get a copy of the results table, or of a sample of it.
+
+    Parameters
+    ----------
+    mask : str or list of str, optional
+        Name of the mask, one of `MASKS`, or several names, of which
+        all must apply. The default is all systems.
+    columns : list of str, optional
+        Columns to return. The default is all columns.
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        The selected rows and columns.
+    """
+    if columns is None:
+        df, masks = load_results()
+    else:
+        df, masks = load_results_columns(tuple(columns))
+
+    if mask is not None:
+        names = [mask] if isinstance(mask, str) else list(mask)
+        for name in names:
+            if name not in MASKS:
+                raise ValueError(f"Unknown mask {name}, use one of {MASKS}.")
+        df = df[masks[names].all(axis=1)]
+
+    return df.copy()
@@ -1,5 +1,6 @@
 source /home/ekaterina/Documents/000_envs/python38forall/bin/activate
-python paper_rename_trappist.py
+python pipeline_flag_coincident_flares.py
+python pipeline_update_catalogue.py
 python paper_string_multiple_stars.py
 python paper_adtest_vs_value_scatterplots.py
 python paper_coherence_histogram.py
@@ -0,0 +1,264 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Module that declares the columns of the results table, the tidal
+interaction table, and the flare table: their dtype, unit, description,
+and LaTeX label.
+
+Tables are read with only the requested columns and explicit dtypes,
+with the multithreaded pyarrow parser if it is installed. The headers
+that explain the columns of the tables on Zenodo are generated from the
+same declarations.
+"""
+
+from importlib.util import find_spec
+
+import pandas as pd
+
+
+# the pyarrow parser is multithreaded, use it if it is installed
+ENGINE = "pyarrow" if find_spec("pyarrow") is not None else "c"
+
+
+def column(dtype, description, unit="", label=None):
+    """Declaration of a column."""
+    return {"dtype": dtype, "description": description, "unit": unit, "label": label}
+
+
+# magnetic star-planet interaction scenarios
+SB1 = "magnetic star-planet interaction with a 1G planetary field using the stretch-and-break mechanism"
+AW1 = "magnetic star-planet interaction with a 1G planetary field using the Alfvén wave mechanism"
+SB0 = "magnetic star-planet interaction with an unmagnetized planet using the stretch-and-break mechanism"
+AW0 = "magnetic star-planet interaction with an unmagnetized planet using the Alfvén wave mechanism"
+
+
+COLUMNS = {
+    # designations
+    "TIC": column("str", "TESS Input Catalog identifier", label="TIC"),
+    "ID": column("str", "star designation", label="ID"),
+
+    # observations
+    "obstime_d": column("float64", "time span of the observations", "days", "obs. time"),
+    "orbits_covered": column("float64", "number of orbits covered by the observations"),
+    "number_of_flares": column("float64", "number of flares"),
+
+    # star
+    "st_spectype": column("str", "spectral type of the star", label="SpT"),
+    "st_spectype_bibkey": column("str", "reference for the spectral type"),
+    "st_rotp": column("float64", "rotation period of the star", "days", r"$P_{\rm rot}$"),
+    "st_rotp_err": column("float64", "uncertainty on the rotation period", "days"),
+    "st_rotp_source": column("str", "reference for the rotation period"),
+    "st_rad": column("float64", "stellar radius", "solar radii", r"$R_{*}$"),
+    "st_rad_err1": column("float64", "upper uncertainty on the stellar radius", "solar radii"),
+    "st_rad_bibkey": column("str", "reference for the stellar radius"),
+    "st_lum": column("float64", "stellar luminosity", "log10 solar luminosities",
+                     "log$_{10} L_{*}$"),
+    "st_lumerr1": column("float64", "upper uncertainty on the stellar luminosity",
+                         "log10 solar luminosities"),
+    "st_lumerr2": column("float64", "lower uncertainty on the stellar luminosity",
+                         "log10 solar luminosities"),
+    "st_lum_bibkey": column("str", "reference for the stellar luminosity"),
+    "multiple_star": column("str", "flag for known stellar companions or contamination"),
+    "multiple_star_source": column("str", "reference for the multiplicity flag"),
+    "xray_flux_erg_s": column("float64", "X-ray luminosity of the star", "erg/s",
+                              r"$L_{\rm X}$"),
+    "xray_flux_err_erg_s": column("float64", "uncertainty on the X-ray luminosity", "erg/s"),
+
+    # planet
+    "orbper_d": column("float64", "orbital period of the planet", "days", r"$P_{\rm orb}$"),
+    "orbper_d_err": column("float64", "uncertainty on the orbital period", "days"),
+    "pl_orbper_bibkey": column("str", "reference for the orbital period"),
+    "pl_tranmid": column("float64", "transit midtime", "BJD", r"$T_0$"),
+    "pl_tranmiderr1": column("float64", "upper uncertainty on the transit midtime", "days"),
+    "pl_orbeccen": column("float64", "orbital eccentricity of the innermost planet",
+                          label="$e$"),
+    "pl_orbeccenerr1": column("float64", "upper uncertainty on the orbital eccentricity"),
+    "pl_orbeccenerr2": column("float64", "lower uncertainty on the orbital eccentricity"),
+    "pl_orbeccen_bibkey": column("str", "reference for the orbital eccentricity"),
+    "pl_radj": column("float64", "planetary radius", "Jupiter radii", r"$R_{\rm p}$"),
+    "pl_radjerr1": column("float64", "upper uncertainty on the planetary radius", "Jupiter radii"),
+    "pl_radjerr2": column("float64", "lower uncertainty on the planetary radius", "Jupiter radii"),
+    "pl_radj_bibkey": column("str", "reference for the planetary radius"),
+    "a_au": column("float64", "planet-star distance", "au", "$a$"),
+    "a_au_err": column("float64", "uncertainty on the planet-star distance", "au"),
+    "pl_orbsmax_bibkey": column("str", "reference for the planet-star distance"),
+    "a_rstar": column("float64", "planet-star distance", "stellar radii", r"$a/R_*$"),
+    "a_rstar_err": column("float64", "uncertainty on the planet-star distance", "stellar radii"),
+
+    # magnetic star-planet interaction
+    "Ro": column("float64", "Rossby number", label=r"$R$o"),
+    "Ro_high": column("float64", "Ro + upper uncertainty on the Rossby number"),
+    "Ro_low": column("float64", "Ro - lower uncertainty on the Rossby number"),
+    "B_G": column("float64", "stellar surface magnetic field strength", "Gauss", r"$B$"),
+    "B_G_high": column("float64", "B_G + upper uncertainty on the stellar surface "
+                       "magnetic field strength", "Gauss"),
+    "B_G_low": column("float64", "B_G - lower uncertainty on the stellar surface "
+                      "magnetic field strength", "Gauss"),
+    "v_rel_km_s": column("float64", "relative velocity between corotating stellar magnetic "
+                         "field and planet at the planet's orbital distance", "km/s",
+                         r"$v_{\mathrm{rel}}$"),
+    "v_rel_err_km_s": column("float64", "uncertainty on the relative velocity", "km/s"),
+    "p_spi_sb_bp1_erg_s": column("float64", f"power of {SB1}", "erg/s",
+                                 r"log$_{10} P_{\rm spi,sb}$"),
+    "p_spi_sb_bp1_erg_s_high": column("float64", f"power + upper uncertainty on the power "
+                                      f"of {SB1}", "erg/s"),
+    "p_spi_sb_bp1_erg_s_low": column("float64", f"power - lower uncertainty on the power "
+                                     f"of {SB1}", "erg/s"),
+    "p_spi_aw_bp1_erg_s": column("float64", f"power of {AW1}", "erg/s",
+                                 r"log$_{10} P_{\rm spi,aw}$"),
+    "p_spi_aw_bp1_erg_s_high": column("float64", f"power + upper uncertainty on the power "
+                                      f"of {AW1}", "erg/s"),
+    "p_spi_aw_bp1_erg_s_low": column("float64", f"power - lower uncertainty on the power "
+                                     f"of {AW1}", "erg/s"),
+    "p_spi_sb_bp0_erg_s": column("float64", f"power of {SB0}", "erg/s",
+                                 r"log$_{10} P_{\rm spi,sb0}$"),
+    "p_spi_sb_bp0_erg_s_high": column("float64", f"power + upper uncertainty on the power "
+                                      f"of {SB0}", "erg/s"),
+    "p_spi_sb_bp0_erg_s_low": column("float64", f"power - lower uncertainty on the power "
+                                     f"of {SB0}", "erg/s"),
+    "p_spi_aw_bp0_erg_s": column("float64", f"power of {AW0}", "erg/s",
+                                 r"log$_{10} P_{\rm spi,aw0}$"),
+    "p_spi_aw_bp0_erg_s_high": column("float64", f"power + upper uncertainty on the power "
+                                      f"of {AW0}", "erg/s"),
+    "p_spi_aw_bp0_erg_s_low": column("float64", f"power - lower uncertainty on the power "
+                                     f"of {AW0}", "erg/s"),
+    "p_spi_sb_bp1_norm": column("float64", f"power of {SB1}, normalized to AU Mic"),
+    "p_spi_aw_bp1_norm": column("float64", f"power of {AW1}, normalized to AU Mic"),
+    "p_spi_sb_bp0_norm": column("float64", f"power of {SB0}, normalized to AU Mic"),
+    "p_spi_aw_bp0_norm": column("float64", f"power of {AW0}, normalized to AU Mic"),
+
+    # AD test
+    "mean": column("float64", "mean p-value of the Anderson-Darling test", label=r"$p$-value"),
+    "std": column("float64", "standard deviation of the p-values of the Anderson-Darling test"),
+
+    # tidal interaction
+    "M_star": column("float64", "stellar mass", "solar masses", r"$M_*$"),
+    "M_star_up_err": column("float64", "upper uncertainty on the stellar mass", "solar masses"),
+    "M_star_low_err": column("float64", "lower uncertainty on the stellar mass", "solar masses"),
+    "st_mass_bibkey": column("str", "reference for the stellar mass"),
+    "M_pl": column("float64", "planetary mass", "Jupiter masses", r"$M_{\mathrm{p}} (\sin i)$"),
+    "M_pl_up_err": column("float64", "upper uncertainty on the planetary mass", "Jupiter masses"),
+    "M_pl_low_err": column("float64", "lower uncertainty on the planetary mass", "Jupiter masses"),
+    "pl_bmassj_bibkey": column("str", "reference for the planetary mass"),
+    "grav_pert": column("float64", "gravitational perturbation", label=r"$\Delta g / g$"),
+    "grav_pert_up_err": column("float64", "upper uncertainty on the gravitational perturbation"),
+    "grav_pert_low_err": column("float64", "lower uncertainty on the gravitational perturbation"),
+    "tidal_disip_timescale": column("float64", "tidal dissipation timescale", "years",
+                                    r"$\tau_{\rm tide}$"),
+    "tidal_disip_timescale_up_err": column("float64", "upper uncertainty on the tidal "
+                                           "dissipation timescale", "years"),
+    "tidal_disip_timescale_low_err": column("float64", "lower uncertainty on the tidal "
+                                            "dissipation timescale", "years"),
+    "torque_conv": column("float64", "convective torque", "solar masses x (km/s)^2",
+                          r"$\frac{\partial L_{\rm conv}}{\partial t}$"),
+    "torque_conv_up_err": column("float64", "upper uncertainty on the convective torque",
+                                 "solar masses x (km/s)^2"),
+    "torque_conv_low_err": column("float64", "lower uncertainty on the convective torque",
+                                  "solar masses x (km/s)^2"),
+
+    # flares
+    "mission": column("str", "TESS or Kepler"),
+    "quarter_or_sector": column("int64", "TESS sector or Kepler quarter"),
+    "timestamp": column("str", "date when light curve was downloaded and analysed"),
+    "total_time_observed_in_lc_days": column("float64", "total time observed in this light "
+                                             "curve, calculated by summing all valid data "
+                                             "points times the cadence", "days"),
+    "orbital_phase": column("float64", "orbital phase of the flare"),
+    "orbital_phase_err": column("float64", "uncertainty on the orbital phase, derived only "
+                                "for the stars in the final sample"),
+    "rel_amplitude": column("float64", "relative amplitude of the flare"),
+    "rel_amplitude_err": column("float64", "uncertainty on the relative amplitude"),
+    "tstart": column("float64", "start time of the flare", "days"),
+    "tstop": column("float64", "stop time of the flare", "days"),
+    "ED": column("float64", "equivalent duration of the flare", "s", r"$ED$"),
+    "ED_err": column("float64", "uncertainty on the equivalent duration", "s"),
+    "abs_tstart": column("float64", "flare start time in BJD instead of with "
+                         "Kepler/TESS offsets"),
+    "coincidence_group": column("int64", "group of flares that start at the same time in "
+                                "a quarter or sector, -1 for rows without a flare"),
+    "n_coincident_targets": column("int64", "number of different stars with a flare in "
+                                   "the coincidence group"),
+    "coincident": column("bool", "flare is a suspected instrumental false positive, because "
+                         "it coincides with flares on other stars"),
+}
+
+
+def get_dtypes(columns):
+    """Declared dtypes of the columns, columns without a declaration
+    are left to the parser."""
+    return {col: COLUMNS[col]["dtype"] for col in columns if col in COLUMNS}
+
+
+def get_labels(columns):
+    """LaTeX labels of the columns, keyed by column name."""
+    return {col: COLUMNS[col]["label"] for col in columns}
+
+
+def get_header(columns, names=None):
+    """Lines that explain the columns at the top of a table.
+
+    Parameters
+    ----------
+    columns : list of str
+        Names of the columns in the registry.
+    names : dict, optional
+        Names of the columns in the table, if they differ from the
+        registry, e.g., {"obstime_d": "obs. time"}.
+
+    Returns
+    -------
+    header : str
+        One line per column, starting with #.
+    """
+    names = {} if names is None else names
+    lines = []
+    for col in columns:
+        c = COLUMNS[col]
+        unit = f" in {c['unit']}" if c["unit"] != "" else ""
+        lines.append(f"# {names.get(col, col)}, {c['description']}{unit}\n")
+    return "".join(lines)
+
+
+def read_table(path, columns=None):
+    """Read a CSV table with only the requested columns, and with the
+    declared dtypes.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        Path to the table.
+    columns : list of str, optional
+        Columns to read. The default is all columns.
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        The table.
+    """
+    if columns is None:
+        columns = list(pd.read_csv(path, nrows=0).columns)
+
+    return pd.read_csv(path, usecols=columns, dtype=get_dtypes(columns), engine=ENGINE)
+
+
+def write_table(df, path, names=None):
+    """Write a table to CSV, with the header that explains its columns.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Table with columns from the registry.
+    path : pathlib.Path
+        Path to the table.
+    names : dict, optional
+        Names of the columns in the table, if they differ from the
+        registry.
+    """
+    inverse = {} if names is None else {v: k for k, v in names.items()}
+    columns = [inverse.get(col, col) for col in df.columns]
+
+    with open(path, "w") as f:
+        f.write(get_header(columns, names))
+        df.to_csv(f, index=False)
@@ -0,0 +1,165 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Module that takes snapshots of the flare table and the light curve
+coverage, and finds the systems that changed since the last snapshot.
+
+A snapshot holds one digest per light curve (TIC, mission, quarter or
+sector) for the rows of the flare table, and one for the cached light
+curve files. It also holds one digest per system for the ephemerides of
+its planets in the results table. Systems with a new, removed, or
+changed light curve or ephemeris are affected, and only they need to be
+recomputed.
+"""
+
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+
+import paths
+
+from ephemeris import get_ephemerides
+from flarecatalogue import iter_flare_table
+from flarestatistics import get_light_curve_keys
+from lightcurves import cached_light_curves
+from results import get_results
+
+
+# the last snapshot
+SNAPSHOT_PATH = paths.data / "catalogue_snapshot.json"
+
+
+def get_flare_digests(chunks):
+    """Digest of the rows of every light curve in the flare table.
+
+    Parameters
+    ----------
+    chunks : iterable of pandas.DataFrame
+        Chunks of the flare catalogue, sorted by light curve.
+
+    Returns
+    -------
+    digests : dict
+        Hex digest of the rows, keyed by light curve.
+    """
+    digests = {}
+
+    for chunk in chunks:
+        keys = get_light_curve_keys(chunk).to_numpy()
+        rows = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+
+        # rows of a light curve are contiguous, sum their hashes
+        starts = np.flatnonzero(np.concatenate([[True], keys[1:] != keys[:-1]]))
+        sums = np.add.reduceat(rows, starts) if len(rows) > 0 else rows
+
+        digests.update(zip(keys[starts], [f"{s:016x}" for s in sums]))
+
+    return digests
+
+
+def get_coverage_digests(lcs):
+    """Digest of the cached files of every light curve, from their
+    names, sizes, and modification times.
+
+    Parameters
+    ----------
+    lcs : pandas.DataFrame
+        Output of `lightcurves.cached_light_curves`.
+
+    Returns
+    -------
+    digests : dict
+        Hex digest of the files, keyed by light curve.
+    """
+    digests = {}
+
+    for key, g in lcs.groupby(get_light_curve_keys(lcs)):
+        stats = [f"{path.name}:{path.stat().st_size}:{path.stat().st_mtime_ns}"
+                 for path in sorted(g.path)]
+        digests[key] = hashlib.md5(";".join(stats).encode()).hexdigest()
+
+    return digests
+
+
+def get_ephemeris_digests(ephemerides):
+    """Digest of the ephemerides of the planets of every system.
+
+    Parameters
+    ----------
+    ephemerides : pandas.DataFrame
+        Output of `ephemeris.get_ephemerides`.
+
+    Returns
+    -------
+    digests : dict
+        Hex digest of the ephemerides, keyed by TIC.
+    """
+    eph = ephemerides.sort_values(by=["TIC", "planet"])
+    eph = eph[["TIC", "planet", "orbper_d", "orbper_d_err", "t0", "t0_err"]]
+
+    tics = eph.TIC.to_numpy()
+    rows = pd.util.hash_pandas_object(eph, index=False).to_numpy()
+
+    # rows of a system are contiguous, sum their hashes
+    starts = np.flatnonzero(np.concatenate([[True], tics[1:] != tics[:-1]]))
+    sums = np.add.reduceat(rows, starts) if len(rows) > 0 else rows
+
+    return {str(tic): f"{s:016x}" for tic, s in zip(tics[starts], sums)}
+
+
+def take_snapshot(ephemerides=None):
+    """Digests of the flare table, the coverage, and the ephemerides.
+
+    Parameters
+    ----------
+    ephemerides : pandas.DataFrame, optional
+        Output of `ephemeris.get_ephemerides`. The default is the
+        ephemerides of the results table.
+    """
+    if ephemerides is None:
+        ephemerides = get_ephemerides(get_results())
+
+    return {"flares": get_flare_digests(iter_flare_table()),
+            "coverage": get_coverage_digests(cached_light_curves()),
+            "ephemerides": get_ephemeris_digests(ephemerides)}
+
+
+def read_snapshot(path=SNAPSHOT_PATH):
+    """Read the last snapshot, or None if there is none."""
+    if not path.exists():
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def write_snapshot(snapshot, path=SNAPSHOT_PATH):
+    """Write a snapshot."""
+    with open(path, "w") as f:
+        json.dump(snapshot, f, indent=1, sort_keys=True)
+
+
+def get_affected_systems(old, new):
+    """TICs of the systems with new, removed, or changed light curves
+    in the flare table or in the coverage, or changed ephemerides.
+
+    Parameters
+    ----------
+    old, new : dict
+        Snapshots from `take_snapshot`.
+
+    Returns
+    -------
+    tics : list of int
+        Sorted TICs of the affected systems.
+    """
+    changed = set()
+
+    for part in ["flares", "coverage", "ephemerides"]:
+        o, n = old.get(part, {}), new.get(part, {})
+        changed.update(key for key in set(o) | set(n) if o.get(key) != n.get(key))
+
+    return sorted({int(key.split("_")[0]) for key in changed})
@@ -0,0 +1,313 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Module that calculates the expected power of magnetic star-planet
+interaction (SPI) for all systems at once, in four scenarios:
+
+- sb: stretch-and-break, Lanza 2012, Eq. 45, non-linear and
+  axisymmetric field, with n = 0.25
+- sb0: stretch-and-break with an unmagnetized planet
+- aw: Alfven wing, Kavanagh et al. 2022, Eqs. 8 and 11, with the
+  stellar wind density and field scaled from the base of the corona
+- aw0: Alfven wing with an unmagnetized planet
+
+The stellar field at the pole is 15 per cent of the average surface
+field, the wind density at the base of the corona is 2e10 protons per
+cm^3, and sin(theta) = 1. All quantities are in cgs units.
+
+The uncertainties are propagated with Monte Carlo draws of the stellar
+field, rotation and orbital period, semi-major axis, and the stellar
+and planetary radius. The draws, and the quantities derived from them,
+like v_rel and R*/a, are made once, in chunks of systems, and kept by
+`SPICalculator`, so that switching the scenario or the planetary field
+strength only evaluates the scaling law.
+"""
+
+import warnings
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from stellar import draw_split_normal
+
+
+# AU Mic, to which the powers are normalized
+AUMIC_TIC = 441420236
+
+# units in cm and s
+R_SUN_CM = 6.957e10
+R_JUP_CM = 7.1492e9
+AU_CM = 1.495978707e13
+DAY_S = 86400.
+
+# proton mass in g
+M_P_G = 1.67262192e-24
+
+# stellar wind density at the base of the corona in g/cm^3
+RHO_STAR = 2e10 * M_P_G
+
+# polar stellar field strength as a fraction of the average surface field
+POLAR_FIELD_FRACTION = 0.15
+
+# Lanza 2012 constants, mu_0 = 4 pi in cgs
+N_LANZA = 0.25
+LAMBDA2_LANZA = 1.01203
+C_LANZA = (27. * np.pi * LAMBDA2_LANZA * (N_LANZA + 1) /
+           (16. * 4. * np.pi * N_LANZA * (LAMBDA2_LANZA + N_LANZA**2)**(1. / 3.)))
+
+# scenarios, and the columns of the results table they need
+SCENARIOS = ["sb", "aw"]
+COLUMNS = ["TIC", "B_G", "B_G_high", "B_G_low", "st_rotp", "st_rotp_err",
+           "orbper_d", "orbper_d_err", "a_au", "a_au_err", "st_rad", "st_rad_err1",
+           "pl_radj", "pl_radjerr1", "pl_radjerr2"]
+
+
+def get_v_rel(a, porb, prot):
+    """Relative velocity in cm/s between the corotating stellar field
+    and the planet, with a in cm, and the periods in days."""
+    return 2. * np.pi * a * (1. / porb - 1. / prot) / DAY_S
+
+
+def p_spi_sb(bp, rp, bstar, v_rel, rstar_a):
+    """Power of stretch-and-break SPI in erg/s, Lanza 2012, Eq. 45,
+    or its reduced form if the planet is unmagnetized.
+
+    Parameters
+    ----------
+    bp : float
+        Planetary field strength in G.
+    rp : array
+        Planetary radius in cm.
+    bstar : array
+        Polar stellar field strength in G.
+    v_rel : array
+        Relative velocity in cm/s.
+    rstar_a : array
+        Stellar radius over semi-major axis.
+    """
+    geometry = rp**2 * np.abs(v_rel) * rstar_a**((N_LANZA + 11.) / 3.)
+    if bp == 0:
+        return C_LANZA * bstar**2 * geometry
+    return C_LANZA * bp**(2. / 3.) * bstar**(4. / 3.) * geometry
+
+
+def p_spi_aw(bp, rp, bstar, v_rel, rstar_a, rho=RHO_STAR):
+    """Power of Alfven wing SPI in erg/s, Kavanagh et al. 2022, Eqs. 8
+    and 11, or its reduced form if the planet is unmagnetized.
+
+    Parameters
+    ----------
+    bp : float
+        Planetary field strength in G.
+    rp : array
+        Planetary radius in cm.
+    bstar : array
+        Polar stellar field strength in G.
+    v_rel : array
+        Relative velocity in cm/s.
+    rstar_a : array
+        Stellar radius over semi-major axis.
+    rho : float, optional
+        Stellar wind density at the base of the corona in g/cm^3.
+    """
+    if bp == 0:
+        return np.pi**0.5 * rp**2 * bstar * v_rel**2 * rstar_a**4 * rho**0.5
+    return (np.pi**0.5 / 2.**(2. / 3.) * bp**(2. / 3.) * rp**2 * bstar**(1. / 3.) *
+            v_rel**2 * rstar_a**2 * rho**0.5)
+
+
+# scaling law of every scenario
+POWERS = {"sb": p_spi_sb, "aw": p_spi_aw}
+
+
+class SPICalculator:
+    """Expected power of SPI for a table of systems, with uncertainties
+    from Monte Carlo draws.
+
+    The systems are drawn once, in chunks, and only the quantities the
+    scaling laws need, the planetary radius, the polar stellar field,
+    v_rel, and R*/a, are kept for every chunk, as float32, that is, 16
+    bytes per system and draw, or 160 MB for 1000 systems with 10000
+    draws each. Switching the scenario or the planetary field strength
+    then only evaluates the scaling law on the kept arrays.
+
+    Attributes
+    ----------
+    df : pandas.DataFrame
+        Table with the columns in `COLUMNS`.
+    nsamples : int
+        Number of draws per system.
+    chunksize : int
+        Number of systems drawn at once.
+    percentiles : tuple of float
+        Lower, middle, and upper percentile.
+    seeds : array
+        Seed of every chunk.
+    """
+
+    # quantities kept for every chunk
+    KEPT = ["rp", "bstar", "v_rel", "rstar_a"]
+
+    def __init__(self, df, nsamples=10000, chunksize=100, percentiles=(16, 50, 84), rng=None):
+        self.df = df
+        self.nsamples = nsamples
+        self.chunksize = chunksize
+        self.percentiles = percentiles
+        nchunks = -(-df.shape[0] // chunksize)
+        self.seeds = np.random.default_rng(rng).integers(2**63, size=nchunks)
+        self._percentiles = {}
+
+    def draw_parameters(self, df, rng):
+        """Draw the field, periods, distance, and radii of the systems in
+        `df`, as (n_systems, n_samples) arrays in cgs units and days."""
+        shape = (df.shape[0], self.nsamples)
+
+        def draw(col, err_high, err_low=None):
+            err_low = err_high if err_low is None else err_low
+            d = draw_split_normal(rng.standard_normal(shape), df[col], err_high, err_low)
+            # all parameters are positive
+            d[d <= 0] = np.nan
+            return d
+
+        return {"B": draw("B_G", df.B_G_high - df.B_G, df.B_G - df.B_G_low),
+                "prot": draw("st_rotp", df.st_rotp_err),
+                "porb": draw("orbper_d", df.orbper_d_err),
+                "a": draw("a_au", df.a_au_err) * AU_CM,
+                "rstar": draw("st_rad", df.st_rad_err1) * R_SUN_CM,
+                "rp": draw("pl_radj", df.pl_radjerr1, df.pl_radjerr2) * R_JUP_CM}
+
+    def get_percentiles(self, values):
+        """Lower, middle, and upper percentile of every system."""
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            return np.nanpercentile(values, self.percentiles, axis=1)
+
+    @cached_property
+    def chunks(self):
+        """Planetary radius, polar stellar field, v_rel, and R*/a of every
+        chunk of systems, as float32 (n_systems, n_samples) arrays."""
+        chunks = []
+        for i, seed in enumerate(self.seeds):
+            df = self.df.iloc[i * self.chunksize:(i + 1) * self.chunksize]
+            draws = self.draw_parameters(df, np.random.default_rng(seed))
+
+            kept = {"rp": draws["rp"],
+                    "bstar": POLAR_FIELD_FRACTION * draws["B"],
+                    "v_rel": get_v_rel(draws["a"], draws["porb"], draws["prot"]),
+                    "rstar_a": draws["rstar"] / draws["a"]}
+            chunks.append({name: kept[name].astype(np.float32) for name in self.KEPT})
+
+        return chunks
+
+    def calculate(self, keys):
+        """Calculate the percentiles of v_rel in km/s, and of the powers
+        in erg/s, from the kept draws.
+
+        Parameters
+        ----------
+        keys : list
+            "v_rel", or (scenario, bp) for the power of a scenario with
+            planetary field strength bp.
+        """
+        keys = [key for key in keys if key not in self._percentiles]
+        if len(keys) == 0:
+            return
+
+        percentiles = {key: [] for key in keys}
+        for chunk in self.chunks:
+            # evaluate in double precision, the powers exceed the float32 range
+            rp, bstar, v_rel, rstar_a = [chunk[name].astype(float) for name in self.KEPT]
+
+            for key in keys:
+                if key == "v_rel":
+                    values = v_rel / 1e5
+                else:
+                    scenario, bp = key
+                    values = POWERS[scenario](bp, rp, bstar, v_rel, rstar_a)
+                percentiles[key].append(self.get_percentiles(values))
+
+        for key in keys:
+            self._percentiles[key] = (np.concatenate(percentiles[key], axis=1)
+                                      if len(percentiles[key]) > 0 else np.empty((3, 0)))
+
+    def get_power(self, scenario, bp=1.):
+        """Expected power of SPI of every system.
+
+        Parameters
+        ----------
+        scenario : str
+            "sb" or "aw".
+        bp : float, optional
+            Planetary field strength in G, 0 for an unmagnetized planet.
+            The default is 1 G.
+
+        Returns
+        -------
+        low, mid, high : arrays
+            Lower, middle, and upper percentile of the power in erg/s.
+        """
+        if scenario not in POWERS:
+            raise ValueError(f"Unknown scenario {scenario}, use one of {SCENARIOS}.")
+
+        key = (scenario, float(bp))
+        self.calculate([key])
+        return self._percentiles[key]
+
+    def get_norm_index(self, norm_tic):
+        """Position of the system to normalize to: the innermost planet
+        of `norm_tic`, or None if it is not in the table."""
+        isnorm = (self.df.TIC == norm_tic).to_numpy()
+        if not isnorm.any():
+            warnings.warn(f"TIC {norm_tic} is not in the table, the normalized powers are NaN.")
+            return None
+
+        positions = np.flatnonzero(isnorm)
+        if len(positions) > 1:
+            warnings.warn(f"TIC {norm_tic} is in the table {len(positions)} times, "
+                          "normalize to the innermost planet.")
+        a = self.df.a_au.to_numpy(float)[positions]
+        return positions[np.argmin(np.where(np.isnan(a), np.inf, a))]
+
+    def get_table(self, bps=(1, 0), norm_tic=AUMIC_TIC):
+        """Relative velocity and expected powers of all scenarios.
+
+        Parameters
+        ----------
+        bps : tuple of float, optional
+            Planetary field strengths in G. The default is 1 G and an
+            unmagnetized planet.
+        norm_tic : int, optional
+            TIC of the system to which the `_norm` columns are
+            normalized, the innermost planet if there are several. The
+            default is AU Mic.
+
+        Returns
+        -------
+        table : pandas.DataFrame
+            Columns TIC, v_rel_km_s, v_rel_err_km_s, and for every
+            scenario and field strength p_spi_{scenario}_bp{bp}_erg_s,
+            with _high and _low, and p_spi_{scenario}_bp{bp}_norm, with
+            the index of `df`.
+        """
+        inorm = self.get_norm_index(norm_tic)
+
+        keys = [(scenario, float(bp)) for bp in bps for scenario in SCENARIOS]
+        self.calculate(["v_rel"] + keys)
+
+        low, mid, high = self._percentiles["v_rel"]
+        table = {"TIC": self.df.TIC.to_numpy(), "v_rel_km_s": mid,
+                 "v_rel_err_km_s": (high - low) / 2.}
+
+        for bp in bps:
+            for scenario in SCENARIOS:
+                low, mid, high = self.get_power(scenario, bp)
+                name = f"p_spi_{scenario}_bp{bp:g}"
+                table[f"{name}_erg_s"] = mid
+                table[f"{name}_erg_s_high"] = high
+                table[f"{name}_erg_s_low"] = low
+                table[f"{name}_norm"] = mid / mid[inorm] if inorm is not None else np.nan
+
+        return pd.DataFrame(table, index=self.df.index)
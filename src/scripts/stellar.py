@@ -0,0 +1,221 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Module with stellar relations that are shared between scripts, and an
+engine that propagates the uncertainties on the stellar parameters to
+the convective turnover time, Rossby number, magnetic field strength,
+and Lx/Lbol with Monte Carlo draws.
+
+For every star, the rotation period, V and Ks magnitudes, luminosity,
+and X-ray luminosity are drawn together, optionally correlated, as one
+(n_stars, n_samples) array each. Asymmetric uncertainties are drawn
+from split normal distributions. The uncertainties on the coefficients
+of the empirical relations are drawn once per sample, and shared by all
+stars. Stars are processed in chunks to bound the memory, and only the
+percentiles are kept.
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+
+# solar luminosity in erg/s, IAU 2015 nominal value, as in astropy
+L_SUN_ERG_S = 3.828e33
+
+# drawn parameters, their columns in the results table, and their
+# upper and lower uncertainties
+PARAMETERS = {"Prot": ("st_rotp", "st_rotp_err", "st_rotp_err"),
+              "V": ("sy_vmag", "sy_vmagerr1", "sy_vmagerr2"),
+              "Ks": ("sy_kmag", "sy_kmagerr1", "sy_kmagerr2"),
+              "logL": ("st_lum", "st_lumerr1", "st_lumerr2"),
+              "Lx": ("xray_flux_erg_s", "xray_flux_err_erg_s", "xray_flux_err_erg_s")}
+
+
+def tau_wright2018(V, Ks, a=0.64, b=0.25):
+    """Convective turnover time from Wright et al. 2018 using
+    Eq. 5 from that paper.
+
+    Parameters
+    ----------
+    V : float
+        The V magnitude of the star.
+    Ks : float
+        The Ks magnitude of the star.
+    a, b : float, optional
+        Coefficients of the relation, a = 0.64 (+0.10, -0.12) and
+        b = 0.25 (+0.08, -0.07).
+
+    Returns
+    -------
+    tau : float
+        The convective turnover time of the star in days.
+    """
+    return 10**(a + b * (V - Ks))
+
+
+def tau_reiners2022(lum):
+    """Convective turnover time in days from the bolometric luminosity
+    in solar luminosities, following Reiners et al. 2014, 2022."""
+    return 12.3 * lum**(-0.5)
+
+
+def b_reiners2022(Ro, exp_unsat=-1.26, exp_sat=-0.11):
+    """Average surface magnetic field strength in G from the Rossby
+    number, Reiners et al. 2022, Table 2, in the unsaturated (Ro > 0.13)
+    and saturated regime. The exponents are -1.26 +/- 0.1 and
+    -0.11 +/- 0.03."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(Ro > 0.13, 199. * Ro**exp_unsat, 2050. * Ro**exp_sat)
+
+
+def draw_split_normal(z, value, err_high, err_low):
+    """Turn standard normal draws into draws from a split normal
+    distribution, with the upper uncertainty above the value, and the
+    lower uncertainty below. Both uncertainties are positive, and NaN
+    uncertainties count as zero.
+
+    Parameters
+    ----------
+    z : array
+        Standard normal draws, shape (n_stars, n_samples).
+    value, err_high, err_low : arrays
+        Values and uncertainties, shape (n_stars,).
+    """
+    value = np.asarray(value, dtype=float)[:, np.newaxis]
+    err_high = np.nan_to_num(np.abs(np.asarray(err_high, dtype=float)))[:, np.newaxis]
+    err_low = np.nan_to_num(np.abs(np.asarray(err_low, dtype=float)))[:, np.newaxis]
+    return value + z * np.where(z > 0, err_high, err_low)
+
+
+def draw_stellar_parameters(df, nsamples, corr=None, rng=None):
+    """Draw the stellar parameters of all stars at once.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Table with the columns in `PARAMETERS`. Missing columns are NaN.
+    nsamples : int
+        Number of draws per star.
+    corr : array, optional
+        Correlation matrix of the parameters, in the order of
+        `PARAMETERS`. The default is uncorrelated parameters.
+    rng : numpy.random.Generator or int, optional
+        Random number generator or seed.
+
+    Returns
+    -------
+    draws : dict
+        (n_stars, n_samples) array of every parameter, and the fraction
+        of non-positive draws of Prot and Lx per star, which are NaN,
+        as Prot_dropped and Lx_dropped.
+    """
+    rng = np.random.default_rng(rng)
+    npar = len(PARAMETERS)
+
+    z = rng.standard_normal((df.shape[0], nsamples, npar))
+    if corr is not None:
+        z = z @ np.linalg.cholesky(np.asarray(corr, dtype=float)).T
+
+    draws = {}
+    for i, (name, cols) in enumerate(PARAMETERS.items()):
+        value, err_high, err_low = [df[col].to_numpy(float) if col in df.columns
+                                    else np.full(df.shape[0], np.nan) for col in cols]
+        draws[name] = draw_split_normal(z[:, :, i], value, err_high, err_low)
+
+    # periods and luminosities are positive
+    for name in ["Prot", "Lx"]:
+        isneg = draws[name] <= 0
+        draws[f"{name}_dropped"] = isneg.mean(axis=1)
+        draws[name][isneg] = np.nan
+
+    return draws
+
+
+def propagate_stellar_parameters(df, nsamples=10000, chunksize=100, corr=None,
+                                 tau="reiners2022", percentiles=(16, 50, 84),
+                                 rng=None):
+    """Propagate the uncertainties on the stellar parameters to tau, Ro,
+    B, and Lx/Lbol.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Table with the columns in `PARAMETERS`, e.g., the results table.
+    nsamples : int, optional
+        Number of draws per star. The default is 10000.
+    chunksize : int, optional
+        Number of stars drawn at once. The default is 100.
+    corr : array, optional
+        Correlation matrix of the parameters, see
+        `draw_stellar_parameters`.
+    tau : str, optional
+        "reiners2022" for tau from the luminosity, as in the paper, or
+        "wright2018" for tau from V - Ks. The default is "reiners2022".
+    percentiles : tuple of float, optional
+        Lower, middle, and upper percentile. The default is (16, 50, 84).
+    rng : numpy.random.Generator or int, optional
+        Random number generator or seed.
+
+    Returns
+    -------
+    pct : pandas.DataFrame
+        Columns tau, Ro, B_G, and lxlbol with the middle percentile, and
+        the same with _high and _low for the upper and lower percentile,
+        and the fraction of non-positive draws of Prot and Lx that are
+        dropped, Prot_dropped and Lx_dropped, with the index of `df`.
+    """
+    rng = np.random.default_rng(rng)
+
+    # coefficients of the relations, shared by all stars
+    shared = {"a": draw_split_normal(rng.standard_normal((1, nsamples)), [0.64], [0.10], [0.12]),
+              "b": draw_split_normal(rng.standard_normal((1, nsamples)), [0.25], [0.08], [0.07]),
+              "exp_unsat": -1.26 + 0.1 * rng.standard_normal((1, nsamples)),
+              "exp_sat": -0.11 + 0.03 * rng.standard_normal((1, nsamples))}
+
+    chunks = []
+    for start in range(0, df.shape[0], chunksize):
+        draws = draw_stellar_parameters(df.iloc[start:start + chunksize], nsamples,
+                                        corr=corr, rng=rng)
+
+        lum = 10**draws["logL"]
+
+        if tau == "reiners2022":
+            t = tau_reiners2022(lum)
+        elif tau == "wright2018":
+            t = tau_wright2018(draws["V"], draws["Ks"], a=shared["a"], b=shared["b"])
+        else:
+            raise ValueError(f"Unknown tau relation {tau}.")
+
+        Ro = draws["Prot"] / t
+        values = {"tau": t, "Ro": Ro,
+                  "B_G": b_reiners2022(Ro, shared["exp_unsat"], shared["exp_sat"]),
+                  "lxlbol": draws["Lx"] / (lum * L_SUN_ERG_S)}
+
+        chunk = {}
+        for name, v in values.items():
+            # stars without a value, e.g., without X-ray data, are NaN
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                low, mid, high = np.nanpercentile(v, percentiles, axis=1)
+            chunk[name], chunk[f"{name}_high"], chunk[f"{name}_low"] = mid, high, low
+        for name in ["Prot", "Lx"]:
+            chunk[f"{name}_dropped"] = draws[f"{name}_dropped"]
+        chunks.append(pd.DataFrame(chunk))
+
+    columns = [f"{name}{suffix}" for name in ["tau", "Ro", "B_G", "lxlbol"]
+               for suffix in ["", "_high", "_low"]] + ["Prot_dropped", "Lx_dropped"]
+    pct = pd.concat(chunks, ignore_index=True) if len(chunks) > 0 else pd.DataFrame(columns=columns)
+    pct.index = df.index
+
+    # report the stars of which draws are dropped
+    for name in ["Prot", "Lx"]:
+        dropped = pct[f"{name}_dropped"]
+        if (dropped > 0).any():
+            warnings.warn(f"{(dropped > 0).sum()} stars have non-positive {name} draws that are "
+                          f"dropped, up to {dropped.max():.1%} of the draws per star.")
+
+    return pct[columns]
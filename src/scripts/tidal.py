@@ -0,0 +1,142 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Module that calculates the expected strength of tidal star-planet
+interaction for all systems at once, with three scaling laws:
+
+- grav_pert: gravitational perturbation of the star by the planet,
+  Cuntz et al. 2000, Eq. 1
+- tidal_disip_timescale: tidal dissipation timescale in the convective
+  envelope in years, Albrecht et al. 2012, Eq. 2
+- torque_conv: tidal torque on the convective envelope in solar masses
+  x (km/s)^2, Penev et al. 2012, Eqs. 1 and 2, with Q* = 1e7; positive
+  if the planet orbits faster than the star rotates, so that the star
+  is spun up
+
+The uncertainties are propagated with Monte Carlo draws of the stellar
+and planetary mass, stellar radius, semi-major axis, and the orbital
+and rotation period. All three laws are evaluated on the same draws.
+The uncertainties are stored as in `TIS_with_ADtests.csv`: `_up_err`
+is positive and `_low_err` is negative.
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from stellar import draw_split_normal
+
+
+# constants in cgs units
+G_CGS = 6.6743e-8
+M_SUN_G = 1.98841e33
+M_JUP_G = 1.89813e30
+R_SUN_CM = 6.957e10
+AU_CM = 1.495978707e13
+KM_CM = 1e5
+
+# tidal quality factor of the star
+Q_STAR = 1e7
+
+# columns of the results table and the tidal table that are needed
+COLUMNS = ["M_star", "M_star_up_err", "M_star_low_err", "M_pl", "M_pl_up_err", "M_pl_low_err",
+           "st_rad", "st_rad_err1", "a_au", "a_au_err", "orbper_d", "orbper_d_err",
+           "st_rotp", "st_rotp_err"]
+
+# the three scaling laws
+MODELS = ["grav_pert", "tidal_disip_timescale", "torque_conv"]
+
+
+def grav_pert(q, rstar_a):
+    """Gravitational perturbation of the star, with the mass ratio q of
+    planet and star, and the stellar radius over semi-major axis."""
+    return 2. * q * rstar_a**3
+
+
+def tidal_disip_timescale(q, rstar_a):
+    """Tidal dissipation timescale in the convective envelope in years,
+    with the mass ratio q of planet and star, and the stellar radius
+    over semi-major axis."""
+    return 1e10 * q**(-2) * rstar_a**(-6)
+
+
+def torque_conv(mp, rstar, a, porb, prot, qstar=Q_STAR):
+    """Tidal torque on the convective envelope in solar masses x
+    (km/s)^2.
+
+    Parameters
+    ----------
+    mp : array
+        Planetary mass in g.
+    rstar : array
+        Stellar radius in cm.
+    a : array
+        Semi-major axis in cm.
+    porb, prot : arrays
+        Orbital and rotation period in days.
+    qstar : float, optional
+        Tidal quality factor of the star. The default is 1e7.
+    """
+    torque = 4.5 * G_CGS * mp**2 * rstar**5 / (qstar * a**6)
+    return np.sign(1. / porb - 1. / prot) * torque / M_SUN_G / KM_CM**2
+
+
+def calculate_tidal_interaction(df, nsamples=10000, percentiles=(16, 50, 84), rng=None):
+    """Calculate the three tidal scaling laws for all systems.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Table with the columns in `COLUMNS`, masses in solar and Jupiter
+        masses, radius in solar radii, semi-major axis in au, and
+        periods in days.
+    nsamples : int, optional
+        Number of draws per system. The default is 10000.
+    percentiles : tuple of float, optional
+        Lower, middle, and upper percentile. The default is (16, 50, 84).
+    rng : numpy.random.Generator or int, optional
+        Random number generator or seed.
+
+    Returns
+    -------
+    tis : pandas.DataFrame
+        Every model, with _up_err and _low_err, with the index of `df`.
+    """
+    rng = np.random.default_rng(rng)
+    shape = (df.shape[0], nsamples)
+
+    def draw(col, err_high, err_low=None):
+        err_low = err_high if err_low is None else err_low
+        d = draw_split_normal(rng.standard_normal(shape), df[col], err_high, err_low)
+        # all parameters are positive
+        d[d <= 0] = np.nan
+        return d
+
+    mstar = draw("M_star", df.M_star_up_err, df.M_star_low_err) * M_SUN_G
+    mp = draw("M_pl", df.M_pl_up_err, df.M_pl_low_err) * M_JUP_G
+    rstar = draw("st_rad", df.st_rad_err1) * R_SUN_CM
+    a = draw("a_au", df.a_au_err) * AU_CM
+    porb = draw("orbper_d", df.orbper_d_err)
+    prot = draw("st_rotp", df.st_rotp_err)
+
+    q, rstar_a = mp / mstar, rstar / a
+
+    values = {"grav_pert": grav_pert(q, rstar_a),
+              "tidal_disip_timescale": tidal_disip_timescale(q, rstar_a),
+              "torque_conv": torque_conv(mp, rstar, a, porb, prot)}
+
+    tis = {}
+    for model, v in values.items():
+        # systems with a missing parameter are NaN
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            # an empty table has an empty array for every percentile
+            low, mid, high = np.nanpercentile(v, percentiles, axis=1).reshape(len(percentiles), -1)
+        tis[model] = mid
+        tis[f"{model}_up_err"] = high - mid
+        tis[f"{model}_low_err"] = low - mid
+
+    return pd.DataFrame(tis, index=df.index)
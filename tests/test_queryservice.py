@@ -0,0 +1,178 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Test of the query service in `queryservice.py`: starts the server on an
+ephemeral port on localhost, with a small results table and flare table
+in a temporary data folder, and checks the point, range, 404, and
+reload responses.
+
+Usage: python -m pytest tests
+"""
+
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import numpy as np
+import pandas as pd
+import pytest
+
+SCRIPTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "scripts")
+sys.path.insert(0, SCRIPTS)
+
+# modules that read paths.data when they are imported
+MODULES = ["schema", "aliases", "flarecatalogue", "results", "flareindex", "ephemeris",
+           "cumhiststore", "queryservice"]
+
+
+def write_results(path, orbper=(2., 3.)):
+    """Results table with two systems."""
+    pd.DataFrame({"TIC": ["111", "222"], "ID": ["Star A", "Star B"],
+                  "orbper_d": list(orbper), "orbper_d_err": [1e-5, 1e-5],
+                  "pl_tranmid": [2459000., np.nan], "pl_tranmiderr1": [1e-4, np.nan],
+                  "multiple_star": [np.nan, np.nan], "multiple_star_source": [np.nan, np.nan],
+                  "mean": [0.01, 0.5], "std": [0.001, 0.1]}).to_csv(path, index=False)
+
+
+def write_flares(path):
+    """Flare table with three flares and a coincident flare on the first
+    system, and a light curve without flares of the second system."""
+    tstart = [1000.1, 1000.9, 1001.5, 1002.5, np.nan]
+    pd.DataFrame({"TIC": ["111", "111", "111", "111", "222"],
+                  "ID": ["Star A", "Star A", "Star A", "Star A", "Star B"],
+                  "mission": ["TESS"] * 5, "quarter_or_sector": [5, 5, 5, 5, 6],
+                  "timestamp": ["2023-01-01"] * 5,
+                  "total_time_observed_in_lc_days": [25.] * 5,
+                  "orbital_phase": [np.nan] * 5, "orbital_phase_err": [np.nan] * 5,
+                  "rel_amplitude": [0.1, 0.2, 0.3, 0.4, np.nan],
+                  "rel_amplitude_err": [0.01, 0.01, 0.01, 0.01, np.nan],
+                  "tstart": tstart, "tstop": [t + 0.01 for t in tstart],
+                  "ED": [5., 10., 0.5, 20., np.nan], "ED_err": [0.1, 0.1, 0.1, 0.1, np.nan],
+                  "abs_tstart": [t + 2457000. for t in tstart],
+                  "coincidence_group": [0, 1, 2, 3, -1],
+                  "n_coincident_targets": [1, 1, 1, 4, 0],
+                  "coincident": [False, False, False, True, False]}).to_csv(path, index=False)
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """Query server on an ephemeral port, with its data in tmp_path."""
+    import paths
+    monkeypatch.setattr(paths, "data", tmp_path)
+    monkeypatch.setattr(paths, "lcs", tmp_path / "lcs")
+
+    # import the modules again, so that they use the temporary folder
+    for name in MODULES:
+        sys.modules.pop(name, None)
+    queryservice = importlib.import_module("queryservice")
+
+    write_results(tmp_path / "results.csv")
+    write_flares(tmp_path / "PAPER_flare_table.csv")
+
+    store = queryservice.CumhistStore()
+    store.append(111, np.linspace(0, 1, 5), np.linspace(0, 1, 5))
+    store.write_index()
+
+    server = queryservice.get_server("127.0.0.1", 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield server, f"http://127.0.0.1:{server.server_address[1]}"
+
+    server.shutdown()
+    server.server_close()
+    for name in MODULES:
+        sys.modules.pop(name, None)
+
+
+def get(url):
+    """Status and JSON body of a GET request."""
+    try:
+        with urlopen(url) as response:
+            return response.status, json.loads(response.read())
+    except HTTPError as err:
+        return err.code, json.loads(err.read())
+
+
+def test_point_queries(server):
+    _, url = server
+
+    status, system = get(url + "/systems/111")
+    assert status == 200
+    assert (system["ID"] == "Star A") & (system["n_flares"] == 2)
+
+    # lookup by ID, case-insensitive
+    status, system = get(url + "/systems/star%20b")
+    assert (status == 200) & (system["TIC"] == 222) & (system["n_flares"] == 0)
+
+    status, flares = get(url + "/systems/111/flares")
+    assert status == 200
+    assert len(flares["orbital_phase"]) == 2
+    assert flares["orbital_phase"] == sorted(flares["orbital_phase"])
+
+    status, coverage = get(url + "/systems/111/coverage")
+    assert (status == 200) & (len(coverage["p"]) == 5)
+
+
+def test_range_queries(server):
+    _, url = server
+
+    status, systems = get(url + "/systems?column=mean&min=0&max=0.1")
+    assert status == 200
+    assert [s["TIC"] for s in systems] == [111]
+
+    status, systems = get(url + "/systems?column=mean")
+    assert [s["TIC"] for s in systems] == [111, 222]
+
+    assert get(url + "/systems?column=nope")[0] == 400
+    assert get(url + "/systems?column=mean&min=abc")[0] == 400
+
+    # range queries on a column of strings
+    status, error = get(url + "/systems?column=ID")
+    assert (status == 400) & ("not numerical" in error["error"])
+
+
+def test_not_found(server):
+    _, url = server
+
+    assert get(url + "/systems/999")[0] == 404
+    assert get(url + "/systems/222/coverage")[0] == 404
+    assert get(url + "/nope")[0] == 404
+
+
+def test_reload(server, tmp_path):
+    srv, url = server
+    loaded = get(url + "/status")[1]["loaded"]
+
+    # a different orbital period changes the phases of the flares
+    phases = get(url + "/systems/111/flares")[1]["orbital_phase"]
+    time.sleep(0.01)
+    write_results(tmp_path / "results.csv", orbper=(2.5, 3.))
+
+    status, flares = get(url + "/systems/111/flares")
+    assert status == 200
+    assert flares["orbital_phase"] != phases
+    assert get(url + "/status")[1]["loaded"] > loaded
+
+
+def test_failed_reload_keeps_old_index(server, tmp_path):
+    _, url = server
+
+    # a half-written results table without the ID column
+    time.sleep(0.01)
+    (tmp_path / "results.csv").write_text("TIC,orbp")
+
+    status, system = get(url + "/systems/111")
+    assert (status == 200) & (system["ID"] == "Star A")
+
+    # the reload is tried again once the table is complete
+    write_results(tmp_path / "results.csv", orbper=(2.5, 3.))
+    status, system = get(url + "/systems/111")
+    assert (status == 200) & (system["orbper_d"] == 2.5)
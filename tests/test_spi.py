@@ -0,0 +1,65 @@
+"""
+Python 3.8 -- UTF-8
+
+Ekaterina Ilin, 2023, MIT License
+
+Test of `SPICalculator` in `spi.py`: the draws are made once, and
+switching the scenario or the planetary field strength does not draw
+again.
+
+Usage: python -m pytest tests
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+SCRIPTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "scripts")
+sys.path.insert(0, SCRIPTS)
+
+from spi import AUMIC_TIC, SPICalculator
+
+
+def get_systems(n=5):
+    """Table of n systems like AU Mic b."""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"TIC": [AUMIC_TIC] + list(range(1, n)),
+                       "B_G": rng.uniform(500, 3000, n)})
+    df["B_G_high"], df["B_G_low"] = df.B_G * 1.1, df.B_G * 0.9
+    for col, value in [("st_rotp", 4.8), ("orbper_d", 8.5), ("a_au", 0.06),
+                       ("st_rad", 0.75), ("pl_radj", 0.4)]:
+        df[col] = value * rng.uniform(0.5, 1.5, n)
+    df["st_rotp_err"], df["orbper_d_err"], df["a_au_err"] = 0.1, 1e-4, 0.002
+    df["st_rad_err1"], df["pl_radjerr1"], df["pl_radjerr2"] = 0.03, 0.02, -0.02
+    return df
+
+
+def test_switching_scenario_does_not_draw_again(monkeypatch):
+    spi = SPICalculator(get_systems(), nsamples=1000, chunksize=2, rng=42)
+
+    ndraws = []
+    draw_parameters = spi.draw_parameters
+    monkeypatch.setattr(spi, "draw_parameters",
+                        lambda *args: ndraws.append(1) or draw_parameters(*args))
+
+    spi.get_power("sb", 1)
+    assert len(ndraws) == len(spi.seeds) == 3
+
+    # a new scenario and field strength only evaluate the scaling law
+    low, mid, high = spi.get_power("aw", 0)
+    spi.get_power("aw", 0)
+    spi.get_table()
+    assert len(ndraws) == 3
+    assert (low <= mid).all() & (mid <= high).all()
+
+
+def test_same_draws_in_all_scenarios():
+    df = get_systems()
+    table = SPICalculator(df, nsamples=1000, chunksize=2, rng=42).get_table()
+
+    # the power of a single scenario is the same as in the full table
+    spi = SPICalculator(df, nsamples=1000, chunksize=2, rng=42)
+    assert np.allclose(spi.get_power("aw", 1)[1], table.p_spi_aw_bp1_erg_s)
+    assert np.allclose(table.p_spi_sb_bp1_norm[0], 1.)